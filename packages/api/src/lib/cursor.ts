@@ -0,0 +1,15 @@
+// Cursor opaco de paginação por keyset: posição (createdAt, id) do último item da página
+export function encodeCursor(item: { createdAt: Date; id: string }): string {
+  return Buffer.from(JSON.stringify([item.createdAt.toISOString(), item.id])).toString('base64url');
+}
+
+export function decodeCursor(cursor: string): { createdAt: Date; id: string } | null {
+  try {
+    const [createdAt, id] = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf8'));
+    const date = new Date(createdAt);
+    if (typeof id !== 'string' || Number.isNaN(date.getTime())) return null;
+    return { createdAt: date, id };
+  } catch {
+    return null;
+  }
+}
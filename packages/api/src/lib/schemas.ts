@@ -74,6 +74,9 @@ export const offersFilterSchema = paginationSchema.extend({
   q: z.string().optional(),
   dateFrom: z.coerce.date().optional(),
   dateTo: z.coerce.date().optional(),
+  // Feed paginado por cursor (usado pelos workers)
+  cursor: z.string().optional(),
+  hasDrafts: z.enum(['true', 'false']).transform((v) => v === 'true').optional(),
 });
 
 // ==================== BATCHES ====================
@@ -114,6 +117,13 @@ export const draftsFilterSchema = paginationSchema.extend({
   status: z.enum(['PENDING', 'APPROVED', 'DISPATCHED', 'ERROR', 'REJECTED']).optional(),
   priority: z.enum(['HIGH', 'NORMAL', 'LOW']).optional(),
   channel: z.enum(['TELEGRAM', 'WHATSAPP', 'FACEBOOK', 'SITE']).optional(),
+  deliveryStatus: z.enum(['PENDING', 'SENT', 'ERROR']).optional(),
+});
+
+export const deliveryResultSchema = z.object({
+  status: z.enum(['SENT', 'ERROR']),
+  externalId: z.string().optional(),
+  errorMessage: z.string().optional(),
 });
 
 // ==================== PUBLICATIONS ====================
@@ -159,6 +169,15 @@ export const clicksFilterSchema = paginationSchema.extend({
   nicheId: z.string().optional(),
   storeId: z.string().optional(),
   goCode: z.string().optional(),
+  // Sincronização incremental (usada pelos workers): order=asc + cursor
+  order: z.enum(['asc', 'desc']).default('desc'),
+  cursor: z.string().optional(),
+});
+
+// Envios concluídos, do mais antigo para o mais novo (sincronização dos workers)
+export const sentDeliveriesFilterSchema = z.object({
+  limit: z.coerce.number().int().min(1).max(100).default(100),
+  cursor: z.string().optional(),
 });
 
 // Types
@@ -2,7 +2,7 @@ import { FastifyInstance } from 'fastify';
 import { nanoid } from 'nanoid';
 import { prisma } from '../lib/prisma.js';
 import { authGuard } from '../lib/auth.js';
-import { createDraftSchema, updateDraftSchema, draftsFilterSchema } from '../lib/schemas.js';
+import { createDraftSchema, updateDraftSchema, draftsFilterSchema, deliveryResultSchema } from '../lib/schemas.js';
 import { sendError, Errors } from '../lib/errors.js';
 import { sendTelegramMessage, formatTelegramPost, isTelegramConfigured } from '../services/telegram.js';
 
@@ -22,7 +22,7 @@ export async function draftsRoutes(app: FastifyInstance) {
   app.get('/', { preHandler: [authGuard] }, async (request, reply) => {
     try {
       const query = draftsFilterSchema.parse(request.query);
-      const { page, limit, batchId, date, scheduledTime, nicheId, storeId, status, priority, channel } = query;
+      const { page, limit, batchId, date, scheduledTime, nicheId, storeId, status, priority, channel, deliveryStatus } = query;
       const skip = (page - 1) * limit;
 
       const where: any = {};
@@ -31,6 +31,8 @@ export async function draftsRoutes(app: FastifyInstance) {
       if (status) where.status = status;
       if (priority) where.priority = priority;
       if (channel) where.channels = { has: channel };
+      // Fila do dispatcher: drafts com algum canal ainda por enviar
+      if (deliveryStatus) where.deliveries = { some: { status: deliveryStatus } };
       
       // Filtros por data/horário
       if (date || scheduledTime) {
@@ -628,4 +630,38 @@ export async function draftsRoutes(app: FastifyInstance) {
       return sendError(reply, error);
     }
   });
+
+  // POST /drafts/:id/deliveries/:channel - Resultado do envio (dispatcher dos workers)
+  app.post('/:id/deliveries/:channel', { preHandler: [authGuard] }, async (request, reply) => {
+    try {
+      const { id, channel } = request.params as { id: string; channel: string };
+      const body = deliveryResultSchema.parse(request.body);
+
+      const delivery = await prisma.postDelivery.findUnique({
+        where: { draftId_channel: { draftId: id, channel: channel.toUpperCase() as any } },
+      });
+
+      if (!delivery) {
+        return sendError(reply, Errors.NOT_FOUND('Envio'));
+      }
+
+      const updated = await prisma.postDelivery.update({
+        where: { id: delivery.id },
+        data: {
+          status: body.status,
+          externalId: body.externalId ?? delivery.externalId,
+          errorMessage: body.status === 'ERROR' ? body.errorMessage : null,
+          sentAt: body.status === 'SENT' ? new Date() : delivery.sentAt,
+          retries: body.status === 'ERROR' ? { increment: 1 } : undefined,
+        },
+      });
+
+      return { data: updated };
+    } catch (error: any) {
+      if (error.name === 'ZodError') {
+        return sendError(reply, Errors.VALIDATION_ERROR(error.errors));
+      }
+      return sendError(reply, error);
+    }
+  });
 }
@@ -3,6 +3,7 @@ import { prisma } from '../lib/prisma.js';
 import { authGuard, adminGuard } from '../lib/auth.js';
 import { createOfferSchema, updateOfferSchema, offersFilterSchema } from '../lib/schemas.js';
 import { sendError, Errors } from '../lib/errors.js';
+import { encodeCursor, decodeCursor } from '../lib/cursor.js';
 import { processOffer, calculateScore } from '../services/offerScoring.js';
 import { generateCopies } from '../services/aiCopyGenerator.js';
 
@@ -11,7 +12,7 @@ export async function offersRoutes(app: FastifyInstance) {
   app.get('/', { preHandler: [authGuard] }, async (request, reply) => {
     try {
       const query = offersFilterSchema.parse(request.query);
-      const { page, limit, nicheId, storeId, status, minDiscount, q, dateFrom, dateTo } = query;
+      const { page, limit, nicheId, storeId, status, minDiscount, q, dateFrom, dateTo, cursor, hasDrafts } = query;
       const skip = (page - 1) * limit;
 
       const where: any = {};
@@ -21,6 +22,8 @@ export async function offersRoutes(app: FastifyInstance) {
       if (status) where.status = status;
       else where.status = { not: 'ARCHIVED' }; // 🗑️ Não mostrar ofertas arquivadas por padrão
       if (minDiscount) where.discountPct = { gte: minDiscount };
+      if (hasDrafts === false) where.drafts = { none: {} };
+      if (hasDrafts === true) where.drafts = { some: {} };
       if (q) {
         where.OR = [
           { title: { contains: q, mode: 'insensitive' } },
@@ -33,28 +36,51 @@ export async function offersRoutes(app: FastifyInstance) {
         if (dateTo) where.createdAt.lte = dateTo;
       }
 
-      const [offers, total] = await Promise.all([
+      // Paginação por keyset em (createdAt, id): continua correta mesmo se a
+      // última oferta da página deixar de casar com o filtro (ex.: ganhou draft)
+      if (cursor) {
+        const position = decodeCursor(cursor);
+        if (!position) {
+          return sendError(reply, Errors.VALIDATION_ERROR([{ path: ['cursor'], message: 'Cursor inválido' }]));
+        }
+        where.AND = [
+          {
+            OR: [
+              { createdAt: { lt: position.createdAt } },
+              { createdAt: position.createdAt, id: { lt: position.id } },
+            ],
+          },
+        ];
+      }
+
+      // Com cursor, pular o count: o feed só precisa saber se há próxima página
+      const [items, total] = await Promise.all([
         prisma.offer.findMany({
           where,
-          skip,
-          take: limit,
-          orderBy: { createdAt: 'desc' },
+          take: limit + 1,
+          ...(cursor ? {} : { skip }),
+          orderBy: [{ createdAt: 'desc' }, { id: 'desc' }],
           include: {
             niche: { select: { id: true, name: true, slug: true, icon: true } },
             store: { select: { id: true, name: true, slug: true } },
             _count: { select: { drafts: true } },
           },
         }),
-        prisma.offer.count({ where }),
+        cursor ? Promise.resolve(null) : prisma.offer.count({ where }),
       ]);
 
+      const hasMore = items.length > limit;
+      const offers = hasMore ? items.slice(0, -1) : items;
+      const nextCursor = hasMore ? encodeCursor(offers[offers.length - 1]) : null;
+
       return {
         data: offers,
         meta: {
           page,
           limit,
           total,
-          totalPages: Math.ceil(total / limit),
+          totalPages: total !== null ? Math.ceil(total / limit) : null,
+          nextCursor,
         },
       };
     } catch (error: any) {
@@ -402,7 +428,19 @@ export async function offersRoutes(app: FastifyInstance) {
       // Buscar ou criar batch (carga) para hoje
       let batchId = body.batchId;
       
-      if (!batchId) {
+      if (batchId) {
+        // Carga escolhida pelo publicador: só aceita drafts enquanto está pendente
+        const batch = await prisma.batch.findUnique({ where: { id: batchId } });
+        if (!batch) {
+          return sendError(reply, Errors.NOT_FOUND('Carga'));
+        }
+        if (batch.status === 'LOCKED') {
+          return sendError(reply, Errors.BATCH_LOCKED);
+        }
+        if (batch.status === 'CLOSED') {
+          return sendError(reply, Errors.BATCH_CLOSED);
+        }
+      } else {
         // Pegar a próxima carga disponível do dia
         const today = new Date();
         today.setHours(0, 0, 0, 0);
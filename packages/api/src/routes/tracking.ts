@@ -2,8 +2,9 @@ import { FastifyInstance } from 'fastify';
 import crypto from 'crypto';
 import { prisma } from '../lib/prisma.js';
 import { authGuard } from '../lib/auth.js';
-import { clicksFilterSchema, statsFilterSchema } from '../lib/schemas.js';
+import { clicksFilterSchema, statsFilterSchema, sentDeliveriesFilterSchema } from '../lib/schemas.js';
 import { sendError, Errors } from '../lib/errors.js';
+import { encodeCursor, decodeCursor } from '../lib/cursor.js';
 
 // Hash do IP para privacidade
 function hashIp(ip: string | undefined): string | null {
@@ -75,7 +76,7 @@ export async function statsRoutes(app: FastifyInstance) {
   app.get('/clicks', { preHandler: [authGuard] }, async (request, reply) => {
     try {
       const query = clicksFilterSchema.parse(request.query);
-      const { page, limit, dateFrom, dateTo, channel, nicheId, storeId, goCode } = query;
+      const { page, limit, dateFrom, dateTo, channel, nicheId, storeId, goCode, order, cursor } = query;
       const skip = (page - 1) * limit;
 
       const where: any = {};
@@ -97,34 +98,119 @@ export async function statsRoutes(app: FastifyInstance) {
         where.publishedPost = { ...where.publishedPost, storeId };
       }
 
-      const [clicks, total] = await Promise.all([
+      // Paginação por keyset em (createdAt, id): cliques novos não deslocam
+      // as páginas seguintes, e a posição do último clique vira o cursor
+      if (cursor) {
+        const position = decodeCursor(cursor);
+        if (!position) {
+          return sendError(reply, Errors.VALIDATION_ERROR([{ path: ['cursor'], message: 'Cursor inválido' }]));
+        }
+        const after = order === 'asc' ? 'gt' : 'lt';
+        where.AND = [
+          {
+            OR: [
+              { createdAt: { [after]: position.createdAt } },
+              { createdAt: position.createdAt, id: { [after]: position.id } },
+            ],
+          },
+        ];
+      }
+
+      const [items, total] = await Promise.all([
         prisma.click.findMany({
           where,
-          skip,
-          take: limit,
-          orderBy: { createdAt: 'desc' },
+          take: limit + 1,
+          ...(cursor ? {} : { skip }),
+          orderBy: [{ createdAt: order }, { id: order }],
           include: {
             publishedPost: {
               select: {
                 id: true,
                 title: true,
                 slug: true,
-                niche: { select: { name: true } },
+                discountPct: true,
+                niche: { select: { name: true, slug: true } },
                 store: { select: { name: true } },
               },
             },
           },
         }),
-        prisma.click.count({ where }),
+        cursor ? Promise.resolve(null) : prisma.click.count({ where }),
       ]);
 
+      const hasMore = items.length > limit;
+      const clicks = hasMore ? items.slice(0, -1) : items;
+      // Em ordem crescente o cursor sempre aponta o último clique entregue,
+      // para o worker retomar dali na próxima sincronização
+      const last = clicks[clicks.length - 1];
+      let nextCursor: string | null = null;
+      if (order === 'asc') nextCursor = last ? encodeCursor(last) : cursor ?? null;
+      else if (hasMore) nextCursor = encodeCursor(last);
+
       return {
         data: clicks,
         meta: {
           page,
           limit,
           total,
-          totalPages: Math.ceil(total / limit),
+          totalPages: total !== null ? Math.ceil(total / limit) : null,
+          hasMore,
+          nextCursor,
+        },
+      };
+    } catch (error: any) {
+      if (error.name === 'ZodError') {
+        return sendError(reply, Errors.VALIDATION_ERROR(error.errors));
+      }
+      return sendError(reply, error);
+    }
+  });
+
+  // GET /stats/deliveries - Envios concluídos por canal, em ordem de envio (workers)
+  app.get('/deliveries', { preHandler: [authGuard] }, async (request, reply) => {
+    try {
+      const { limit, cursor } = sentDeliveriesFilterSchema.parse(request.query);
+
+      const where: any = { status: 'SENT', sentAt: { not: null } };
+
+      // Keyset em (sentAt, id), como nos cliques: o cursor é o último envio entregue
+      if (cursor) {
+        const position = decodeCursor(cursor);
+        if (!position) {
+          return sendError(reply, Errors.VALIDATION_ERROR([{ path: ['cursor'], message: 'Cursor inválido' }]));
+        }
+        where.OR = [
+          { sentAt: { gt: position.createdAt } },
+          { sentAt: position.createdAt, id: { gt: position.id } },
+        ];
+      }
+
+      const items = await prisma.postDelivery.findMany({
+        where,
+        take: limit + 1,
+        orderBy: [{ sentAt: 'asc' }, { id: 'asc' }],
+        select: {
+          id: true,
+          channel: true,
+          sentAt: true,
+          draft: {
+            select: {
+              offer: { select: { discountPct: true, niche: { select: { slug: true } } } },
+            },
+          },
+        },
+      });
+
+      const hasMore = items.length > limit;
+      const deliveries = hasMore ? items.slice(0, -1) : items;
+      const last = deliveries[deliveries.length - 1];
+
+      return {
+        data: deliveries,
+        meta: {
+          limit,
+          hasMore,
+          nextCursor: last ? encodeCursor({ createdAt: last.sentAt as Date, id: last.id }) : cursor ?? null,
         },
       };
     } catch (error: any) {
@@ -0,0 +1,258 @@
+"""
+Cliente HTTP compartilhado para a API da plataforma
+
+Um único pool de conexões keep-alive por processo (síncrono e assíncrono),
+timeout padrão em todas as chamadas, retentativas com backoff exponencial
+e jitter para métodos idempotentes e HTTP/2 opcional. Também acumula a
+latência por endpoint, para saber onde a execução gasta tempo de rede.
+
+Uso:
+    from api_client import get_api_client
+
+    response = get_api_client().get(f"{API_URL}/api/batches")
+"""
+import asyncio
+import random
+import re
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import httpx
+from loguru import logger
+
+from config import API_URL, API_TIMEOUT, API_RETRIES, API_POOL_SIZE, API_HTTP2
+from metrics import get_metrics
+
+# Métodos que podem ser repetidos sem efeito colateral
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# Respostas que indicam falha temporária do servidor
+RETRY_STATUS = {429, 502, 503, 504}
+
+HTTP_REQUESTS = get_metrics().counter(
+    "promo_http_requests_total", "Chamadas HTTP por endpoint", ["endpoint", "outcome"]
+)
+HTTP_SECONDS = get_metrics().histogram(
+    "promo_http_request_seconds", "Latência das chamadas HTTP por endpoint", ["endpoint"]
+)
+
+# Segmentos de caminho que são ids (cuid, uuid ou números) viram ":id" nas métricas
+_ID_SEGMENT = re.compile(r"^(c[a-z0-9]{20,}|[0-9a-f-]{32,36}|\d+)$")
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        logger.warning("API_HTTP2 ativo mas o pacote h2 não está instalado; usando HTTP/1.1")
+        return False
+
+
+class _ApiClientBase:
+    """Retentativas, backoff e métricas comuns aos clientes síncrono e assíncrono"""
+
+    BACKOFF_BASE = 0.5  # segundos
+    BACKOFF_MAX = 8.0
+
+    def __init__(self, base_url: str, timeout: float, retries: int):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.retries = retries
+        self._latency: Dict[str, Dict[str, float]] = {}
+        self._latency_lock = threading.Lock()
+
+    @staticmethod
+    def endpoint(method: str, url: str) -> str:
+        """Nome do endpoint para as métricas, ex.: "POST /api/offers/:id/create-draft" """
+        segments = [":id" if _ID_SEGMENT.match(s) else s for s in urlparse(url).path.split("/")]
+        return f"{method} {'/'.join(segments)}"
+
+    def _should_retry(self, method: str, retry: Optional[bool], attempt: int,
+                      response: Optional[httpx.Response] = None) -> bool:
+        if attempt >= self.retries:
+            return False
+        if not (method in IDEMPOTENT_METHODS if retry is None else retry):
+            return False
+        return response is None or response.status_code in RETRY_STATUS
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Backoff exponencial com jitter total (respeita Retry-After, se houver)"""
+        if response is not None:
+            retry_after = response.headers.get("retry-after", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), self.BACKOFF_MAX)
+        return random.uniform(0, min(self.BACKOFF_MAX, self.BACKOFF_BASE * 2 ** attempt))
+
+    def _record(self, endpoint: str, elapsed: float, failed: bool):
+        HTTP_REQUESTS.inc(endpoint=endpoint, outcome="error" if failed else "ok")
+        HTTP_SECONDS.observe(elapsed, endpoint=endpoint)
+        with self._latency_lock:
+            stats = self._latency.get(endpoint)
+            if stats is None:
+                stats = self._latency[endpoint] = {"calls": 0, "errors": 0, "total": 0.0, "max": 0.0}
+            stats["calls"] += 1
+            stats["errors"] += failed
+            stats["total"] += elapsed
+            stats["max"] = max(stats["max"], elapsed)
+
+    def latency_stats(self) -> Dict[str, Dict[str, float]]:
+        """Chamadas, erros e latência média/máxima (ms) por endpoint"""
+        with self._latency_lock:
+            return {
+                endpoint: {
+                    "calls": stats["calls"],
+                    "errors": stats["errors"],
+                    "avg_ms": round(stats["total"] / stats["calls"] * 1000, 1),
+                    "max_ms": round(stats["max"] * 1000, 1),
+                }
+                for endpoint, stats in self._latency.items()
+            }
+
+    def log_latency(self):
+        """Registra no log o resumo de latência por endpoint"""
+        for endpoint, stats in sorted(self.latency_stats().items()):
+            logger.info(
+                f"🌐 {endpoint}: {stats['calls']} chamadas, {stats['errors']} erros, "
+                f"média {stats['avg_ms']} ms, máx {stats['max_ms']} ms"
+            )
+
+
+class ApiClient(_ApiClientBase):
+    """Cliente síncrono (seguro para uso por várias threads)"""
+
+    def __init__(self, base_url: str = API_URL, timeout: float = API_TIMEOUT, retries: int = API_RETRIES,
+                 pool_size: int = API_POOL_SIZE, http2: bool = API_HTTP2):
+        super().__init__(base_url, timeout, retries)
+        self._client = httpx.Client(
+            base_url=base_url,
+            timeout=timeout,
+            http2=http2 and _http2_available(),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+
+    def request(self, method: str, url: str, retry: Optional[bool] = None, **kwargs) -> httpx.Response:
+        """
+        Faz a requisição, repetindo falhas temporárias
+
+        Args:
+            retry: força (True) ou impede (False) retentativas; por padrão só
+                métodos idempotentes são repetidos
+        """
+        method = method.upper()
+        endpoint = self.endpoint(method, url)
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                response = self._client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                self._record(endpoint, time.perf_counter() - start, True)
+                if not self._should_retry(method, retry, attempt):
+                    raise
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            self._record(endpoint, time.perf_counter() - start, response.status_code >= 500)
+            if not self._should_retry(method, retry, attempt, response):
+                return response
+            time.sleep(self._backoff(attempt, response))
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("PATCH", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self):
+        self._client.close()
+
+
+class AsyncApiClient(_ApiClientBase):
+    """Cliente assíncrono (preso ao event loop em que foi usado pela primeira vez)"""
+
+    def __init__(self, base_url: str = API_URL, timeout: float = API_TIMEOUT, retries: int = API_RETRIES,
+                 pool_size: int = API_POOL_SIZE, http2: bool = API_HTTP2):
+        super().__init__(base_url, timeout, retries)
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            http2=http2 and _http2_available(),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+
+    async def request(self, method: str, url: str, retry: Optional[bool] = None, **kwargs) -> httpx.Response:
+        """Versão assíncrona de ApiClient.request"""
+        method = method.upper()
+        endpoint = self.endpoint(method, url)
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                response = await self._client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                self._record(endpoint, time.perf_counter() - start, True)
+                if not self._should_retry(method, retry, attempt):
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            self._record(endpoint, time.perf_counter() - start, response.status_code >= 500)
+            if not self._should_retry(method, retry, attempt, response):
+                return response
+            await asyncio.sleep(self._backoff(attempt, response))
+            attempt += 1
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def patch(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PATCH", url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+    async def close(self):
+        await self._client.aclose()
+
+
+_client: Optional[ApiClient] = None
+_client_lock = threading.Lock()
+_async_client: Optional[AsyncApiClient] = None
+
+
+def get_api_client() -> ApiClient:
+    """Cliente síncrono compartilhado pelo processo"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ApiClient()
+        return _client
+
+
+def get_async_api_client() -> AsyncApiClient:
+    """Cliente assíncrono compartilhado pelo processo"""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncApiClient()
+    return _async_client
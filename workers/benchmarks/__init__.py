@@ -0,0 +1 @@
+# Benchmarks dos workers - medem caminhos quentes sem depender da API
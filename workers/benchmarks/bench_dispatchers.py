@@ -0,0 +1,341 @@
+"""
+Benchmark - Carga nos dispatchers contra servidores locais do Telegram e do Twitter
+
+Sobe mocks da Bot API do Telegram e da API v2 do Twitter (aiohttp) com
+latência, taxa de erros e respostas 429 configuráveis, dispara os posts
+pelo dispatch() dos dispatchers reais (anti-repetição, circuit breaker e
+métricas incluídos) e mostra vazão (posts/s) e latência p50/p95/p99. O
+estado em disco dos dispatchers fica num diretório temporário.
+
+O Twitter roda no AsyncClient do tweepy, como em produção: a URL da API é
+fixa no cliente, então a sessão aiohttp dele é trocada por uma que manda
+as requisições para o mock. Sem o AsyncClient (falta a extra async do
+tweepy) o cliente síncrono é medido e o resultado sai como "Twitter (sync)".
+
+Uso:
+    python -m benchmarks.bench_dispatchers --posts 500 --concurrency 20 \\
+        --latency 50 --error-rate 0.02 --rate-limit-rate 0.01
+"""
+import argparse
+import asyncio
+import itertools
+import math
+import os
+import random
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+try:
+    from aiohttp import web
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+from dispatcher.base import PostContent
+from dispatcher.telegram import TelegramDispatcher
+from dispatcher.twitter import TwitterDispatcher
+
+TWITTER_API = "https://api.twitter.com"
+
+
+class MockServer(ABC):
+    """Servidor local com latência, erros e rate limit simulados"""
+
+    def __init__(self, latency: float, jitter: float, error_rate: float,
+                 rate_limit_rate: float, retry_after: int, seed: int = 42):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.counts: Dict[str, int] = {"ok": 0, "error": 0, "rate_limited": 0}
+        self._ids = itertools.count(1)
+        self._runner: Optional[web.AppRunner] = None
+        self.url = ""
+
+    @abstractmethod
+    def routes(self) -> list:
+        """Rotas aiohttp da API simulada"""
+
+    async def _delay_and_roll(self) -> str:
+        """Espera a latência simulada e sorteia o desfecho da requisição"""
+        await asyncio.sleep(max(self.latency + self.rng.uniform(-self.jitter, self.jitter), 0))
+        roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            outcome = "rate_limited"
+        elif roll < self.rate_limit_rate + self.error_rate:
+            outcome = "error"
+        else:
+            outcome = "ok"
+        self.counts[outcome] += 1
+        return outcome
+
+    async def start(self):
+        app = web.Application()
+        app.add_routes(self.routes())
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+
+class MockTelegram(MockServer):
+    """Bot API: getMe, sendMessage, sendPhoto"""
+
+    def routes(self):
+        return [web.post("/bot{token}/{method}", self.handle)]
+
+    async def handle(self, request):
+        method = request.match_info["method"]
+        if method == "getMe":
+            return web.json_response({"ok": True, "result": {
+                "id": 1, "is_bot": True, "first_name": "bench", "username": "bench_bot",
+            }})
+
+        outcome = await self._delay_and_roll()
+        if outcome == "rate_limited":
+            return web.json_response({
+                "ok": False, "error_code": 429,
+                "description": f"Too Many Requests: retry after {self.retry_after}",
+                "parameters": {"retry_after": self.retry_after},
+            }, status=429)
+        if outcome == "error":
+            return web.json_response({
+                "ok": False, "error_code": 400, "description": "Bad Request: simulated failure",
+            }, status=400)
+
+        return web.json_response({"ok": True, "result": {
+            "message_id": next(self._ids),
+            "date": int(time.time()),
+            "chat": {"id": -100, "type": "channel", "title": "bench"},
+            "text": "ok",
+        }})
+
+
+class MockTwitter(MockServer):
+    """API v2: POST /2/tweets"""
+
+    def routes(self):
+        return [web.post("/2/tweets", self.handle)]
+
+    async def handle(self, request):
+        body = await request.json()
+        outcome = await self._delay_and_roll()
+        if outcome == "rate_limited":
+            reset = int(time.time()) + self.retry_after
+            return web.json_response(
+                {"title": "Too Many Requests", "detail": "Too Many Requests", "status": 429},
+                status=429,
+                headers={"x-rate-limit-reset": str(reset)},
+            )
+        if outcome == "error":
+            return web.json_response(
+                {"title": "Service Unavailable", "detail": "simulated failure", "status": 503},
+                status=503,
+            )
+        return web.json_response({"data": {"id": str(next(self._ids)), "text": body.get("text", "")}}, status=201)
+
+
+def make_posts(count: int) -> List[PostContent]:
+    return [
+        PostContent(
+            id=f"post-{i}",
+            title=f"Produto de teste número {i}",
+            copy_text="Oferta imperdível para o benchmark de envio",
+            price=99.9,
+            original_price=199.9,
+            discount=50,
+            affiliate_url="https://example.com",
+            niche="eletronicos",
+            store="Loja",
+            urgency="NORMAL",
+        )
+        for i in range(count)
+    ]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentil por posto mais próximo"""
+    if not sorted_values:
+        return 0.0
+    index = math.ceil(pct / 100 * len(sorted_values)) - 1
+    return sorted_values[min(max(index, 0), len(sorted_values) - 1)]
+
+
+async def drive(dispatcher, posts: List[PostContent], concurrency: int) -> Dict:
+    """Envia os posts com no máximo `concurrency` envios simultâneos"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+    rejected = 0  # circuito aberto ou repetição: nem chegou ao mock
+
+    async def send(post: PostContent):
+        nonlocal failures, rejected
+        async with semaphore:
+            start = time.perf_counter()
+            result = await dispatcher.dispatch(post)
+            latencies.append(time.perf_counter() - start)
+            if not result.success:
+                failures += 1
+                if result.retry_after is not None or result.skipped:
+                    rejected += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(send(post) for post in posts))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "elapsed": elapsed,
+        "throughput": len(posts) / elapsed if elapsed else 0.0,
+        "failures": failures,
+        "rejected": rejected,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+    }
+
+
+def report(label: str, stats: Dict, server: MockServer, total: int):
+    print(
+        f"{label:<14} {stats['throughput']:8.1f} posts/s  "
+        f"p50 {stats['p50'] * 1000:7.1f} ms  p95 {stats['p95'] * 1000:7.1f} ms  "
+        f"p99 {stats['p99'] * 1000:7.1f} ms  "
+        f"falhas {stats['failures']}/{total} ({stats['rejected']} sem envio)  "
+        f"(mock: {server.counts['ok']} ok, {server.counts['error']} erros, "
+        f"{server.counts['rate_limited']} 429)"
+    )
+
+
+async def bench_telegram(args, posts: List[PostContent]):
+    server = MockTelegram(args.latency / 1000, args.jitter / 1000, args.error_rate,
+                          args.rate_limit_rate, args.retry_after)
+    await server.start()
+    config = {
+        "anti_repeat_dir": os.path.join(args.state_dir, "anti_repeat"),
+        "telegram_messages_path": os.path.join(args.state_dir, "telegram_messages.json"),
+        "telegram_bot_token": "123:bench",
+        "telegram_chat_id": "-100",
+        "telegram_base_url": f"{server.url}/bot",
+        "telegram_pool_size": args.concurrency,
+    }
+    if not args.real_limits:
+        # Sem os limites de flood, mede só o caminho de envio
+        config["telegram_global_rate"] = 1_000_000
+        config["telegram_chat_rate"] = 1_000_000
+
+    dispatcher = TelegramDispatcher(config)
+    try:
+        if dispatcher.bot is None:
+            print("Telegram: python-telegram-bot não disponível, pulando")
+            return
+        await dispatcher.bot.initialize()
+        report("Telegram", await drive(dispatcher, posts, args.concurrency), server, len(posts))
+    finally:
+        await dispatcher.close()
+        await server.stop()
+
+
+class RedirectSession:
+    """Sessão aiohttp do AsyncClient do tweepy com a URL fixa da API trocada pela do mock"""
+
+    def __init__(self, target: str, pool_size: int):
+        import aiohttp
+
+        self.target = target
+        self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=pool_size))
+
+    def request(self, method, url, **kwargs):
+        from yarl import URL
+
+        # A URL assinada pelo OAuth já vem codificada: manter como está
+        return self._session.request(method, URL(str(url).replace(TWITTER_API, self.target, 1), encoded=True), **kwargs)
+
+    async def close(self):
+        await self._session.close()
+
+
+async def bench_twitter(args, posts: List[PostContent]):
+    from requests.adapters import HTTPAdapter
+
+    server = MockTwitter(args.latency / 1000, args.jitter / 1000, args.error_rate,
+                         args.rate_limit_rate, args.retry_after)
+    await server.start()
+
+    class RedirectAdapter(HTTPAdapter):
+        """Troca a URL fixa da API do tweepy pela do mock (cliente síncrono)"""
+
+        def send(self, request, **kwargs):
+            request.url = request.url.replace(TWITTER_API, server.url, 1)
+            return super().send(request, **kwargs)
+
+    dispatcher = TwitterDispatcher({
+        "anti_repeat_dir": os.path.join(args.state_dir, "anti_repeat"),
+        "twitter_api_key": "bench",
+        "twitter_api_secret": "bench",
+        "twitter_access_token": "bench",
+        "twitter_access_secret": "bench",
+        "twitter_max_rate_limit_wait": args.retry_after + 2,
+    })
+    try:
+        if dispatcher.client is None:
+            print("Twitter: tweepy não disponível, pulando")
+            return
+        if dispatcher._is_async:
+            dispatcher.client.session = RedirectSession(server.url, args.concurrency)
+            label = "Twitter"
+        else:
+            dispatcher.client.session.mount(TWITTER_API, RedirectAdapter(pool_maxsize=args.concurrency))
+            label = "Twitter (sync)"
+        report(label, await drive(dispatcher, posts, args.concurrency), server, len(posts))
+    finally:
+        await dispatcher.close()
+        await server.stop()
+
+
+async def run(args):
+    posts = make_posts(args.posts)
+    print(
+        f"{args.posts} posts, concorrência {args.concurrency}, latência {args.latency}±{args.jitter} ms, "
+        f"erros {args.error_rate:.0%}, 429 {args.rate_limit_rate:.0%} (retry {args.retry_after}s)"
+    )
+    # Filtro anti-repetição e mapa de mensagens descartáveis: não tocam no .cache real
+    with tempfile.TemporaryDirectory(prefix="bench-dispatchers-") as state_dir:
+        args.state_dir = state_dir
+        if args.channel in ("telegram", "all"):
+            await bench_telegram(args, posts)
+        if args.channel in ("twitter", "all"):
+            await bench_twitter(args, posts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de carga dos dispatchers")
+    parser.add_argument("--channel", choices=["telegram", "twitter", "all"], default="all")
+    parser.add_argument("--posts", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=50, help="latência média do mock (ms)")
+    parser.add_argument("--jitter", type=float, default=20, help="variação da latência (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1, help="segundos pedidos nas respostas 429")
+    parser.add_argument("--real-limits", action="store_true",
+                        help="mantém os limites de flood do Telegram (30/s, 20/min por chat)")
+    args = parser.parse_args()
+
+    if not AIOHTTP_AVAILABLE:
+        print("aiohttp não instalado. Execute: pip install aiohttp")
+        return
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark - Copy de fallback: caminho antigo (por chamada) vs TemplateEngine
+
+Uso:
+    python -m benchmarks.bench_templates [quantidade_de_ofertas]
+"""
+import random
+import sys
+import time
+from typing import Dict, List
+
+from publisher.templates import DEFAULT_TEMPLATES, TemplateEngine
+
+NICHES = ["eletronicos", "moda", "casa", "beleza", "outros"]
+
+
+def legacy_generate_fallback(offer: Dict) -> str:
+    """Reprodução do CopyGenerator.generate_fallback original"""
+    templates = list(DEFAULT_TEMPLATES)
+    template = random.choice(templates)
+    return template.format(
+        title=offer['title'],
+        original=f"{offer['originalPrice']:.2f}",
+        final=f"{offer['finalPrice']:.2f}",
+        discount=offer['discount'],
+    )
+
+
+def make_offers(count: int) -> List[Dict]:
+    rng = random.Random(42)
+    offers = []
+    for i in range(count):
+        original = rng.uniform(50, 5000)
+        discount = rng.randint(20, 70)
+        offers.append({
+            "id": f"offer-{i}",
+            "title": f"Produto de teste número {i} com nome razoavelmente longo",
+            "originalPrice": original,
+            "finalPrice": original * (100 - discount) / 100,
+            "discount": discount,
+            "niche": {"slug": NICHES[i % len(NICHES)]},
+            "store": {"name": "Loja"},
+        })
+    return offers
+
+
+def bench(label: str, fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<28} {best * 1000:9.2f} ms")
+    return best
+
+
+def main(count: int = 10000):
+    offers = make_offers(count)
+    engine = TemplateEngine(seed=1)
+
+    print(f"Renderizando {count} ofertas (melhor de 5)")
+    legacy = bench("legado (por chamada)", lambda: [legacy_generate_fallback(o) for o in offers])
+    single = bench("engine.render (por chamada)", lambda: [engine.render(o) for o in offers])
+    bulk = bench("engine.render_many", lambda: engine.render_many(offers))
+    print(f"Ganho render_many vs legado: {legacy / bulk:.2f}x (render: {legacy / single:.2f}x)")
+
+    # Seleção determinística: mesma seed, mesma copy
+    assert engine.render_many(offers[:100]) == TemplateEngine(seed=1).render_many(offers[:100])
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -8,8 +8,9 @@ Responsabilidades:
 """
 import requests
 import json
+import time
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator
 from loguru import logger
 import sys
 
@@ -23,6 +24,12 @@ from config import (
     MAX_OFFERS_PER_RUN,
     CATEGORY_TO_NICHE,
 )
+from api_client import get_api_client, HTTP_REQUESTS, HTTP_SECONDS
+from metrics import get_metrics
+
+COLLECTED_OFFERS = get_metrics().counter(
+    "promo_collector_offers_total", "Ofertas da coleta por resultado", ["outcome"]
+)
 
 
 class LomadeeCollector:
@@ -41,14 +48,20 @@ class LomadeeCollector:
             return None
             
         url = f"{self.BASE_URL}/{self.app_token}/{endpoint}"
+        metric_endpoint = f"GET lomadee/{endpoint}"
         
+        start = time.perf_counter()
         try:
             response = requests.get(url, params=params, timeout=30)
             response.raise_for_status()
+            HTTP_REQUESTS.inc(endpoint=metric_endpoint, outcome="ok")
             return response.json()
         except requests.RequestException as e:
+            HTTP_REQUESTS.inc(endpoint=metric_endpoint, outcome="error")
             logger.error(f"Erro na requisição Lomadee: {e}")
             return None
+        finally:
+            HTTP_SECONDS.observe(time.perf_counter() - start, endpoint=metric_endpoint)
     
     def get_offers(self, category: str = None, keyword: str = None) -> List[Dict]:
         """Busca ofertas na Lomadee"""
@@ -154,7 +167,7 @@ class OfferSaver:
         """Obtém ou cria nicho"""
         try:
             # Tentar buscar existente
-            response = requests.get(f"{self.api_url}/api/offers/niches")
+            response = get_api_client().get(f"{self.api_url}/api/offers/niches")
             niches = response.json()
             
             for niche in niches:
@@ -162,7 +175,7 @@ class OfferSaver:
                     return niche["id"]
             
             # Criar novo
-            response = requests.post(
+            response = get_api_client().post(
                 f"{self.api_url}/api/offers/niches",
                 json={"name": name or slug.title(), "slug": slug}
             )
@@ -175,7 +188,7 @@ class OfferSaver:
         """Obtém ou cria loja"""
         try:
             # Tentar buscar existente
-            response = requests.get(f"{self.api_url}/api/offers/stores")
+            response = get_api_client().get(f"{self.api_url}/api/offers/stores")
             stores = response.json()
             
             for store in stores:
@@ -183,7 +196,7 @@ class OfferSaver:
                     return store["id"]
             
             # Criar novo
-            response = requests.post(
+            response = get_api_client().post(
                 f"{self.api_url}/api/offers/stores",
                 json={"name": name, "slug": slug}
             )
@@ -193,7 +206,12 @@ class OfferSaver:
             return None
     
     def save_offer(self, offer: Dict) -> Optional[str]:
-        """Salva oferta no banco"""
+        """Salva oferta no banco e retorna o id"""
+        created = self.create_offer(offer)
+        return created.get("id") if created else None
+    
+    def create_offer(self, offer: Dict) -> Optional[Dict]:
+        """Salva oferta no banco e retorna a oferta criada (com nicho e loja)"""
         try:
             # Obter IDs de nicho e loja
             niche_id = self.get_or_create_niche(offer["nicheSlug"])
@@ -204,7 +222,7 @@ class OfferSaver:
                 return None
             
             # Criar oferta
-            response = requests.post(
+            response = get_api_client().post(
                 f"{self.api_url}/api/offers",
                 json={
                     "title": offer["title"],
@@ -219,40 +237,58 @@ class OfferSaver:
                 }
             )
             
-            if response.status_code == 200:
+            if response.status_code in (200, 201):
                 data = response.json()
                 logger.info(f"Oferta salva: {offer['title'][:50]}...")
-                return data.get("id")
+                COLLECTED_OFFERS.inc(outcome="saved")
+                return data.get("data", data)
             else:
                 logger.error(f"Erro ao salvar oferta: {response.text}")
+                COLLECTED_OFFERS.inc(outcome="save_failed")
                 return None
                 
         except Exception as e:
             logger.error(f"Erro ao salvar oferta: {e}")
+            COLLECTED_OFFERS.inc(outcome="save_failed")
             return None
 
 
-def run_collector():
-    """Executa o coletor de ofertas"""
-    logger.info("=== Iniciando IA Coletora ===")
+def iter_collected_offers(categories: Optional[List[Optional[str]]] = None) -> Iterator[Dict]:
+    """
+    Ofertas da Lomadee já filtradas e no formato interno, prontas para salvar
     
-    # Inicializar componentes
+    Args:
+        categories: categorias a buscar (None na lista = busca sem categoria);
+            por padrão, uma única busca sem categoria
+    """
     lomadee = LomadeeCollector()
-    saver = OfferSaver()
     
     # Buscar ofertas
     logger.info("Buscando ofertas na Lomadee...")
-    offers = lomadee.get_offers()
+    offers = []
+    for category in categories or [None]:
+        offers.extend(lomadee.get_offers(category=category))
     logger.info(f"Encontradas {len(offers)} ofertas")
     
     # Filtrar por desconto
     filtered = lomadee.filter_by_discount(offers)
     logger.info(f"Após filtro de desconto >= {MINIMUM_DISCOUNT}%: {len(filtered)} ofertas")
+    COLLECTED_OFFERS.inc(len(offers), outcome="fetched")
+    COLLECTED_OFFERS.inc(len(offers) - len(filtered), outcome="below_discount")
+    
+    for offer in filtered[:MAX_OFFERS_PER_RUN]:
+        yield lomadee.map_to_internal_format(offer)
+
+
+def run_collector(categories: Optional[List[Optional[str]]] = None):
+    """Executa o coletor de ofertas (das categorias dadas, se houver)"""
+    logger.info("=== Iniciando IA Coletora ===")
+    
+    saver = OfferSaver()
     
     # Salvar ofertas
     saved = 0
-    for offer in filtered[:MAX_OFFERS_PER_RUN]:
-        mapped = lomadee.map_to_internal_format(offer)
+    for mapped in iter_collected_offers(categories):
         if saver.save_offer(mapped):
             saved += 1
     
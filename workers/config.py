@@ -22,6 +22,79 @@ LOMADEE_SOURCE_ID = os.getenv("LOMADEE_SOURCE_ID", "")
 # Configurações de coleta
 MINIMUM_DISCOUNT = int(os.getenv("MINIMUM_DISCOUNT", "20"))  # Desconto mínimo para coletar
 MAX_OFFERS_PER_RUN = int(os.getenv("MAX_OFFERS_PER_RUN", "50"))  # Máximo de ofertas por execução
+OFFERS_PAGE_SIZE = int(os.getenv("OFFERS_PAGE_SIZE", "50"))  # Tamanho da página do feed de ofertas (máx 100)
+
+# Pipeline do publicador (workers por estágio e tamanho das filas)
+PUBLISHER_COPY_WORKERS = int(os.getenv("PUBLISHER_COPY_WORKERS", "4"))
+PUBLISHER_SUBMIT_WORKERS = int(os.getenv("PUBLISHER_SUBMIT_WORKERS", "2"))
+PUBLISHER_QUEUE_SIZE = int(os.getenv("PUBLISHER_QUEUE_SIZE", "20"))
+
+# Limites da execução do publicador (0 = sem limite); as ofertas mais valiosas vêm primeiro
+PUBLISHER_MAX_DRAFTS = int(os.getenv("PUBLISHER_MAX_DRAFTS", "0"))
+PUBLISHER_TIME_LIMIT = int(os.getenv("PUBLISHER_TIME_LIMIT", "0"))  # segundos
+# Janela de reordenação sem limite: ~uma página, para o primeiro draft sair já na primeira página lida.
+# A ordem por score é só dentro da janela; com PUBLISHER_MAX_DRAFTS a escolha é entre todas as
+# ofertas lidas (a leitura usa no máximo metade do PUBLISHER_TIME_LIMIT)
+PUBLISHER_PRIORITY_WINDOW = int(os.getenv("PUBLISHER_PRIORITY_WINDOW", str(OFFERS_PAGE_SIZE)))
+
+# Prewarm (pré-cálculo de copy/canais antes das cargas)
+# Desligado por padrão: cada ciclo pode chamar a IA (dentro de AI_CALLS_PER_DAY)
+PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "false").lower() == "true"
+PREWARM_INTERVAL = int(os.getenv("PREWARM_INTERVAL", "300"))  # segundos entre ciclos
+PREWARM_MAX_PLANS = int(os.getenv("PREWARM_MAX_PLANS", "100"))  # planos novos por ciclo
+PREWARM_TTL_HOURS = float(os.getenv("PREWARM_TTL_HOURS", "12"))
+PREWARM_STORE_PATH = os.getenv("PREWARM_STORE_PATH", ".cache/prewarm_plans.json")
+
+# Copy com IA: orçamento de latência e de chamadas
+AI_LATENCY_BUDGET = float(os.getenv("AI_LATENCY_BUDGET", "4"))  # segundos até cair no template
+AI_REQUEST_TIMEOUT = float(os.getenv("AI_REQUEST_TIMEOUT", "30"))  # limite duro da requisição à OpenAI
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "4"))
+AI_CALLS_PER_RUN = int(os.getenv("AI_CALLS_PER_RUN", "30"))  # 0 = sem limite
+# Teto diário do processo, somando execuções do publicador e ciclos do prewarm (0 = sem limite)
+AI_CALLS_PER_DAY = int(os.getenv("AI_CALLS_PER_DAY", "300"))
+AI_MIN_SCORE = float(os.getenv("AI_MIN_SCORE", "40"))  # score_offer abaixo disso usa template (40 ≈ 30% de desconto)
+AI_COPY_CACHE_PATH = os.getenv("AI_COPY_CACHE_PATH", ".cache/ai_copy.json")
+AI_COPY_CACHE_MAX_ENTRIES = int(os.getenv("AI_COPY_CACHE_MAX_ENTRIES", "2000"))
+
+# Tabela de performance por canal (nicho × faixa de desconto × canal)
+CHANNEL_STATS_PATH = os.getenv("CHANNEL_STATS_PATH", ".cache/channel_stats.bin")
+CHANNEL_STATS_MIN_SAMPLES = int(os.getenv("CHANNEL_STATS_MIN_SAMPLES", "20"))  # publicações mínimas por canal
+
+# Pipeline em fluxo contínuo (coleta → validação → publicação ligadas por filas)
+PIPELINE_STREAMING = os.getenv("PIPELINE_STREAMING", "false").lower() == "true"
+PIPELINE_SAVE_WORKERS = int(os.getenv("PIPELINE_SAVE_WORKERS", "4"))
+PIPELINE_VALIDATE_WORKERS = int(os.getenv("PIPELINE_VALIDATE_WORKERS", "4"))
+
+# Scheduler (APScheduler)
+SCHEDULER_MAX_WORKERS = int(os.getenv("SCHEDULER_MAX_WORKERS", "2"))  # jobs simultâneos
+SCHEDULER_MISFIRE_GRACE = int(os.getenv("SCHEDULER_MISFIRE_GRACE", "1800"))  # segundos para recuperar disparos
+SCHEDULER_STATE_PATH = os.getenv("SCHEDULER_STATE_PATH", ".cache/scheduler_state.json")
+
+# Cliente HTTP da API (pool compartilhado, timeouts e retentativas)
+API_TIMEOUT = float(os.getenv("API_TIMEOUT", "15"))  # segundos por requisição
+API_RETRIES = int(os.getenv("API_RETRIES", "3"))  # retentativas de chamadas idempotentes
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "20"))  # conexões keep-alive
+API_HTTP2 = os.getenv("API_HTTP2", "false").lower() == "true"  # requer o pacote h2
+
+# Métricas no formato do Prometheus (scheduler e worker)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # 0 = endpoint desligado
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+# Profiling (python main.py profile)
+PROFILE_DIR = os.getenv("PROFILE_DIR", ".cache/profiles")  # um subdiretório por execução
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))  # segundos entre amostras
+PROFILE_TOP = int(os.getenv("PROFILE_TOP", "30"))  # funções/linhas por relatório
+
+# Modo worker distribuído (vários nós dividindo fontes e ofertas por lease)
+COORDINATION_URL = os.getenv("COORDINATION_URL", "sqlite:///.cache/coordination.db")
+LEASE_TTL = float(os.getenv("LEASE_TTL", "60"))  # segundos até um shard sem heartbeat ser reatribuído
+HEARTBEAT_INTERVAL = float(os.getenv("HEARTBEAT_INTERVAL", "15"))  # segundos entre renovações
+OFFER_SHARDS = int(os.getenv("OFFER_SHARDS", "16"))  # faixas de ofertas (hash do id)
+COLLECTOR_CATEGORIES = [c.strip() for c in os.getenv("COLLECTOR_CATEGORIES", "").split(",") if c.strip()]  # categoryId Lomadee
+WORKER_CYCLE_INTERVAL = int(os.getenv("WORKER_CYCLE_INTERVAL", "300"))  # segundos entre ciclos do worker
+
+# Copy de fallback: templates específicos por nicho (mudam o texto publicado)
+COPY_NICHE_TEMPLATES = os.getenv("COPY_NICHE_TEMPLATES", "false").lower() == "true"
 
 # Horários das cargas
 BATCH_TIMES = ["08:00", "11:00", "14:00", "18:00", "22:00"]
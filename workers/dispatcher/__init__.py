@@ -4,5 +4,26 @@
 from .twitter import TwitterDispatcher
 from .telegram import TelegramDispatcher
 from .base import BaseDispatcher
+from .circuit_breaker import CircuitBreaker
+from .registry import DispatcherRegistry, get_registry, close_registry
+from .fanout import FanOutDispatcher, fan_out
+from .outbox import Outbox, OutboxWorker
+from .draft_feed import DraftFeed
+from .media import MediaPipeline, get_media_pipeline
 
-__all__ = ['TwitterDispatcher', 'TelegramDispatcher', 'BaseDispatcher']
+__all__ = [
+    'TwitterDispatcher',
+    'TelegramDispatcher',
+    'BaseDispatcher',
+    'CircuitBreaker',
+    'DispatcherRegistry',
+    'get_registry',
+    'close_registry',
+    'FanOutDispatcher',
+    'fan_out',
+    'Outbox',
+    'OutboxWorker',
+    'DraftFeed',
+    'MediaPipeline',
+    'get_media_pipeline',
+]
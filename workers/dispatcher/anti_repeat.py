@@ -0,0 +1,202 @@
+"""
+Anti-repetição entre execuções: Bloom filter com decaimento por canal
+
+O filtro é dividido em gerações, cada uma cobrindo uma fatia da janela
+(ex.: 12h em 4 gerações de 3h). Ofertas enviadas entram na geração atual;
+a consulta olha todas as gerações ativas. Quando a geração atual fica mais
+velha que a fatia, a mais antiga é descartada e uma nova (vazia) entra no
+lugar, então uma oferta "expira" entre window - slice e window horas.
+
+A memória é fixa (gerações × bits) e a consulta é O(k) hashes. Um falso
+positivo (oferta nova tratada como repetida) acontece com probabilidade
+próxima de `fp_rate` quando cada geração recebe até `capacity` ofertas.
+
+Formato em disco: uma linha JSON de cabeçalho seguida dos bits das gerações.
+
+Cada arquivo tem um único RecentOffers por processo (get_recent_offers):
+os dispatchers de event loops diferentes do mesmo canal compartilham o
+filtro em memória em vez de sobrescreverem o arquivo uns dos outros.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+def offer_key(title: str, store: str = "") -> str:
+    """Chave normalizada do produto (ignora caixa, acentos e pontuação)"""
+    text = unicodedata.normalize("NFKD", f"{store}|{title}".lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r"[^a-z0-9|]+", " ", text).strip()
+
+
+class DecayingBloomFilter:
+    """Bloom filter em gerações com tamanho fixo"""
+
+    def __init__(self, capacity: int = 5000, fp_rate: float = 0.001,
+                 window_hours: float = 12, generations: int = 4):
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.generations = generations
+        self.slice_seconds = window_hours * 3600 / generations
+
+        # Cada geração tem fp_rate / gerações, já que a consulta olha todas
+        per_generation = fp_rate / generations
+        self.num_bits = max(int(-capacity * math.log(per_generation) / math.log(2) ** 2), 8)
+        self.num_bits += -self.num_bits % 8
+        self.num_hashes = max(int(round(self.num_bits / capacity * math.log(2))), 1)
+
+        self._bits: List[bytearray] = [bytearray(self.num_bits // 8) for _ in range(generations)]
+        self._started_at = time.time()  # início da geração atual (índice 0)
+
+    def _indexes(self, key: str):
+        # Hash duplo: k posições a partir de dois hashes de 64 bits
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def _rotate(self):
+        """Descarta as gerações que saíram da janela"""
+        elapsed = time.time() - self._started_at
+        if elapsed < self.slice_seconds:
+            return
+        steps = min(int(elapsed // self.slice_seconds), self.generations)
+        for _ in range(steps):
+            self._bits.pop()
+            self._bits.insert(0, bytearray(self.num_bits // 8))
+        self._started_at += steps * self.slice_seconds
+        if time.time() - self._started_at >= self.slice_seconds:
+            self._started_at = time.time()
+
+    def add(self, key: str):
+        self._rotate()
+        current = self._bits[0]
+        for index in self._indexes(key):
+            current[index >> 3] |= 1 << (index & 7)
+
+    def __contains__(self, key: str) -> bool:
+        self._rotate()
+        indexes = self._indexes(key)
+        return any(
+            all(bits[index >> 3] & (1 << (index & 7)) for index in indexes)
+            for bits in self._bits
+        )
+
+    # ==================== PERSISTÊNCIA ====================
+
+    def _header(self) -> dict:
+        return {
+            "num_bits": self.num_bits,
+            "num_hashes": self.num_hashes,
+            "generations": self.generations,
+            "slice_seconds": self.slice_seconds,
+            "started_at": self._started_at,
+        }
+
+    def save(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(json.dumps(self._header()).encode("utf-8") + b"\n")
+            for bits in self._bits:
+                f.write(bits)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> bool:
+        """Carrega as gerações salvas se o arquivo tiver o mesmo formato"""
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, 'rb') as f:
+                header = json.loads(f.readline())
+                data = f.read()
+        except Exception as e:
+            logger.error(f"Erro ao carregar filtro anti-repetição {path}: {e}")
+            return False
+
+        expected = self._header()
+        if any(header.get(k) != expected[k] for k in ("num_bits", "num_hashes", "generations", "slice_seconds")):
+            logger.warning(f"Filtro anti-repetição {path} com outra configuração, recomeçando")
+            return False
+        size = self.num_bits // 8
+        if len(data) != size * self.generations:
+            return False
+
+        self._bits = [bytearray(data[i * size:(i + 1) * size]) for i in range(self.generations)]
+        self._started_at = header["started_at"]
+        self._rotate()
+        return True
+
+
+class RecentOffers:
+    """Ofertas enviadas recentemente a um canal, persistidas entre execuções"""
+
+    SAVE_INTERVAL = 5  # segundos entre gravações em disco
+
+    def __init__(self, channel: str, config: dict):
+        self.path = self.path_for(channel, config)
+        self._lock = threading.Lock()
+        self.filter = DecayingBloomFilter(
+            capacity=int(config.get('anti_repeat_capacity', os.getenv('ANTI_REPEAT_CAPACITY', 5000))),
+            fp_rate=float(config.get('anti_repeat_fp_rate', os.getenv('ANTI_REPEAT_FP_RATE', 0.001))),
+            window_hours=float(config.get('anti_repeat_hours', os.getenv('ANTI_REPEAT_HOURS', 12))),
+        )
+        self.filter.load(self.path)
+        self._dirty = False
+        self._saved_at = 0.0
+
+    @staticmethod
+    def path_for(channel: str, config: dict) -> str:
+        directory = config.get('anti_repeat_dir', os.getenv('ANTI_REPEAT_DIR', '.cache/anti_repeat'))
+        return os.path.join(directory, f"{channel.lower()}.bin")
+
+    def seen(self, title: str, store: str = "") -> bool:
+        with self._lock:
+            return offer_key(title, store) in self.filter
+
+    def remember(self, title: str, store: str = ""):
+        with self._lock:
+            self.filter.add(offer_key(title, store))
+            self._dirty = True
+            if time.monotonic() - self._saved_at > self.SAVE_INTERVAL:
+                self._save()
+
+    def flush(self):
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        if not self._dirty:
+            return
+        try:
+            self.filter.save(self.path)
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        except OSError as e:
+            logger.error(f"Erro ao gravar filtro anti-repetição: {e}")
+
+
+_recent_offers: Dict[str, RecentOffers] = {}
+_recent_offers_lock = threading.Lock()
+
+
+def get_recent_offers(channel: str, config: dict) -> RecentOffers:
+    """Filtro do canal compartilhado pelo processo (um por arquivo)"""
+    path = RecentOffers.path_for(channel, config)
+    with _recent_offers_lock:
+        recent = _recent_offers.get(path)
+        if recent is None:
+            recent = _recent_offers[path] = RecentOffers(channel, config)
+        return recent
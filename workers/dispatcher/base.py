@@ -4,11 +4,23 @@ Base Dispatcher - Classe base para todos os dispatchers de canais
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Optional
+from typing import Awaitable, Callable, List, Optional
+import asyncio
 import logging
+import os
+import time
+
+from metrics.registry import get_metrics
+
+from .anti_repeat import get_recent_offers
+from .circuit_breaker import CircuitBreaker
 
 logger = logging.getLogger(__name__)
 
+DISPATCHES = get_metrics().counter("promo_dispatch_total", "Envios aos canais por resultado", ["channel", "outcome"])
+DISPATCH_SECONDS = get_metrics().histogram("promo_dispatch_seconds", "Latência dos envios aos canais", ["channel"])
+CIRCUIT_OPEN = get_metrics().gauge("promo_dispatch_circuit_open", "Circuito do canal aberto (1) ou não (0)", ["channel"])
+
 
 @dataclass
 class PostContent:
@@ -33,6 +45,10 @@ class DispatchResult:
     channel: str
     external_id: Optional[str] = None
     error_message: Optional[str] = None
+    # Preenchido quando o envio nem foi tentado (circuito aberto): tentar de novo em N segundos
+    retry_after: Optional[float] = None
+    # Envio pulado de propósito (ex.: oferta já enviada recentemente ao canal)
+    skipped: bool = False
     
 
 class BaseDispatcher(ABC):
@@ -43,6 +59,9 @@ class BaseDispatcher(ABC):
     def __init__(self, config: dict):
         self.config = config
         self.logger = logging.getLogger(f"dispatcher.{self.channel_name.lower()}")
+        self.breaker = CircuitBreaker.from_config(config)
+        anti_repeat = config.get('anti_repeat_enabled', os.getenv('ANTI_REPEAT_ENABLED', 'true'))
+        self.recent_offers = get_recent_offers(self.channel_name, config) if str(anti_repeat).lower() == 'true' else None
         
     @abstractmethod
     async def send(self, post: PostContent) -> DispatchResult:
@@ -54,6 +73,108 @@ class BaseDispatcher(ABC):
         """Valida se a configuração do canal está correta"""
         pass
     
+    def is_repeat(self, post: PostContent) -> bool:
+        """Indica se o produto já foi enviado ao canal dentro da janela"""
+        return bool(self.recent_offers) and self.recent_offers.seen(post.title, post.store)
+    
+    async def dispatch(self, post: PostContent, timeout: Optional[float] = None) -> DispatchResult:
+        """
+        Envia o post passando pelo anti-repetição e pelo circuit breaker do canal
+        
+        Produto já enviado ao canal dentro da janela retorna skipped. Com o
+        circuito aberto retorna na hora um resultado com retry_after, sem
+        chamar a API. Timeouts e exceções contam como falha.
+        """
+        return (await self.dispatch_many([post], timeout=timeout, send_many=self._send_one))[0]
+    
+    async def dispatch_many(
+        self,
+        posts: List[PostContent],
+        timeout: Optional[float] = None,
+        send_many: Optional[Callable[[List[PostContent]], Awaitable[List[DispatchResult]]]] = None,
+    ) -> List[DispatchResult]:
+        """
+        Envia vários posts numa única operação do canal (send_many) com as regras do dispatch
+        
+        Os repetidos saem como skipped; os demais passam juntos pelo circuit
+        breaker e pelo timeout, e contam como um único envio no breaker.
+        """
+        send_many = send_many or self.send_many
+        results: List[Optional[DispatchResult]] = [None] * len(posts)
+        pending = []
+        for i, post in enumerate(posts):
+            if self.is_repeat(post):
+                self.logger.info(f"Post {post.id} pulado: produto já enviado recentemente ao {self.channel_name}")
+                DISPATCHES.inc(channel=self.channel_name, outcome="skipped")
+                results[i] = DispatchResult(
+                    success=False,
+                    channel=self.channel_name,
+                    error_message="Produto já enviado recentemente",
+                    skipped=True
+                )
+            else:
+                pending.append(i)
+        if not pending:
+            return results
+            
+        if not self.breaker.allow():
+            DISPATCHES.inc(len(pending), channel=self.channel_name, outcome="circuit_open")
+            retry_after = self.breaker.retry_in() or self.breaker.open_seconds
+            for i in pending:
+                results[i] = DispatchResult(
+                    success=False,
+                    channel=self.channel_name,
+                    error_message="Circuito aberto: canal indisponível",
+                    retry_after=retry_after
+                )
+            return results
+            
+        batch = [posts[i] for i in pending]
+        ids = ", ".join(post.id for post in batch)
+        start = time.perf_counter()
+        outcome = None
+        try:
+            if timeout:
+                sent = await asyncio.wait_for(send_many(batch), timeout=timeout)
+            else:
+                sent = await send_many(batch)
+        except asyncio.TimeoutError:
+            self.logger.error(f"Timeout ao enviar post {ids} para {self.channel_name}")
+            outcome = "timeout"
+            sent = [
+                DispatchResult(success=False, channel=self.channel_name, error_message=f"Timeout após {timeout}s")
+                for _ in batch
+            ]
+        except Exception as e:
+            self.logger.error(f"Erro ao enviar post {ids} para {self.channel_name}: {e}")
+            sent = [DispatchResult(success=False, channel=self.channel_name, error_message=str(e)) for _ in batch]
+        DISPATCH_SECONDS.observe(time.perf_counter() - start, channel=self.channel_name)
+        
+        for i, post, result in zip(pending, batch, sent):
+            results[i] = result
+            DISPATCHES.inc(channel=self.channel_name, outcome=outcome or ("sent" if result.success else "failed"))
+            if result.success and self.recent_offers:
+                self.recent_offers.remember(post.title, post.store)
+            
+        previous_state = self.breaker.state
+        self.breaker.record(all(result.success for result in sent))
+        CIRCUIT_OPEN.set(int(self.breaker.state == CircuitBreaker.OPEN), channel=self.channel_name)
+        if self.breaker.state == CircuitBreaker.OPEN and previous_state != CircuitBreaker.OPEN:
+            self.logger.warning(f"Circuito do {self.channel_name} aberto por {self.breaker.open_seconds}s")
+        return results
+    
+    async def _send_one(self, posts: List[PostContent]) -> List[DispatchResult]:
+        return [await self.send(posts[0])]
+    
+    async def send_many(self, posts: List[PostContent]) -> List[DispatchResult]:
+        """Envia vários posts, um a um. Pode ser sobrescrito (ex.: resumo do Telegram)."""
+        return [await self.send(post) for post in posts]
+    
+    async def close(self):
+        """Libera os clientes/conexões do canal. Subclasses devem chamar super().close()."""
+        if self.recent_offers:
+            self.recent_offers.flush()
+    
     def format_post(self, post: PostContent) -> str:
         """Formata o post para o canal específico. Pode ser sobrescrito."""
         return post.copy_text
@@ -0,0 +1,115 @@
+"""
+Circuit breaker por canal
+
+Acompanha o resultado dos últimos envios de um canal. Quando a taxa de
+falhas passa do limite, o circuito abre e os envios seguintes falham na
+hora (sem esperar timeout) até o fim do período de espera. Depois disso um
+único envio de teste é liberado (meio-aberto): se der certo o circuito
+fecha, se falhar volta a abrir.
+"""
+
+import time
+from collections import deque
+from typing import Optional
+
+
+class CircuitBreaker:
+    """Breaker por taxa de falhas numa janela dos últimos envios"""
+
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+    FAILURE_RATE = 0.5
+    WINDOW = 20
+    MIN_CALLS = 5
+    OPEN_SECONDS = 30.0
+
+    def __init__(
+        self,
+        failure_rate: float = FAILURE_RATE,
+        window: int = WINDOW,
+        min_calls: int = MIN_CALLS,
+        open_seconds: float = OPEN_SECONDS,
+    ):
+        self.failure_rate_threshold = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.state = self.CLOSED
+        self.opened_at: Optional[float] = None
+        self.rejected = 0
+        self._results = deque(maxlen=window)  # True = falha
+        self._probing = False
+
+    @classmethod
+    def from_config(cls, config: dict) -> "CircuitBreaker":
+        return cls(
+            failure_rate=float(config.get('breaker_failure_rate', cls.FAILURE_RATE)),
+            window=int(config.get('breaker_window', cls.WINDOW)),
+            min_calls=int(config.get('breaker_min_calls', cls.MIN_CALLS)),
+            open_seconds=float(config.get('breaker_open_seconds', cls.OPEN_SECONDS)),
+        )
+
+    @property
+    def failure_rate(self) -> float:
+        if not self._results:
+            return 0.0
+        return sum(self._results) / len(self._results)
+
+    def retry_in(self) -> float:
+        """Segundos até o próximo envio de teste (0 se o circuito aceita envios)"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(self.opened_at + self.open_seconds - time.monotonic(), 0.0)
+
+    def allow(self) -> bool:
+        """Indica se um envio pode ser feito agora"""
+        if self.state == self.OPEN and self.retry_in() == 0:
+            self.state = self.HALF_OPEN
+            self._probing = False
+
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+
+        self.rejected += 1
+        return False
+
+    def record(self, success: bool):
+        """Registra o resultado de um envio liberado por allow()"""
+        if self.state == self.HALF_OPEN:
+            self._probing = False
+            if success:
+                self._close()
+            else:
+                self._open()
+            return
+
+        self._results.append(not success)
+        if (
+            self.state == self.CLOSED
+            and len(self._results) >= self.min_calls
+            and self.failure_rate >= self.failure_rate_threshold
+        ):
+            self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+
+    def _close(self):
+        self.state = self.CLOSED
+        self.opened_at = None
+        self._results.clear()
+
+    def snapshot(self) -> dict:
+        """Estado atual para monitoramento"""
+        return {
+            "state": self.state,
+            "failure_rate": round(self.failure_rate, 3),
+            "calls": len(self._results),
+            "rejected": self.rejected,
+            "retry_in": round(self.retry_in(), 1),
+        }
@@ -0,0 +1,120 @@
+"""
+Entrada do outbox: envios aprovados na plataforma
+
+Drafts disparados (POST /drafts/:id/dispatch ou /batches/:id/dispatch-approved)
+ficam com um PostDelivery PENDING por canal. O feed busca esses envios na
+API, enfileira no outbox os dos canais que este processo atende (a chave
+draft+canal do outbox evita duplicar o que já está na fila) e, quando o
+worker termina um item, grava o resultado no delivery, o que tira o draft
+da próxima busca.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Iterable, List, Optional, Tuple
+
+from .base import PostContent, DispatchResult
+from .outbox import Outbox, OutboxItem
+
+logger = logging.getLogger(__name__)
+
+
+def post_from_draft(draft: dict) -> PostContent:
+    """Monta o post a partir de um draft da API (com a oferta, o nicho e a loja)"""
+    offer = draft.get("offer") or {}
+    original_price = offer.get("originalPrice")
+    return PostContent(
+        id=draft["id"],
+        title=offer.get("title", ""),
+        copy_text=draft.get("copyText") or "",
+        price=float(offer.get("finalPrice") or 0),
+        original_price=float(original_price) if original_price else None,
+        discount=int(offer.get("discountPct") or 0),
+        affiliate_url=offer.get("affiliateUrl", ""),
+        niche=(offer.get("niche") or {}).get("slug", ""),
+        store=(offer.get("store") or {}).get("name", ""),
+        urgency=offer.get("urgency") or "NORMAL",
+        image_url=draft.get("imageUrl") or offer.get("imageUrl"),
+    )
+
+
+class DraftFeed:
+    """Traz da API os envios pendentes para o outbox e devolve os resultados"""
+
+    PAGE_SIZE = 100          # máximo aceito pela paginação da API
+    POLL_INTERVAL = 15.0     # segundos
+
+    def __init__(self, outbox: Outbox, channels: Iterable[str], api=None, config: Optional[dict] = None):
+        """
+        Args:
+            outbox: Outbox onde os envios são enfileirados
+            channels: canais atendidos por este processo (os demais ficam para quem os atende)
+            api: cliente HTTP assíncrono (padrão: o compartilhado do processo)
+        """
+        config = config or {}
+        if api is None:
+            from api_client import get_async_api_client
+            api = get_async_api_client()
+        self.outbox = outbox
+        self.channels = {c.upper() for c in channels}
+        self.api = api
+        self.api_url = config.get('api_url', os.getenv('API_URL', 'http://localhost:3001'))
+        self.poll_interval = float(config.get('outbox_poll_interval', os.getenv('OUTBOX_POLL_INTERVAL', self.POLL_INTERVAL)))
+
+    async def _pending(self) -> List[Tuple[PostContent, str]]:
+        """Envios PENDING dos canais atendidos, percorrendo todas as páginas"""
+        items = []
+        page = 1
+        while True:
+            response = await self.api.get(
+                f"{self.api_url}/api/drafts",
+                params={"status": "DISPATCHED", "deliveryStatus": "PENDING", "page": page, "limit": self.PAGE_SIZE},
+            )
+            response.raise_for_status()
+            body = response.json()
+            for draft in body.get("data", []):
+                channels = [
+                    d["channel"] for d in draft.get("deliveries", [])
+                    if d.get("status") == "PENDING" and d.get("channel") in self.channels
+                ]
+                if channels:
+                    post = post_from_draft(draft)
+                    items.extend((post, channel) for channel in channels)
+            if page >= body.get("meta", {}).get("totalPages", 1):
+                return items
+            page += 1
+
+    async def poll(self) -> int:
+        """Enfileira os envios pendentes; retorna quantos eram novos no outbox"""
+        items = await self._pending()
+        if not items:
+            return 0
+        added = await asyncio.to_thread(self.outbox.enqueue_many, items)
+        if added:
+            logger.info(f"{added} envios aprovados entraram no outbox")
+        return added
+
+    async def report(self, item: OutboxItem, result: DispatchResult):
+        """Grava no delivery da plataforma o resultado final do envio (OutboxWorker.on_done)"""
+        body = {"status": "SENT"} if result.success else {
+            "status": "ERROR",
+            "errorMessage": result.error_message or ("Oferta enviada recentemente ao canal" if result.skipped else "Falha no envio"),
+        }
+        if result.external_id:
+            body["externalId"] = result.external_id
+        response = await self.api.post(f"{self.api_url}/api/drafts/{item.post.id}/deliveries/{item.channel}", json=body)
+        response.raise_for_status()
+
+    async def run(self, stop_event: Optional[asyncio.Event] = None):
+        """Busca envios pendentes a cada poll_interval até stop_event ser sinalizado"""
+        stop_event = stop_event or asyncio.Event()
+        while not stop_event.is_set():
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.warning(f"Falha ao buscar envios aprovados: {e}")
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
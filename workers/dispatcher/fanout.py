@@ -0,0 +1,71 @@
+"""
+Fan-out - envia um post para vários canais ao mesmo tempo
+
+Cada canal tem seu próprio limite de envios simultâneos, seu próprio
+timeout e seu circuit breaker, então um canal lento ou com erro não atrasa
+os demais.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .base import PostContent, DispatchResult
+from .registry import DispatcherRegistry, get_registry
+
+logger = logging.getLogger(__name__)
+
+
+class FanOutDispatcher:
+    """Distribui posts para todos os canais alvo em paralelo"""
+
+    DEFAULT_CONCURRENCY = 4
+    DEFAULT_TIMEOUT = 30  # segundos por envio
+
+    def __init__(
+        self,
+        registry: Optional[DispatcherRegistry] = None,
+        concurrency: Optional[Dict[str, int]] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        self.registry = registry or get_registry()
+        self.concurrency = {k.upper(): v for k, v in (concurrency or {}).items()}
+        self.timeout = timeout
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _semaphore(self, channel: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(channel)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.concurrency.get(channel, self.DEFAULT_CONCURRENCY))
+            self._semaphores[channel] = semaphore
+        return semaphore
+
+    async def send_one(self, post: PostContent, channel: str) -> DispatchResult:
+        """Envia um post para um canal (com limite de concorrência, timeout e breaker)"""
+        channel = channel.upper()
+        try:
+            dispatcher = self.registry.get(channel)
+        except ValueError as e:
+            return DispatchResult(success=False, channel=channel, error_message=str(e))
+
+        async with self._semaphore(channel):
+            return await dispatcher.dispatch(post, timeout=self.timeout)
+
+    async def send(self, post: PostContent, channels: Iterable[str]) -> List[DispatchResult]:
+        """Envia um post para todos os canais; resultados na ordem dos canais"""
+        return list(await asyncio.gather(*(self.send_one(post, c) for c in channels)))
+
+    async def send_many(
+        self, items: Iterable[Tuple[PostContent, Iterable[str]]]
+    ) -> List[List[DispatchResult]]:
+        """Envia vários posts, cada um para seus canais, todos em paralelo"""
+        return list(await asyncio.gather(*(self.send(post, channels) for post, channels in items)))
+
+
+async def fan_out(
+    post: PostContent,
+    channels: Iterable[str],
+    concurrency: Optional[Dict[str, int]] = None,
+) -> List[DispatchResult]:
+    """Helper para enviar um post a vários canais com o registro compartilhado"""
+    return await FanOutDispatcher(concurrency=concurrency).send(post, channels)
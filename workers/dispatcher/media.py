@@ -0,0 +1,384 @@
+"""
+Pipeline de mídia compartilhado pelos dispatchers
+
+- Baixa as imagens dos posts em paralelo (uma única vez por URL, mesmo com
+  vários canais pedindo ao mesmo tempo)
+- Redimensiona/recomprime para os limites de cada canal (se Pillow estiver
+  instalado; senão usa a imagem original quando ela já cabe no limite)
+- Guarda tudo num cache em disco indexado pelo hash do conteúdo, com
+  remoção dos arquivos menos usados quando passa do tamanho máximo
+- Lembra o media id de cada imagem por canal, para subir uma vez só e
+  reaproveitar nos posts seguintes (uploads simultâneos da mesma imagem
+  para o mesmo canal também são unificados)
+- Grava o índice em disco fora do event loop, no máximo uma vez a cada
+  INDEX_SAVE_DELAY segundos e no close()
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+    logger.warning("httpx não instalado. Execute: pip install httpx")
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+
+@dataclass
+class ChannelMediaLimits:
+    """Limites de imagem aceitos por um canal"""
+    max_bytes: int
+    max_dimension: int
+    # Por quanto tempo um media id pode ser reaproveitado (None = sempre)
+    media_id_ttl: Optional[float] = None
+
+
+CHANNEL_LIMITS: Dict[str, ChannelMediaLimits] = {
+    "TELEGRAM": ChannelMediaLimits(max_bytes=10 * 1024 * 1024, max_dimension=2560),
+    # Media ids do Twitter expiram 24h após o upload
+    "TWITTER": ChannelMediaLimits(max_bytes=5 * 1024 * 1024, max_dimension=4096, media_id_ttl=23 * 3600),
+}
+
+
+@dataclass
+class PreparedMedia:
+    """Imagem pronta para um canal"""
+    path: str
+    content_hash: str
+    size: int
+
+
+class MediaPipeline:
+    """Download, adaptação, cache e reaproveitamento de imagens"""
+
+    DEFAULT_MAX_CACHE_BYTES = 500 * 1024 * 1024
+    DEFAULT_CONCURRENCY = 8
+    FETCH_TIMEOUT = 20
+    EVICT_INTERVAL = 60  # segundos entre varreduras do cache
+    INDEX_SAVE_DELAY = 5  # segundos que uma mudança no índice espera para ir ao disco
+
+    def __init__(
+        self,
+        cache_dir: str = ".cache/media",
+        max_cache_bytes: int = DEFAULT_MAX_CACHE_BYTES,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ):
+        self.cache_dir = cache_dir
+        self.max_cache_bytes = max_cache_bytes
+        self.concurrency = concurrency
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._index_path = os.path.join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._index = self._load_index()  # {"urls": {url: hash}, "media_ids": {canal:hash: [id, ts]}}
+        self._dirty = False
+        self._save_task: Optional[asyncio.Task] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._uploads: Dict[str, asyncio.Future] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._client = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._last_evict = 0.0
+
+    # ==================== ÍNDICE ====================
+
+    def _load_index(self) -> dict:
+        try:
+            with open(self._index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        index.setdefault("urls", {})
+        index.setdefault("media_ids", {})
+        return index
+
+    def flush(self):
+        """Grava o índice se ele mudou desde a última gravação"""
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                data = json.dumps(self._index).encode('utf-8')
+                self._dirty = False
+            self._write(self._index_path, data)
+
+    def _index_changed(self):
+        """Marca o índice para gravação (chamar com self._lock)"""
+        self._dirty = True
+        self._schedule_save()
+
+    def _schedule_save(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Fora do event loop (ex.: evict numa thread): vai no próximo agendamento ou no close()
+            return
+        if self._save_task is None or self._save_task.done() or self._save_task.get_loop() is not loop:
+            self._save_task = loop.create_task(self._save_later())
+
+    async def _save_later(self):
+        await asyncio.sleep(self.INDEX_SAVE_DELAY)
+        await asyncio.to_thread(self.flush)
+
+    def _path(self, kind: str, content_hash: str) -> str:
+        directory = os.path.join(self.cache_dir, kind)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, content_hash)
+
+    @staticmethod
+    def _touch(path: str):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    # ==================== DOWNLOAD ====================
+
+    async def _fetch(self, url: str) -> Optional[str]:
+        """Baixa a imagem e retorna o hash do conteúdo"""
+        content_hash = self._index["urls"].get(url)
+        if content_hash and os.path.exists(self._path("original", content_hash)):
+            self._touch(self._path("original", content_hash))
+            return content_hash
+
+        if not HTTPX_AVAILABLE:
+            return None
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            # Cliente e semáforo ficam presos ao loop; recriar num loop novo
+            self._client = httpx.AsyncClient(timeout=self.FETCH_TIMEOUT, follow_redirects=True)
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._client_loop = loop
+
+        async with self._semaphore:
+            response = await self._client.get(url)
+            response.raise_for_status()
+            data = response.content
+
+        content_hash = hashlib.sha256(data).hexdigest()
+        path = self._path("original", content_hash)
+        if not os.path.exists(path):
+            await asyncio.to_thread(self._write, path, data)
+
+        with self._lock:
+            self._index["urls"][url] = content_hash
+            self._index_changed()
+        return content_hash
+
+    @staticmethod
+    def _write(path: str, data: bytes):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    async def fetch(self, url: str) -> Optional[str]:
+        """Baixa uma URL (downloads simultâneos da mesma URL são unificados)"""
+        future = self._inflight.get(url)
+        if future is None or future.get_loop() is not asyncio.get_running_loop():
+            future = asyncio.ensure_future(self._fetch(url))
+            self._inflight[url] = future
+            future.add_done_callback(lambda _: self._inflight.pop(url, None))
+        try:
+            return await asyncio.shield(future)
+        except Exception as e:
+            logger.error(f"Erro ao baixar imagem {url}: {e}")
+            return None
+
+    # ==================== ADAPTAÇÃO POR CANAL ====================
+
+    def _adapt(self, content_hash: str, channel: str) -> Optional[PreparedMedia]:
+        """Gera (ou reaproveita) a versão da imagem dentro dos limites do canal"""
+        limits = CHANNEL_LIMITS.get(channel)
+        original = self._path("original", content_hash)
+        if limits is None:
+            return PreparedMedia(original, content_hash, os.path.getsize(original))
+
+        variant = self._path(channel.lower(), content_hash)
+        if os.path.exists(variant):
+            self._touch(variant)
+            return PreparedMedia(variant, content_hash, os.path.getsize(variant))
+
+        if not PIL_AVAILABLE:
+            size = os.path.getsize(original)
+            if size > limits.max_bytes:
+                logger.warning(f"Imagem {content_hash[:12]} excede o limite do {channel} e Pillow não está instalado")
+                return None
+            return PreparedMedia(original, content_hash, size)
+
+        with Image.open(original) as image:
+            image = image.convert("RGB")
+            image.thumbnail((limits.max_dimension, limits.max_dimension))
+            quality = 90
+            while True:
+                buffer = io.BytesIO()
+                image.save(buffer, format="JPEG", quality=quality, optimize=True)
+                if buffer.tell() <= limits.max_bytes or quality <= 40:
+                    break
+                quality -= 10
+
+        if buffer.tell() > limits.max_bytes:
+            return None
+        self._write(variant, buffer.getvalue())
+        return PreparedMedia(variant, content_hash, buffer.tell())
+
+    async def prepare(self, url: str, channel: str) -> Optional[PreparedMedia]:
+        """Imagem da URL pronta para o canal (None se não for possível)"""
+        content_hash = await self.fetch(url)
+        if not content_hash:
+            return None
+        try:
+            media = await asyncio.to_thread(self._adapt, content_hash, channel.upper())
+        except Exception as e:
+            logger.error(f"Erro ao adaptar imagem para {channel}: {e}")
+            return None
+        if time.monotonic() - self._last_evict > self.EVICT_INTERVAL:
+            self._last_evict = time.monotonic()
+            await asyncio.to_thread(self.evict)
+            if self._dirty:
+                self._schedule_save()
+        return media
+
+    async def prepare_many(self, urls: List[str], channel: str) -> List[Optional[PreparedMedia]]:
+        """Prepara várias imagens em paralelo, na mesma ordem das URLs"""
+        return list(await asyncio.gather(*(self.prepare(url, channel) for url in urls)))
+
+    # ==================== MEDIA IDS ====================
+
+    def get_media_id(self, channel: str, content_hash: str) -> Optional[str]:
+        """Media id já enviado para o canal, se ainda válido"""
+        channel = channel.upper()
+        entry = self._index["media_ids"].get(f"{channel}:{content_hash}")
+        if not entry:
+            return None
+        media_id, uploaded_at = entry
+        if self._media_id_expired(channel, uploaded_at):
+            return None
+        return media_id
+
+    @staticmethod
+    def _media_id_expired(channel: str, uploaded_at: float) -> bool:
+        ttl = CHANNEL_LIMITS[channel].media_id_ttl if channel in CHANNEL_LIMITS else None
+        return ttl is not None and time.time() - uploaded_at > ttl
+
+    def remember_media_id(self, channel: str, content_hash: str, media_id: str):
+        with self._lock:
+            self._index["media_ids"][f"{channel.upper()}:{content_hash}"] = [media_id, time.time()]
+            self._index_changed()
+
+    async def _upload(self, channel: str, media: PreparedMedia, upload: Callable[[PreparedMedia], Awaitable[str]]) -> str:
+        media_id = self.get_media_id(channel, media.content_hash)
+        if media_id:
+            return media_id
+        media_id = await upload(media)
+        self.remember_media_id(channel, media.content_hash, media_id)
+        return media_id
+
+    async def upload_once(
+        self,
+        channel: str,
+        media: PreparedMedia,
+        upload: Callable[[PreparedMedia], Awaitable[str]],
+    ) -> str:
+        """
+        Retorna o media id do canal, subindo a imagem só se ainda não foi enviada
+
+        Pedidos simultâneos da mesma imagem para o mesmo canal aguardam um
+        único upload; um erro no upload chega a todos eles.
+        """
+        key = f"{channel.upper()}:{media.content_hash}"
+        future = self._uploads.get(key)
+        if future is None or future.get_loop() is not asyncio.get_running_loop():
+            future = asyncio.ensure_future(self._upload(channel, media, upload))
+            self._uploads[key] = future
+            future.add_done_callback(lambda _: self._uploads.pop(key, None))
+        return await asyncio.shield(future)
+
+    # ==================== CACHE ====================
+
+    def evict(self):
+        """
+        Remove os arquivos menos usados até o cache caber no tamanho máximo
+
+        As URLs e os media ids das imagens removidas (e os media ids
+        vencidos) saem do índice junto, para ele não crescer sem limite.
+        """
+        files = []
+        total = 0
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                if path == self._index_path or name.endswith(".tmp"):
+                    continue
+                stat = os.stat(path)
+                files.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        if total <= self.max_cache_bytes:
+            return
+
+        original_dir = os.path.join(self.cache_dir, "original")
+        removed = set()
+        for _, size, path in sorted(files):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            if os.path.dirname(path) == original_dir:
+                removed.add(os.path.basename(path))
+            total -= size
+            if total <= self.max_cache_bytes:
+                break
+
+        with self._lock:
+            urls = {url: h for url, h in self._index["urls"].items() if h not in removed}
+            media_ids = {
+                key: entry for key, entry in self._index["media_ids"].items()
+                if key.split(":", 1)[1] not in removed and not self._media_id_expired(key.split(":", 1)[0], entry[1])
+            }
+            if len(urls) != len(self._index["urls"]) or len(media_ids) != len(self._index["media_ids"]):
+                self._index["urls"], self._index["media_ids"] = urls, media_ids
+                self._index_changed()
+
+    async def close(self):
+        """Fecha o cliente HTTP e grava o índice pendente"""
+        if self._save_task is not None and self._save_task.get_loop() is asyncio.get_running_loop():
+            self._save_task.cancel()
+        self._save_task = None
+        await asyncio.to_thread(self.flush)
+        if self._client is not None and self._client_loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._client = None
+        self._client_loop = None
+
+
+_pipeline: Optional[MediaPipeline] = None
+
+
+def get_media_pipeline() -> MediaPipeline:
+    """Pipeline de mídia compartilhado pelo processo"""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = MediaPipeline(
+            cache_dir=os.getenv("MEDIA_CACHE_DIR", ".cache/media"),
+            max_cache_bytes=int(os.getenv("MEDIA_CACHE_MAX_MB", "500")) * 1024 * 1024,
+        )
+    return _pipeline
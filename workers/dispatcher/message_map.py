@@ -0,0 +1,123 @@
+"""
+Mapa oferta -> mensagem enviada
+
+Guarda, por produto (chave normalizada loja+título), qual mensagem o levou
+ao canal e com que preço. Permite editar a mensagem quando o preço muda em
+vez de enviar uma nova. Persistido em JSON, em lote: as alterações
+marcam o mapa como sujo e vão para o disco no máximo a cada SAVE_INTERVAL
+segundos (e no flush() do shutdown), sem reescrever o arquivo a cada
+envio. Entradas mais velhas que a janela de edição são descartadas a cada
+gravação. Cada arquivo tem um único mapa por processo
+(get_sent_message_store), compartilhado pelos dispatchers de todos os
+event loops.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SentMessageStore:
+    """Mensagens enviadas recentemente, por chave de produto"""
+
+    SAVE_INTERVAL = 5  # segundos entre gravações em disco
+
+    def __init__(self, path: str, ttl_hours: float = 48):
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        self._lock = threading.Lock()
+        self._messages: Dict[str, Dict] = self._load()
+        self._dirty = False
+        self._saved_at = 0.0
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                messages = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.error(f"Erro ao ler mapa de mensagens {self.path}: {e}")
+            return {}
+        now = time.time()
+        return {k: v for k, v in messages.items() if now - v["sent_at"] <= self.ttl}
+
+    def _prune(self):
+        now = time.time()
+        expired = [k for k, v in self._messages.items() if now - v["sent_at"] > self.ttl]
+        for key in expired:
+            del self._messages[key]
+
+    def _changed(self):
+        """Marca o mapa como alterado e grava se o intervalo já passou (com o lock)"""
+        self._dirty = True
+        if time.monotonic() - self._saved_at > self.SAVE_INTERVAL:
+            self._save()
+
+    def _save(self):
+        self._prune()
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._messages, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        except OSError as e:
+            logger.error(f"Erro ao gravar mapa de mensagens {self.path}: {e}")
+
+    def flush(self):
+        """Grava as alterações pendentes (chamar no shutdown)"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Mensagem do produto, se ainda estiver dentro da janela de edição"""
+        entry = self._messages.get(key)
+        if entry and time.time() - entry["sent_at"] > self.ttl:
+            return None
+        return entry
+
+    def put(self, key: str, message_id: str, price: float, kind: str = "text", post_id: Optional[str] = None,
+            digest: bool = False):
+        """Registra a mensagem de um produto (kind: text ou photo; digest: saiu num resumo)"""
+        with self._lock:
+            self._messages[key] = {
+                "message_id": message_id,
+                "price": price,
+                "kind": kind,
+                "post_id": post_id,
+                "digest": digest,
+                "sent_at": time.time(),
+            }
+            self._changed()
+
+    def update_price(self, key: str, price: float):
+        """Atualiza o preço após uma edição (mantém a data do envio original)"""
+        with self._lock:
+            entry = self._messages.get(key)
+            if entry:
+                entry["price"] = price
+                self._changed()
+
+
+_stores: Dict[str, SentMessageStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_sent_message_store(path: str, ttl_hours: float = 48) -> SentMessageStore:
+    """Mapa de mensagens compartilhado pelo processo (um por arquivo)"""
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = SentMessageStore(path, ttl_hours=ttl_hours)
+        return store
@@ -0,0 +1,322 @@
+"""
+Outbox durável de envios (SQLite em modo WAL)
+
+Cada par post+canal entra no outbox com uma chave de idempotência antes de
+ser enviado. Workers reivindicam itens com lease; se o processo cair no
+meio de uma carga, os itens com lease vencido voltam para a fila e nada que
+já foi marcado como enviado é reenviado. A entrega é at-least-once: só um
+crash entre o envio e o registro do resultado pode gerar repetição. O
+worker renova o lease dos itens em andamento a cada terço do lease, então
+um lote que demora mais que o lease (fila de envio, rate limit) não é
+reivindicado por outro worker enquanto ainda está sendo enviado. Um lease
+vencido conta como tentativa: o item que derruba o worker toda vez vai para
+FAILED depois de MAX_ATTEMPTS em vez de ser reivindicado para sempre.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from metrics.registry import get_metrics
+
+from .base import PostContent, DispatchResult
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_ITEMS = get_metrics().gauge("promo_outbox_items", "Itens do outbox por status", ["status"])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    post_id TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'PENDING',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_until REAL,
+    available_at REAL NOT NULL DEFAULT 0,
+    external_id TEXT,
+    error_message TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_claim ON outbox (status, available_at);
+"""
+
+
+@dataclass
+class OutboxItem:
+    """Item reivindicado por um worker"""
+    id: int
+    idempotency_key: str
+    channel: str
+    post: PostContent
+    attempts: int
+
+
+class Outbox:
+    """Fila durável de envios por post+canal"""
+
+    STATUS_PENDING = "PENDING"
+    STATUS_CLAIMED = "CLAIMED"
+    STATUS_SENT = "SENT"
+    STATUS_FAILED = "FAILED"
+    STATUS_SKIPPED = "SKIPPED"
+
+    DEFAULT_LEASE = 120      # segundos
+    MAX_ATTEMPTS = 5
+    RETRY_BACKOFF = 30       # segundos, multiplicado pelo número de tentativas
+
+    def __init__(self, path: str = ".cache/outbox.db"):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    @staticmethod
+    def idempotency_key(post: PostContent, channel: str) -> str:
+        return f"{post.id}:{channel.upper()}"
+
+    # ==================== ENFILEIRAR ====================
+
+    def enqueue(self, post: PostContent, channel: str) -> bool:
+        """Enfileira um envio; retorna False se o par post+canal já existe"""
+        return self.enqueue_many([(post, channel)]) == 1
+
+    def enqueue_many(self, items: Iterable[Tuple[PostContent, str]]) -> int:
+        """Enfileira vários envios numa única transação; retorna quantos eram novos"""
+        now = time.time()
+        rows = [
+            (self.idempotency_key(post, channel), post.id, channel.upper(),
+             json.dumps(asdict(post), ensure_ascii=False), now, now)
+            for post, channel in items
+        ]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO outbox "
+                    "(idempotency_key, post_id, channel, payload, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return self._conn.total_changes - before
+
+    # ==================== REIVINDICAR ====================
+
+    def claim(self, owner: str, limit: int = 10, lease: float = DEFAULT_LEASE,
+              channel: Optional[str] = None) -> List[OutboxItem]:
+        """
+        Reivindica itens pendentes (ou com lease vencido) para um worker
+
+        Itens com lease vencido que já gastaram MAX_ATTEMPTS tentativas vão
+        para FAILED em vez de voltar para um worker.
+        """
+        now = time.time()
+        query = (
+            "SELECT id, idempotency_key, channel, payload, attempts, status FROM outbox "
+            "WHERE ((status = 'PENDING' AND available_at <= ?) "
+            "OR (status = 'CLAIMED' AND lease_until < ?))"
+        )
+        params: list = [now, now]
+        if channel:
+            query += " AND channel = ?"
+            params.append(channel.upper())
+        query += " ORDER BY id LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(query, params).fetchall()
+                exhausted = [row for row in rows if row[5] == self.STATUS_CLAIMED and row[4] >= self.MAX_ATTEMPTS]
+                rows = [row for row in rows if row not in exhausted]
+                self._conn.executemany(
+                    "UPDATE outbox SET status = 'FAILED', error_message = ?, "
+                    "lease_owner = NULL, lease_until = NULL, updated_at = ? WHERE id = ?",
+                    [(f"Lease vencido após {row[4]} tentativas", now, row[0]) for row in exhausted],
+                )
+                self._conn.executemany(
+                    "UPDATE outbox SET status = 'CLAIMED', lease_owner = ?, lease_until = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    [(owner, now + lease, now, row[0]) for row in rows],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        for row in exhausted:
+            logger.error(f"{row[1]} desistido: o lease venceu em {row[4]} tentativas")
+        return [
+            OutboxItem(
+                id=row[0],
+                idempotency_key=row[1],
+                channel=row[2],
+                post=PostContent(**json.loads(row[3])),
+                attempts=row[4] + 1,
+            )
+            for row in rows
+        ]
+
+    def renew(self, items: Iterable[OutboxItem], owner: str, lease: float = DEFAULT_LEASE) -> int:
+        """Estende o lease dos itens ainda com este worker; retorna quantos foram renovados"""
+        now = time.time()
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "UPDATE outbox SET lease_until = ?, updated_at = ? "
+                    "WHERE id = ? AND status = 'CLAIMED' AND lease_owner = ? AND attempts = ?",
+                    [(now + lease, now, item.id, owner, item.attempts) for item in items],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return self._conn.total_changes - before
+
+    # ==================== RESULTADO ====================
+
+    def outcome(self, item: OutboxItem, result: DispatchResult) -> str:
+        """Status em que o item fica com este resultado"""
+        if result.success:
+            return self.STATUS_SENT
+        if result.skipped:
+            return self.STATUS_SKIPPED
+        if result.retry_after is None and item.attempts >= self.MAX_ATTEMPTS:
+            return self.STATUS_FAILED
+        return self.STATUS_PENDING
+
+    def complete(self, item: OutboxItem, result: DispatchResult, owner: str) -> bool:
+        """Registra o resultado; retorna False se o lease já não era deste worker"""
+        now = time.time()
+        status = self.outcome(item, result)
+        refunded_attempts, available_at = 0, 0
+        if status == self.STATUS_PENDING:
+            if result.retry_after is not None:
+                # Envio não tentado (circuito aberto): adia sem gastar tentativa
+                available_at, refunded_attempts = now + result.retry_after, 1
+            else:
+                available_at = now + self.RETRY_BACKOFF * item.attempts
+
+        # attempts identifica a reivindicação: se o item foi reivindicado de novo
+        # (mesmo que pelo mesmo worker), este resultado é de um lease antigo
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE outbox SET status = ?, available_at = ?, external_id = ?, error_message = ?, "
+                "attempts = attempts - ?, lease_owner = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'CLAIMED' AND lease_owner = ? AND attempts = ?",
+                (status, available_at, result.external_id, result.error_message, refunded_attempts,
+                 now, item.id, owner, item.attempts),
+            )
+            return cursor.rowcount == 1
+
+    def status(self, post_id: str, channel: str) -> Optional[dict]:
+        """Estado de um envio (para auditoria e reprocessamento)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, attempts, external_id, error_message FROM outbox WHERE idempotency_key = ?",
+                (f"{post_id}:{channel.upper()}",),
+            ).fetchone()
+        if not row:
+            return None
+        return dict(zip(("status", "attempts", "external_id", "error_message"), row))
+
+    def counts(self) -> dict:
+        """Quantidade de itens por status"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class OutboxWorker:
+    """Consome o outbox e envia pelos dispatchers"""
+
+    def __init__(self, outbox: Outbox, send, batch_size: int = 20, lease: float = Outbox.DEFAULT_LEASE,
+                 idle_interval: float = 2.0, on_done=None):
+        """
+        Args:
+            outbox: Outbox de onde os itens são reivindicados
+            send: coroutine (post, canal) -> DispatchResult, ex.: FanOutDispatcher.send_one
+            on_done: coroutine (item, resultado) chamada quando o item chega a um
+                status final (enviado, pulado ou desistido), ex.: DraftFeed.report
+        """
+        self.outbox = outbox
+        self.send = send
+        self.on_done = on_done
+        self.batch_size = batch_size
+        self.lease = lease
+        self.idle_interval = idle_interval
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+    async def _process(self, item: OutboxItem, in_flight: Dict[int, OutboxItem]):
+        try:
+            result = await self.send(item.post, item.channel)
+        except Exception as e:
+            result = DispatchResult(success=False, channel=item.channel, error_message=str(e))
+        try:
+            if not await asyncio.to_thread(self.outbox.complete, item, result, self.owner):
+                logger.warning(f"Lease perdido para {item.idempotency_key}; resultado descartado")
+                return
+        finally:
+            in_flight.pop(item.id, None)
+        if self.on_done and self.outbox.outcome(item, result) != Outbox.STATUS_PENDING:
+            try:
+                await self.on_done(item, result)
+            except Exception as e:
+                logger.warning(f"Falha ao registrar o resultado de {item.idempotency_key}: {e}")
+
+    async def _renew_leases(self, in_flight: Dict[int, OutboxItem]):
+        """Renova os leases enquanto itens do lote ainda estão sendo enviados"""
+        while in_flight:
+            await asyncio.sleep(self.lease / 3)
+            if in_flight:
+                await asyncio.to_thread(self.outbox.renew, list(in_flight.values()), self.owner, self.lease)
+
+    async def run_once(self) -> int:
+        """Processa um lote; retorna quantos itens foram reivindicados"""
+        items = await asyncio.to_thread(self.outbox.claim, self.owner, self.batch_size, self.lease)
+        in_flight = {item.id: item for item in items}
+        renewer = asyncio.create_task(self._renew_leases(in_flight))
+        try:
+            await asyncio.gather(*(self._process(item, in_flight) for item in items))
+        finally:
+            renewer.cancel()
+        for status, count in (await asyncio.to_thread(self.outbox.counts)).items():
+            OUTBOX_ITEMS.set(count, status=status)
+        return len(items)
+
+    async def run(self, stop_event: Optional[asyncio.Event] = None):
+        """Processa o outbox até stop_event ser sinalizado"""
+        stop_event = stop_event or asyncio.Event()
+        while not stop_event.is_set():
+            if not await self.run_once():
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=self.idle_interval)
+                except asyncio.TimeoutError:
+                    pass
@@ -0,0 +1,57 @@
+"""
+Token bucket assíncrono para respeitar limites de envio dos canais
+"""
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Libera até `rate` operações por segundo, com rajadas de até `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def pause(self, seconds: float):
+        """Bloqueia o bucket por um tempo (ex.: RetryAfter da API)"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+    def delay(self, tokens: float = 1) -> float:
+        """Segundos até haver `tokens` disponíveis (no máximo a capacidade)"""
+        self._refill()
+        pause = max(self.paused_until - time.monotonic(), 0)
+        needed = min(tokens, self.capacity)
+        if self.tokens >= needed:
+            return pause
+        return max(pause, (needed - self.tokens) / self.rate)
+
+    async def acquire(self, tokens: float = 1) -> float:
+        """
+        Aguarda e consome `tokens` (ex.: um por foto de um álbum); retorna quanto tempo esperou
+
+        Um custo acima da capacidade sai quando o bucket enche e deixa o
+        saldo negativo, atrasando os envios seguintes na mesma proporção.
+        """
+        waited = 0.0
+        while True:
+            delay = self.delay(tokens)
+            if delay <= 0:
+                self.tokens -= tokens
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def refund(self, tokens: float = 1):
+        """Devolve tokens consumidos por um envio que não aconteceu"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + tokens)
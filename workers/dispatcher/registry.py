@@ -0,0 +1,157 @@
+"""
+Registro de dispatchers - um cliente por canal para todo o processo
+
+Cada dispatcher (e seu Bot/Client com pool de conexões HTTP) é criado uma
+única vez e reaproveitado em todos os envios. A validação das credenciais
+fica em cache por um TTL e os clientes são fechados no shutdown.
+
+Os clientes ficam presos ao event loop em que foram criados, então o
+registro guarda um conjunto de dispatchers por loop: um `asyncio.run` por
+envio funciona (com clientes novos a cada loop), mas o uso recomendado é um
+único loop de longa duração, como o `main.py dispatch`. Os dispatchers de
+um loop são fechados quando ele termina (no `shutdown_asyncgens` que o
+`asyncio.run` faz); loops geridos à mão devem chamar `close()` antes de
+parar. O anti-repetição e o mapa de mensagens são um por arquivo no
+processo, compartilhados pelos dispatchers de todos os loops.
+"""
+
+import asyncio
+import time
+import logging
+import weakref
+from typing import Dict, Optional, Tuple, Type
+
+from .base import BaseDispatcher
+from .telegram import TelegramDispatcher
+from .twitter import TwitterDispatcher
+
+logger = logging.getLogger(__name__)
+
+DISPATCHER_CLASSES: Dict[str, Type[BaseDispatcher]] = {
+    TelegramDispatcher.channel_name: TelegramDispatcher,
+    TwitterDispatcher.channel_name: TwitterDispatcher,
+}
+
+
+class DispatcherRegistry:
+    """Mantém os dispatchers de cada canal vivos durante o processo"""
+
+    VALIDATION_TTL = 600  # segundos
+
+    def __init__(self, config: Optional[dict] = None, validation_ttl: float = VALIDATION_TTL):
+        self.config = config or {}
+        self.validation_ttl = validation_ttl
+        # Dispatchers por event loop; somem junto com o loop
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, BaseDispatcher]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._validation: Dict[str, Tuple[bool, float]] = {}
+        self._shutdown_hooks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, object]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @property
+    def _dispatchers(self) -> Dict[str, BaseDispatcher]:
+        """Dispatchers do event loop em execução"""
+        loop = asyncio.get_running_loop()
+        dispatchers = self._loops.get(loop)
+        if dispatchers is None:
+            dispatchers = self._loops[loop] = {}
+            self._close_on_loop_end(loop)
+        return dispatchers
+
+    def _close_on_loop_end(self, loop: asyncio.AbstractEventLoop):
+        """Fecha os dispatchers do loop quando ele finalizar os async generators"""
+        # O loop guarda só uma referência fraca ao generator: ele fica em
+        # _shutdown_hooks até rodar (e não referencia o loop, senão o
+        # WeakKeyDictionary nunca o soltaria). O token impede que um hook
+        # antigo, descartado por um close() explícito, feche os dispatchers
+        # criados depois dele no mesmo loop.
+        token = object()
+        hook = self._close_at_shutdown(token)
+        self._shutdown_hooks[loop] = (token, hook)
+
+        async def start():
+            await hook.__anext__()
+
+        loop.create_task(start())
+
+    async def _close_at_shutdown(self, token: object):
+        try:
+            yield
+        finally:
+            current = self._shutdown_hooks.get(asyncio.get_running_loop())
+            if current and current[0] is token:
+                await self.close()
+
+    def get(self, channel: str) -> BaseDispatcher:
+        """Retorna o dispatcher do canal no loop atual, criando-o na primeira vez"""
+        channel = channel.upper()
+        dispatchers = self._dispatchers
+        dispatcher = dispatchers.get(channel)
+        if dispatcher is None:
+            dispatcher_class = DISPATCHER_CLASSES.get(channel)
+            if dispatcher_class is None:
+                raise ValueError(f"Canal sem dispatcher: {channel}")
+            dispatcher = dispatcher_class(self.config)
+            dispatchers[channel] = dispatcher
+        return dispatcher
+
+    async def is_valid(self, channel: str) -> bool:
+        """Valida a configuração do canal, com resultado em cache por TTL"""
+        channel = channel.upper()
+        cached = self._validation.get(channel)
+        if cached and time.monotonic() - cached[1] < self.validation_ttl:
+            return cached[0]
+
+        valid = await self.get(channel).validate_config()
+        self._validation[channel] = (valid, time.monotonic())
+        return valid
+
+    async def validate_all(self) -> Dict[str, bool]:
+        """Valida todos os canais conhecidos (chamar na inicialização)"""
+        channels = list(DISPATCHER_CLASSES)
+        results = await asyncio.gather(*(self.is_valid(c) for c in channels))
+        for channel, valid in zip(channels, results):
+            logger.info(f"Canal {channel}: {'OK' if valid else 'indisponível'}")
+        return dict(zip(channels, results))
+
+    def breaker_states(self) -> Dict[str, dict]:
+        """Estado do circuit breaker de cada canal já usado (para monitoramento)"""
+        return {
+            channel: d.breaker.snapshot()
+            for dispatchers in list(self._loops.values())
+            for channel, d in dispatchers.items()
+        }
+
+    async def close(self):
+        """Fecha os clientes de todos os canais criados no loop atual"""
+        loop = asyncio.get_running_loop()
+        dispatchers = self._loops.pop(loop, {})
+        self._shutdown_hooks.pop(loop, None)
+        for channel, dispatcher in dispatchers.items():
+            try:
+                await dispatcher.close()
+            except Exception as e:
+                logger.error(f"Erro ao fechar dispatcher {channel}: {e}")
+        self._validation.clear()
+
+
+_registry: Optional[DispatcherRegistry] = None
+
+
+def get_registry(config: Optional[dict] = None) -> DispatcherRegistry:
+    """Registro compartilhado pelo processo (config usada só na criação)"""
+    global _registry
+    if _registry is None:
+        _registry = DispatcherRegistry(config)
+    return _registry
+
+
+async def close_registry():
+    """Fecha os clientes do registro compartilhado neste loop (chamar no shutdown)"""
+    global _registry
+    if _registry is not None:
+        await _registry.close()
+        if not _registry._loops:
+            _registry = None
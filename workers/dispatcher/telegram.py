@@ -10,15 +10,21 @@ Requisitos:
 
 import os
 import logging
-from typing import Optional
+from typing import List, Optional
 from .base import BaseDispatcher, PostContent, DispatchResult
+from .telegram_queue import TelegramSendQueue
+from .media import get_media_pipeline
+from .anti_repeat import offer_key
+from .message_map import get_sent_message_store
 
 logger = logging.getLogger(__name__)
 
 # Tenta importar telegram (biblioteca do Telegram)
 try:
-    from telegram import Bot
+    from telegram import Bot, InputMediaPhoto
     from telegram.constants import ParseMode
+    from telegram.request import HTTPXRequest
+    from telegram.error import BadRequest, TelegramError
     TELEGRAM_AVAILABLE = True
 except ImportError:
     TELEGRAM_AVAILABLE = False
@@ -29,11 +35,27 @@ class TelegramDispatcher(BaseDispatcher):
     """Dispatcher para Telegram usando Bot API"""
     
     channel_name = "TELEGRAM"
+    CONNECTION_POOL_SIZE = 8
+    MAX_CAPTION_LENGTH = 1024
+    MAX_MESSAGE_LENGTH = 4096
+    MAX_MEDIA_GROUP = 10
+    EDIT_WINDOW_HOURS = 48
     
     def __init__(self, config: dict):
         super().__init__(config)
         self.bot: Optional['Bot'] = None
         self.chat_id: Optional[str] = None
+        # Todos os envios passam pela fila com controle de flood
+        self.send_queue = TelegramSendQueue(
+            global_rate=float(config.get('telegram_global_rate', TelegramSendQueue.GLOBAL_RATE)),
+            chat_rate=float(config.get('telegram_chat_rate', TelegramSendQueue.CHAT_RATE)),
+        )
+        self.sent_messages = get_sent_message_store(
+            config.get('telegram_messages_path', os.getenv('TELEGRAM_MESSAGES_PATH', '.cache/telegram_messages.json')),
+            ttl_hours=float(config.get('telegram_edit_window_hours', self.EDIT_WINDOW_HOURS)),
+        )
+        send_images = self.config.get('telegram_send_images', os.getenv('TELEGRAM_SEND_IMAGES', 'false'))
+        self.send_images = str(send_images).lower() == 'true'
         self._setup_client()
         
     def _setup_client(self):
@@ -55,7 +77,15 @@ class TelegramDispatcher(BaseDispatcher):
             return
             
         try:
-            self.bot = Bot(token=bot_token)
+            # Pool de conexões reaproveitado entre envios
+            pool_size = int(self.config.get('telegram_pool_size', self.CONNECTION_POOL_SIZE))
+            # base_url alternativo permite apontar para um servidor local (benchmarks)
+            base_url = self.config.get('telegram_base_url', 'https://api.telegram.org/bot')
+            self.bot = Bot(
+                token=bot_token,
+                base_url=base_url,
+                request=HTTPXRequest(connection_pool_size=pool_size)
+            )
             self.logger.info("Cliente Telegram configurado com sucesso")
         except Exception as e:
             self.logger.error(f"Erro ao configurar cliente Telegram: {e}")
@@ -76,6 +106,46 @@ class TelegramDispatcher(BaseDispatcher):
             self.logger.error(f"Erro ao validar Telegram: {e}")
         return False
         
+    async def _send_photo(self, post: PostContent, caption: str):
+        """Envia a imagem com legenda, reaproveitando o file_id de envios anteriores"""
+        media_pipeline = get_media_pipeline()
+        media = await media_pipeline.prepare(post.image_url, self.channel_name)
+        if media is None:
+            return None
+            
+        file_id = media_pipeline.get_media_id(self.channel_name, media.content_hash)
+        
+        async def send():
+            if file_id:
+                photo = file_id
+            else:
+                with open(media.path, 'rb') as f:
+                    photo = f.read()
+            return await self.bot.send_photo(
+                chat_id=self.chat_id,
+                photo=photo,
+                caption=caption,
+                parse_mode=ParseMode.HTML
+            )
+            
+        try:
+            message = await self.send_queue.submit(self.chat_id, send)
+        except TelegramError as e:
+            # Sem a imagem o post ainda pode sair como texto
+            self.logger.warning(f"Falha ao enviar imagem no Telegram, enviando só texto: {e}")
+            return None
+        if message and message.photo and not file_id:
+            media_pipeline.remember_media_id(self.channel_name, media.content_hash, message.photo[-1].file_id)
+        return message
+        
+    async def close(self):
+        """Encerra a fila de envio e o pool de conexões do bot e grava o mapa de mensagens"""
+        await self.send_queue.close()
+        if self.bot:
+            await self.bot.shutdown()
+        self.sent_messages.flush()
+        await super().close()
+            
     def format_post(self, post: PostContent) -> str:
         """
         Formata o post para Telegram (suporta HTML/Markdown)
@@ -135,6 +205,16 @@ class TelegramDispatcher(BaseDispatcher):
         
         return "\n".join(lines)
         
+    def format_digest_item(self, post: PostContent) -> str:
+        """Formato compacto de uma oferta dentro de um resumo"""
+        price_final = f"R$ {post.price:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+        discount = f" ({post.discount}% OFF)" if post.discount > 0 else ""
+        return "\n".join([
+            f"<b>{post.title}</b>",
+            f"✅ <b>{price_final}</b>{discount} | 🛒 {post.store}",
+            f'👉 <a href="{self.get_short_url(post)}">VER OFERTA</a>',
+        ])
+        
     async def send(self, post: PostContent) -> DispatchResult:
         """Envia a mensagem para o Telegram"""
         if not self.bot or not self.chat_id:
@@ -145,21 +225,41 @@ class TelegramDispatcher(BaseDispatcher):
             )
             
         try:
+            # Preço mudou num post recente: edita em vez de enviar de novo
+            if self._price_changed(post):
+                result = await self.update(post)
+                if result is not None:
+                    return result
+                    
             # Formata a mensagem
             message_text = self.format_post(post)
             
             self.logger.info(f"Enviando mensagem Telegram para post {post.id}")
             
-            # Envia a mensagem
-            message = await self.bot.send_message(
-                chat_id=self.chat_id,
-                text=message_text,
-                parse_mode=ParseMode.HTML,
-                disable_web_page_preview=False
-            )
+            # Envia a mensagem (respeitando os limites do Telegram)
+            message = None
+            if self.send_images and post.image_url and len(message_text) <= self.MAX_CAPTION_LENGTH:
+                message = await self._send_photo(post, message_text)
+            if message is None:
+                message = await self.send_queue.submit(
+                    self.chat_id,
+                    lambda: self.bot.send_message(
+                        chat_id=self.chat_id,
+                        text=message_text,
+                        parse_mode=ParseMode.HTML,
+                        disable_web_page_preview=False
+                    )
+                )
             
             if message:
                 self.logger.info(f"Mensagem Telegram enviada: {message.message_id}")
+                self.sent_messages.put(
+                    offer_key(post.title, post.store),
+                    str(message.message_id),
+                    post.price,
+                    kind="photo" if message.photo else "text",
+                    post_id=post.id
+                )
                 return DispatchResult(
                     success=True,
                     channel=self.channel_name,
@@ -181,6 +281,227 @@ class TelegramDispatcher(BaseDispatcher):
                 error_message=error_msg
             )
 
+                
+    async def update(self, post: PostContent) -> Optional[DispatchResult]:
+        """
+        Edita a mensagem já enviada do produto com o preço novo
+        
+        Returns:
+            Resultado da edição, ou None se não há mensagem recente editável
+            (o chamador deve enviar uma mensagem nova)
+        """
+        key = offer_key(post.title, post.store)
+        entry = self.sent_messages.get(key)
+        if not entry or not self.bot or not self.chat_id:
+            return None
+            
+        if entry.get("digest") and entry["kind"] != "photo":
+            # A mensagem traz outras ofertas: editar exigiria remontar o resumo inteiro
+            return None
+            
+        message_id = int(entry["message_id"])
+        if entry["kind"] == "photo":
+            # Foto de álbum mantém a legenda compacta do resumo
+            caption = self.format_digest_item(post) if entry.get("digest") else self.format_post(post)
+            if len(caption) > self.MAX_CAPTION_LENGTH:
+                caption = self.format_digest_item(post)
+            edit = lambda: self.bot.edit_message_caption(
+                chat_id=self.chat_id,
+                message_id=message_id,
+                caption=caption,
+                parse_mode=ParseMode.HTML
+            )
+        else:
+            edit = lambda: self.bot.edit_message_text(
+                chat_id=self.chat_id,
+                message_id=message_id,
+                text=self.format_post(post),
+                parse_mode=ParseMode.HTML,
+                disable_web_page_preview=False
+            )
+            
+        try:
+            # Mesmos limites dos envios, mas atrás de qualquer post novo do chat
+            await self.send_queue.submit(self.chat_id, edit, priority=TelegramSendQueue.EDIT_PRIORITY)
+        except BadRequest as e:
+            if "not modified" not in str(e).lower():
+                # Mensagem apagada ou não editável: enviar uma nova
+                self.logger.warning(f"Não foi possível editar mensagem {message_id}: {e}")
+                return None
+        except Exception as e:
+            return DispatchResult(success=False, channel=self.channel_name, error_message=str(e))
+            
+        self.sent_messages.update_price(key, post.price)
+        self.logger.info(f"Mensagem Telegram {message_id} editada: novo preço do post {post.id}")
+        return DispatchResult(success=True, channel=self.channel_name, external_id=str(message_id))
+        
+    def _price_changed(self, post: PostContent) -> bool:
+        entry = self.sent_messages.get(offer_key(post.title, post.store))
+        return bool(entry) and entry["price"] != post.price
+        
+    def is_repeat(self, post: PostContent) -> bool:
+        """Produto já enviado com outro preço não é repetição: vira edição"""
+        return super().is_repeat(post) and not self._price_changed(post)
+        
+    async def send_digest(self, posts: List[PostContent], timeout: Optional[float] = None) -> List[DispatchResult]:
+        """
+        Envia várias ofertas agrupadas, gastando menos mensagens do limite do chat
+        
+        Com imagens habilitadas, as ofertas com imagem vão em álbuns (até 10
+        fotos, cada uma com a legenda da sua oferta); as demais vão em
+        mensagens de texto com várias ofertas até o limite de 4096 caracteres.
+        Cada oferta continua com seu próprio link curto, então os cliques são
+        atribuídos a ela. Passa pelo anti-repetição, pelo circuit breaker e
+        pelas métricas como um dispatch.
+        
+        Returns:
+            Um DispatchResult por post, na mesma ordem, com o message_id da
+            mensagem (ou foto do álbum) em que a oferta saiu
+        """
+        return await self.dispatch_many(posts, timeout=timeout)
+        
+    async def send_many(self, posts: List[PostContent]) -> List[DispatchResult]:
+        """Envia as ofertas como resumo (álbuns e mensagens com várias ofertas)"""
+        if len(posts) == 1:
+            return [await self.send(posts[0])]
+        if not self.bot or not self.chat_id:
+            return [
+                DispatchResult(success=False, channel=self.channel_name, error_message="Cliente Telegram não configurado")
+                for _ in posts
+            ]
+            
+        results: List[Optional[DispatchResult]] = [None] * len(posts)
+        
+        # Preço mudou num post recente: editar a mensagem dele quando possível
+        for i, post in enumerate(posts):
+            if self._price_changed(post):
+                results[i] = await self.update(post)
+        text_indexes = [i for i, result in enumerate(results) if result is None]
+        
+        if self.send_images:
+            with_image = [i for i in text_indexes if posts[i].image_url]
+            prepared = await get_media_pipeline().prepare_many(
+                [posts[i].image_url for i in with_image], self.channel_name
+            )
+            album = [(i, media) for i, media in zip(with_image, prepared) if media is not None]
+            if len(album) >= 2:
+                sent = set()
+                for start in range(0, len(album), self.MAX_MEDIA_GROUP):
+                    chunk = album[start:start + self.MAX_MEDIA_GROUP]
+                    if len(chunk) == 1:
+                        break  # álbum precisa de ao menos 2 fotos; a sobra vai como texto
+                    album_results = await self._send_album([(posts[i], media) for i, media in chunk])
+                    for (i, _), result in zip(chunk, album_results):
+                        results[i] = result
+                        sent.add(i)
+                text_indexes = [i for i in text_indexes if i not in sent]
+                
+        offset = 0
+        for chunk in self._pack_digest([posts[i] for i in text_indexes]):
+            chunk_indexes = text_indexes[offset:offset + len(chunk)]
+            for i, result in zip(chunk_indexes, await self._send_text_digest(chunk)):
+                results[i] = result
+            offset += len(chunk)
+            
+        return results
+        
+    def _pack_digest(self, posts: List[PostContent]) -> List[List[PostContent]]:
+        """Divide as ofertas em mensagens que cabem no limite de caracteres"""
+        chunks: List[List[PostContent]] = []
+        current: List[PostContent] = []
+        length = len(self._digest_header()) + len(self._digest_footer())
+        for post in posts:
+            item_length = len(self.format_digest_item(post)) + 2
+            if current and length + item_length > self.MAX_MESSAGE_LENGTH:
+                chunks.append(current)
+                current = []
+                length = len(self._digest_header()) + len(self._digest_footer())
+            current.append(post)
+            length += item_length
+        if current:
+            chunks.append(current)
+        return chunks
+        
+    @staticmethod
+    def _digest_header() -> str:
+        return "🔥 <b>OFERTAS DO MOMENTO</b>"
+        
+    @staticmethod
+    def _digest_footer() -> str:
+        return "━━━━━━━━━━━━━━━━━\n📲 @manupromocao"
+        
+    async def _send_text_digest(self, posts: List[PostContent]) -> List[DispatchResult]:
+        """Envia uma mensagem com várias ofertas; todas recebem o mesmo message_id"""
+        text = "\n\n".join(
+            [self._digest_header()] + [self.format_digest_item(p) for p in posts] + [self._digest_footer()]
+        )
+        try:
+            message = await self.send_queue.submit(
+                self.chat_id,
+                lambda: self.bot.send_message(
+                    chat_id=self.chat_id,
+                    text=text,
+                    parse_mode=ParseMode.HTML,
+                    disable_web_page_preview=True
+                )
+            )
+        except Exception as e:
+            self.logger.error(f"Erro ao enviar resumo Telegram: {e}")
+            return [DispatchResult(success=False, channel=self.channel_name, error_message=str(e)) for _ in posts]
+            
+        if message is None:
+            return [
+                DispatchResult(success=False, channel=self.channel_name, error_message="Resposta vazia do Telegram")
+                for _ in posts
+            ]
+            
+        self.logger.info(f"Resumo Telegram enviado com {len(posts)} ofertas: {message.message_id}")
+        for post in posts:
+            self.sent_messages.put(
+                offer_key(post.title, post.store), str(message.message_id), post.price,
+                kind="text", post_id=post.id, digest=True
+            )
+        return [
+            DispatchResult(success=True, channel=self.channel_name, external_id=str(message.message_id))
+            for _ in posts
+        ]
+        
+    async def _send_album(self, items) -> List[DispatchResult]:
+        """Envia um álbum; cada foto (e seu message_id) corresponde a uma oferta"""
+        media_pipeline = get_media_pipeline()
+        
+        async def send():
+            group = []
+            for post, media in items:
+                photo = media_pipeline.get_media_id(self.channel_name, media.content_hash)
+                if not photo:
+                    with open(media.path, 'rb') as f:
+                        photo = f.read()
+                group.append(InputMediaPhoto(
+                    media=photo,
+                    caption=self.format_digest_item(post)[:self.MAX_CAPTION_LENGTH],
+                    parse_mode=ParseMode.HTML
+                ))
+            return await self.bot.send_media_group(chat_id=self.chat_id, media=group)
+            
+        try:
+            messages = await self.send_queue.submit(self.chat_id, send, cost=len(items))
+        except Exception as e:
+            self.logger.error(f"Erro ao enviar álbum Telegram: {e}")
+            return [DispatchResult(success=False, channel=self.channel_name, error_message=str(e)) for _ in items]
+            
+        results = []
+        for (post, media), message in zip(items, messages):
+            if message.photo:
+                media_pipeline.remember_media_id(self.channel_name, media.content_hash, message.photo[-1].file_id)
+            self.sent_messages.put(
+                offer_key(post.title, post.store), str(message.message_id), post.price,
+                kind="photo", post_id=post.id, digest=True
+            )
+            results.append(DispatchResult(success=True, channel=self.channel_name, external_id=str(message.message_id)))
+        self.logger.info(f"Álbum Telegram enviado com {len(items)} ofertas")
+        return results
+
 
 # Função helper para uso direto
 async def send_to_telegram(post_data: dict, config: dict = None) -> DispatchResult:
@@ -189,13 +510,14 @@ async def send_to_telegram(post_data: dict, config: dict = None) -> DispatchResu
     
     Args:
         post_data: Dicionário com dados do post
-        config: Configuração opcional (usa env vars se não fornecido)
+        config: Configuração opcional (usa env vars se não fornecido); só vale
+            na primeira chamada, quando o dispatcher compartilhado é criado
         
     Returns:
         DispatchResult com o resultado do envio
     """
-    config = config or {}
-    dispatcher = TelegramDispatcher(config)
+    from .registry import get_registry
+    dispatcher = get_registry(config).get(TelegramDispatcher.channel_name)
     
     post = PostContent(
         id=post_data['id'],
@@ -211,4 +533,4 @@ async def send_to_telegram(post_data: dict, config: dict = None) -> DispatchResu
         image_url=post_data.get('image_url')
     )
     
-    return await dispatcher.send(post)
+    return await dispatcher.dispatch(post)
@@ -0,0 +1,186 @@
+"""
+Fila de envio do Telegram com controle de flood
+
+O Telegram aceita cerca de 30 mensagens/s no total e 20 mensagens/min no
+mesmo grupo/canal. A fila passa cada envio por um token bucket global e
+outro por chat, então uma rajada de carga é espalhada no ritmo que a API
+aceita. Quando mesmo assim chega um RetryAfter, o chat é pausado pelo
+tempo pedido e a mensagem volta para a frente da fila. Um álbum conta uma
+mensagem por item.
+
+Edições de mensagens já enviadas gastam os mesmos buckets (o limite do
+Telegram vale para qualquer chamada no chat), mas com prioridade menor:
+só saem quando não há post novo aguardando naquele chat.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, Optional
+
+from .rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+try:
+    from telegram.error import RetryAfter
+except ImportError:
+    RetryAfter = None
+
+
+class TelegramSendQueue:
+    """Fila por chat com token buckets global e por chat"""
+
+    GLOBAL_RATE = 30          # mensagens por segundo (todas as conversas)
+    CHAT_RATE = 20 / 60       # mensagens por segundo no mesmo chat
+    CHAT_BURST = 3
+    MAX_RETRIES = 3
+    SEND_PRIORITY = 0
+    EDIT_PRIORITY = 1
+
+    def __init__(
+        self,
+        global_rate: float = GLOBAL_RATE,
+        chat_rate: float = CHAT_RATE,
+        chat_burst: float = CHAT_BURST,
+    ):
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self._chat_buckets: Dict[str, TokenBucket] = {}
+        self._queues: Dict[str, asyncio.PriorityQueue] = {}
+        self._sequence = itertools.count()
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._retry_front: Dict[str, list] = {}
+        self.sent = 0
+        self.retried = 0
+        self.last_wait = 0.0
+        self._total_wait = 0.0
+
+    # ==================== MÉTRICAS ====================
+
+    @property
+    def backlog(self) -> int:
+        """Mensagens aguardando envio em todos os chats"""
+        return sum(q.qsize() for q in self._queues.values()) + sum(len(r) for r in self._retry_front.values())
+
+    @property
+    def average_wait(self) -> float:
+        """Tempo médio (s) entre entrar na fila e ser enviada"""
+        return self._total_wait / self.sent if self.sent else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "backlog": self.backlog,
+            "sent": self.sent,
+            "retried": self.retried,
+            "last_wait": self.last_wait,
+            "average_wait": self.average_wait,
+        }
+
+    # ==================== ENVIO ====================
+
+    async def submit(
+        self,
+        chat_id: str,
+        send: Callable[[], Awaitable],
+        cost: int = 1,
+        priority: int = SEND_PRIORITY,
+    ):
+        """
+        Enfileira um envio de `cost` mensagens (itens de um álbum) e aguarda seu resultado
+
+        Dentro do chat saem primeiro os de menor `priority` e, entre iguais,
+        na ordem de chegada.
+        """
+        chat_id = str(chat_id)
+        if chat_id not in self._queues:
+            self._queues[chat_id] = asyncio.PriorityQueue()
+            self._retry_front[chat_id] = []
+            self._chat_buckets[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+        if chat_id not in self._workers or self._workers[chat_id].done():
+            self._workers[chat_id] = asyncio.create_task(self._worker(chat_id))
+
+        future = asyncio.get_running_loop().create_future()
+        item = (send, future, time.monotonic(), 0, cost)
+        await self._queues[chat_id].put((priority, next(self._sequence), item))
+        return await future
+
+    @staticmethod
+    def _retry_seconds(error) -> float:
+        retry_after = error.retry_after
+        if isinstance(retry_after, timedelta):
+            return retry_after.total_seconds()
+        return float(retry_after)
+
+    async def _worker(self, chat_id: str):
+        queue = self._queues[chat_id]
+        retry_front = self._retry_front[chat_id]
+        chat_bucket = self._chat_buckets[chat_id]
+
+        while True:
+            if retry_front:
+                send, future, enqueued_at, attempts, cost = retry_front.pop(0)
+            else:
+                _, _, (send, future, enqueued_at, attempts, cost) = await queue.get()
+            if future.cancelled():
+                continue
+
+            try:
+                await chat_bucket.acquire(cost)
+                await self.global_bucket.acquire(cost)
+            except asyncio.CancelledError:
+                # close() no meio da espera: a mensagem já saiu da fila
+                future.cancel()
+                raise
+
+            # O chamador pode ter desistido (timeout) enquanto esperava o
+            # token: enviar agora duplicaria a mensagem quando ele tentar de novo
+            if future.cancelled():
+                chat_bucket.refund(cost)
+                self.global_bucket.refund(cost)
+                continue
+
+            try:
+                result = await send()
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                if RetryAfter is not None and isinstance(e, RetryAfter) and attempts < self.MAX_RETRIES:
+                    seconds = self._retry_seconds(e)
+                    logger.warning(f"Flood control no chat {chat_id}: aguardando {seconds:.0f}s")
+                    chat_bucket.pause(seconds)
+                    self.retried += 1
+                    retry_front.insert(0, (send, future, enqueued_at, attempts + 1, cost))
+                    continue
+                if not future.done():
+                    future.set_exception(e)
+                continue
+
+            self.sent += 1
+            self.last_wait = time.monotonic() - enqueued_at
+            self._total_wait += self.last_wait
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self):
+        """Cancela os workers e as mensagens pendentes (quem aguarda recebe CancelledError)"""
+        for task in self._workers.values():
+            task.cancel()
+        for task in self._workers.values():
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._workers.clear()
+
+        for chat_id, queue in self._queues.items():
+            pending = self._retry_front[chat_id]
+            while not queue.empty():
+                pending.append(queue.get_nowait()[2])
+            for _, future, *_ in pending:
+                future.cancel()
+            pending.clear()
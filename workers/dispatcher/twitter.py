@@ -8,9 +8,14 @@ Requisitos:
 """
 
 import os
+import time
+import asyncio
 import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from .base import BaseDispatcher, PostContent, DispatchResult
+from .media import get_media_pipeline
 
 logger = logging.getLogger(__name__)
 
@@ -22,16 +27,39 @@ except ImportError:
     TWEEPY_AVAILABLE = False
     logger.warning("tweepy não instalado. Execute: pip install tweepy")
 
+# Cliente assíncrono do tweepy (depende de aiohttp, async_lru e oauthlib;
+# sem eles o tweepy levanta TweepyException em vez de ImportError)
+try:
+    from tweepy.asynchronous import AsyncClient
+    ASYNC_CLIENT_AVAILABLE = True
+except Exception:
+    ASYNC_CLIENT_AVAILABLE = False
+
 
 class TwitterDispatcher(BaseDispatcher):
-    """Dispatcher para Twitter/X usando API v2"""
+    """
+    Dispatcher para Twitter/X usando API v2
+    
+    Usa o AsyncClient do tweepy quando disponível; senão o cliente síncrono
+    roda numa thread dedicada, para nunca bloquear o event loop. O limite de
+    requisições é tratado aqui (e não pelo wait_on_rate_limit do tweepy):
+    a espera é um asyncio.sleep, então os outros canais continuam enviando.
+    """
     
     channel_name = "TWITTER"
     MAX_TWEET_LENGTH = 280
+    MAX_RATE_LIMIT_WAIT = 60  # segundos; acima disso o envio falha na hora
     
     def __init__(self, config: dict):
         super().__init__(config)
         self.client: Optional['tweepy.Client'] = None
+        self._is_async = False
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._rate_limited_until = 0.0
+        self._media_api: Optional['tweepy.API'] = None
+        send_images = config.get('twitter_send_images', os.getenv('TWITTER_SEND_IMAGES', 'false'))
+        self.send_images = str(send_images).lower() == 'true'
+        self.max_rate_limit_wait = float(config.get('twitter_max_rate_limit_wait', self.MAX_RATE_LIMIT_WAIT))
         self._setup_client()
         
     def _setup_client(self):
@@ -51,19 +79,91 @@ class TwitterDispatcher(BaseDispatcher):
             self.logger.warning("Credenciais do Twitter incompletas")
             return
             
+        credentials = dict(
+            bearer_token=bearer_token,
+            consumer_key=api_key,
+            consumer_secret=api_secret,
+            access_token=access_token,
+            access_token_secret=access_secret,
+            wait_on_rate_limit=False,
+        )
+            
         try:
-            self.client = tweepy.Client(
-                bearer_token=bearer_token,
-                consumer_key=api_key,
-                consumer_secret=api_secret,
-                access_token=access_token,
-                access_token_secret=access_secret,
-                wait_on_rate_limit=True
-            )
+            # Upload de mídia só existe na API v1.1 (cliente síncrono)
+            self._media_api = tweepy.API(tweepy.OAuth1UserHandler(api_key, api_secret, access_token, access_secret))
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="twitter")
+            
+            if ASYNC_CLIENT_AVAILABLE:
+                self.client = AsyncClient(**credentials)
+                self._is_async = True
+            else:
+                self.client = tweepy.Client(**credentials)
             self.logger.info("Cliente Twitter configurado com sucesso")
         except Exception as e:
             self.logger.error(f"Erro ao configurar cliente Twitter: {e}")
             
+    async def _call(self, method: str, **kwargs):
+        """Chama um método do cliente sem bloquear o event loop"""
+        if self._is_async:
+            return await getattr(self.client, method)(**kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            functools.partial(getattr(self.client, method), **kwargs)
+        )
+        
+    async def _wait_rate_limit(self):
+        """Aguarda (cooperativamente) o fim de um rate limit já conhecido"""
+        wait = self._rate_limited_until - time.time()
+        if wait <= 0:
+            return
+        if wait > self.max_rate_limit_wait:
+            raise RuntimeError(f"Rate limit do Twitter: liberado em {int(wait)}s")
+        self.logger.warning(f"Rate limit do Twitter, aguardando {int(wait)}s")
+        await asyncio.sleep(wait)
+        
+    async def _call_with_rate_limit(self, method: str, **kwargs):
+        """Chama o cliente respeitando o rate limit informado pela API"""
+        await self._wait_rate_limit()
+        try:
+            return await self._call(method, **kwargs)
+        except tweepy.TooManyRequests as e:
+            headers = getattr(getattr(e, 'response', None), 'headers', None) or {}
+            reset = headers.get('x-rate-limit-reset')
+            self._rate_limited_until = float(reset) + 1 if reset else time.time() + self.max_rate_limit_wait
+            await self._wait_rate_limit()
+            return await self._call(method, **kwargs)
+            
+    async def _upload_media(self, post: PostContent) -> Optional[str]:
+        """Sobe a imagem do post (uma vez por imagem) e retorna o media id"""
+        media_pipeline = get_media_pipeline()
+        media = await media_pipeline.prepare(post.image_url, self.channel_name)
+        if media is None or self._media_api is None:
+            return None
+            
+        async def upload(prepared) -> str:
+            loop = asyncio.get_running_loop()
+            uploaded = await loop.run_in_executor(
+                self._executor,
+                functools.partial(self._media_api.media_upload, filename=prepared.path)
+            )
+            return str(uploaded.media_id)
+            
+        try:
+            return await media_pipeline.upload_once(self.channel_name, media, upload)
+        except Exception as e:
+            self.logger.error(f"Erro ao subir imagem para o Twitter: {e}")
+            return None
+            
+    async def close(self):
+        """Fecha a sessão HTTP do cliente assíncrono ou a thread do síncrono"""
+        if self._is_async and self.client and getattr(self.client, 'session', None):
+            await self.client.session.close()
+        if self._executor:
+            self._executor.shutdown(wait=False)
+        await super().close()
+            
     async def validate_config(self) -> bool:
         """Valida se as credenciais do Twitter estão configuradas"""
         if not TWEEPY_AVAILABLE:
@@ -72,7 +172,7 @@ class TwitterDispatcher(BaseDispatcher):
             return False
         try:
             # Tenta obter informações do usuário autenticado
-            me = self.client.get_me()
+            me = await self._call_with_rate_limit("get_me")
             if me and me.data:
                 self.logger.info(f"Twitter autenticado como @{me.data.username}")
                 return True
@@ -165,8 +265,12 @@ class TwitterDispatcher(BaseDispatcher):
             self.logger.info(f"Enviando tweet para post {post.id}")
             self.logger.debug(f"Tweet: {tweet_text}")
             
-            # Envia o tweet
-            response = self.client.create_tweet(text=tweet_text)
+            # Envia o tweet (com imagem, se habilitado)
+            media_id = await self._upload_media(post) if self.send_images and post.image_url else None
+            if media_id:
+                response = await self._call_with_rate_limit("create_tweet", text=tweet_text, media_ids=[media_id])
+            else:
+                response = await self._call_with_rate_limit("create_tweet", text=tweet_text)
             
             if response and response.data:
                 tweet_id = response.data['id']
@@ -208,13 +312,14 @@ async def send_to_twitter(post_data: dict, config: dict = None) -> DispatchResul
     
     Args:
         post_data: Dicionário com dados do post
-        config: Configuração opcional (usa env vars se não fornecido)
+        config: Configuração opcional (usa env vars se não fornecido); só vale
+            na primeira chamada, quando o dispatcher compartilhado é criado
         
     Returns:
         DispatchResult com o resultado do envio
     """
-    config = config or {}
-    dispatcher = TwitterDispatcher(config)
+    from .registry import get_registry
+    dispatcher = get_registry(config).get(TwitterDispatcher.channel_name)
     
     post = PostContent(
         id=post_data['id'],
@@ -230,4 +335,4 @@ async def send_to_twitter(post_data: dict, config: dict = None) -> DispatchResul
         image_url=post_data.get('image_url')
     )
     
-    return await dispatcher.send(post)
+    return await dispatcher.dispatch(post)
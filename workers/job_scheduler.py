@@ -0,0 +1,150 @@
+"""
+Scheduler dos workers com APScheduler
+
+- Cada job dispara no segundo exato do horário (sem polling de 60s)
+- Um job nunca roda duas vezes ao mesmo tempo; disparos atrasados (pool
+  ocupado) se acumulam em uma única execução (coalesce)
+- Jobs do mesmo grupo (ex.: pipeline e publicador) rodam um depois do outro
+  em vez de competir pelas mesmas ofertas
+- Pool limitado de threads para os jobs
+- Recuperação de disparos perdidos: o horário da última execução de cada
+  job fica em disco; ao iniciar, um disparo perdido dentro da tolerância é
+  executado imediatamente
+"""
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from loguru import logger
+
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.triggers.combining import OrTrigger
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.util import undefined
+
+from config import SCHEDULER_MAX_WORKERS, SCHEDULER_MISFIRE_GRACE, SCHEDULER_STATE_PATH
+
+
+class JobScheduler:
+    """Agenda jobs diários em horários fixos com single-flight e recuperação"""
+
+    def __init__(
+        self,
+        max_workers: int = SCHEDULER_MAX_WORKERS,
+        misfire_grace: int = SCHEDULER_MISFIRE_GRACE,
+        state_path: str = SCHEDULER_STATE_PATH,
+    ):
+        self.misfire_grace = misfire_grace
+        self.state_path = state_path
+        self.scheduler = BlockingScheduler(
+            executors={"default": ThreadPoolExecutor(max_workers)},
+            job_defaults={
+                "coalesce": True,
+                "max_instances": 1,
+                "misfire_grace_time": misfire_grace,
+            },
+        )
+        self._jobs: Dict[str, Tuple[Callable, OrTrigger, List[str]]] = {}
+        self._group_locks: Dict[str, threading.Lock] = {}
+        self._state_lock = threading.Lock()
+        self._last_runs: Dict[str, str] = self._load_state()
+
+    # ==================== ESTADO ====================
+
+    def _load_state(self) -> Dict[str, str]:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.error(f"Erro ao ler estado do scheduler: {e}")
+            return {}
+
+    def _mark_run(self, job_id: str, fired_at: datetime):
+        with self._state_lock:
+            self._last_runs[job_id] = fired_at.isoformat()
+            directory = os.path.dirname(self.state_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.state_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._last_runs, f)
+            os.replace(tmp_path, self.state_path)
+
+    # ==================== JOBS ====================
+
+    def add_daily_job(self, job_id: str, fn: Callable, times: List[str], group: Optional[str] = None):
+        """
+        Agenda fn todos os dias nos horários "HH:MM"
+
+        Args:
+            group: jobs do mesmo grupo nunca rodam ao mesmo tempo
+        """
+        lock = self._group_locks.setdefault(group, threading.Lock()) if group else None
+
+        def run():
+            if lock is not None and not lock.acquire(blocking=False):
+                logger.info(f"⏳ {job_id} aguardando outro job do grupo {group}")
+                lock.acquire()
+            try:
+                self._mark_run(job_id, datetime.now())
+                logger.info(f"▶️  Job {job_id} iniciado")
+                fn()
+            except Exception as e:
+                logger.error(f"❌ Erro no job {job_id}: {e}")
+            finally:
+                if lock is not None:
+                    lock.release()
+
+        # Um único job por id (todos os horários dividem o mesmo single-flight)
+        trigger = OrTrigger([
+            CronTrigger(hour=int(t.split(":")[0]), minute=int(t.split(":")[1])) for t in times
+        ])
+        self._jobs[job_id] = (run, trigger, times)
+
+    def _missed_fire(self, job_id: str, now: datetime) -> Optional[datetime]:
+        """Último horário do job que passou sem execução, se dentro da tolerância"""
+        last_run = self._last_runs.get(job_id)
+        if not last_run:
+            return None
+
+        candidates = []
+        for day in (now.date() - timedelta(days=1), now.date()):
+            for t in self._jobs[job_id][2]:
+                hour, minute = map(int, t.split(":"))
+                fire = datetime.combine(day, datetime.min.time()).replace(hour=hour, minute=minute)
+                if fire <= now:
+                    candidates.append(fire)
+        if not candidates:
+            return None
+
+        latest = max(candidates)
+        if latest <= datetime.fromisoformat(last_run):
+            return None
+        if (now - latest).total_seconds() > self.misfire_grace:
+            logger.warning(f"Disparo de {job_id} às {latest:%H:%M} perdido (fora da tolerância)")
+            return None
+        return latest
+
+    def start(self):
+        """Recupera disparos perdidos e bloqueia executando os jobs"""
+        now = datetime.now()
+        for job_id, (run, trigger, _) in self._jobs.items():
+            missed = self._missed_fire(job_id, now)
+            if missed:
+                logger.info(f"⏪ Recuperando disparo de {job_id} das {missed:%H:%M}")
+            self.scheduler.add_job(
+                run, trigger, id=job_id, name=job_id,
+                # Disparo perdido roda já; depois o job segue os horários normais
+                next_run_time=now if missed else undefined,
+            )
+
+        for job in self.scheduler.get_jobs():
+            logger.info(f"   {job.name}: {', '.join(self._jobs[job.id][2])}")
+        self.scheduler.start()
+
+    def shutdown(self):
+        self.scheduler.shutdown(wait=False)
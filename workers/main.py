@@ -4,34 +4,95 @@ Orquestrador Principal dos Workers Python
 Executa os workers de coleta, validação e publicação
 em sequência ou de forma agendada.
 """
+import asyncio
 import schedule
 import time
 from datetime import datetime
+from typing import Dict, Optional, Set
 from loguru import logger
 
-from collector.main import run_collector
-from validator.main import run_validator
-from publisher.main import run_publisher
+from collector.main import run_collector, iter_collected_offers, OfferSaver
+from validator.main import run_validator, validate_and_update, OfferProcessor
+from publisher.main import run_publisher, start_publisher_run, publisher_stages, publish_pending, finish_publisher_run
+from publisher.pipeline import Pipeline, Stage
+from publisher.prewarm import run_prewarm_loop, start_prewarm_thread
+from config import (
+    PREWARM_ENABLED,
+    PIPELINE_STREAMING,
+    PIPELINE_SAVE_WORKERS,
+    PIPELINE_VALIDATE_WORKERS,
+    PUBLISHER_QUEUE_SIZE,
+    WORKER_CYCLE_INTERVAL,
+    METRICS_PORT,
+    METRICS_HOST,
+)
+from api_client import get_api_client
+from metrics import start_metrics_server
 
 
-def run_pipeline():
+def run_streaming_stages():
+    """
+    Coleta, validação e publicação em fluxo contínuo
+    
+    Cada oferta coletada segue direto para validação e criação do draft
+    por filas limitadas (backpressure), sem esperar as demais etapas. Ao
+    fim do fluxo, as ofertas que já estavam na base (backlog) passam pela
+    validação e pela publicação, como no modo em etapas.
+    
+    Returns:
+        Tuple[int, int, int]: (coletadas, validadas, drafts criados)
+    """
+    saver = OfferSaver()
+    processor = OfferProcessor()
+    creator = start_publisher_run()
+    streamed: Set[str] = set()
+    
+    def validate(offer: Dict) -> Optional[Dict]:
+        streamed.add(offer.get("id"))
+        return validate_and_update(processor, offer)
+    
+    pipeline = Pipeline(
+        [
+            Stage("save", saver.create_offer, workers=PIPELINE_SAVE_WORKERS),
+            Stage("validate", validate, workers=PIPELINE_VALIDATE_WORKERS),
+        ] + publisher_stages(creator),
+        queue_size=PUBLISHER_QUEUE_SIZE,
+    )
+    draft_ids = pipeline.run(iter_collected_offers())
+    
+    # Backlog: ofertas anteriores a esta coleta (as do fluxo já foram validadas e têm draft)
+    logger.info("Validando e publicando o backlog")
+    validated = pipeline.processed["validate"] + run_validator(offer_filter=lambda o: o.get("id") not in streamed)
+    published = len(draft_ids) + publish_pending(creator)
+    finish_publisher_run(creator)
+    
+    return pipeline.processed["save"], validated, published
+
+
+def run_pipeline(streaming: bool = PIPELINE_STREAMING):
     """Executa o pipeline completo: coleta → validação → publicação"""
     logger.info("=" * 60)
     logger.info(f"🚀 Iniciando pipeline - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     logger.info("=" * 60)
     
     try:
-        # 1. Coletar ofertas
-        logger.info("\n📥 ETAPA 1: Coleta de ofertas")
-        collected = run_collector()
-        
-        # 2. Validar ofertas
-        logger.info("\n✅ ETAPA 2: Validação de ofertas")
-        validated = run_validator()
-        
-        # 3. Criar drafts (posts)
-        logger.info("\n📝 ETAPA 3: Criação de drafts")
-        published = run_publisher()
+        if streaming:
+            logger.info("\n🌊 Coleta, validação e drafts em fluxo contínuo")
+            started = time.monotonic()
+            collected, validated, published = run_streaming_stages()
+            logger.info(f"Fluxo concluído em {time.monotonic() - started:.1f}s")
+        else:
+            # 1. Coletar ofertas
+            logger.info("\n📥 ETAPA 1: Coleta de ofertas")
+            collected = run_collector()
+            
+            # 2. Validar ofertas
+            logger.info("\n✅ ETAPA 2: Validação de ofertas")
+            validated = run_validator()
+            
+            # 3. Criar drafts (posts)
+            logger.info("\n📝 ETAPA 3: Criação de drafts")
+            published = run_publisher()
         
         logger.info("\n" + "=" * 60)
         logger.info("📊 RESUMO DO PIPELINE:")
@@ -39,6 +100,7 @@ def run_pipeline():
         logger.info(f"   - Ofertas validadas: {validated}")
         logger.info(f"   - Drafts criados: {published}")
         logger.info("=" * 60)
+        get_api_client().log_latency()
         
         return {
             "collected": collected,
@@ -63,29 +125,175 @@ def run_publisher_only():
     return run_publisher()
 
 
+# Pipeline completo: 4x ao dia (antes das cargas principais)
+PIPELINE_TIMES = ["07:00", "10:00", "13:00", "17:00"]
+
+# Publicador adicional: 1h antes de cada carga
+PUBLISHER_TIMES = ["07:30", "10:30", "13:30", "17:30", "21:30"]
+
+
 def setup_scheduler():
-    """Configura agendamento dos workers"""
-    
-    # Pipeline completo: 4x ao dia (antes das cargas principais)
-    schedule.every().day.at("07:00").do(run_pipeline)
-    schedule.every().day.at("10:00").do(run_pipeline)
-    schedule.every().day.at("13:00").do(run_pipeline)
-    schedule.every().day.at("17:00").do(run_pipeline)
-    
-    # Publicador adicional: 1h antes de cada carga
-    schedule.every().day.at("07:30").do(run_publisher_only)
-    schedule.every().day.at("10:30").do(run_publisher_only)
-    schedule.every().day.at("13:30").do(run_publisher_only)
-    schedule.every().day.at("17:30").do(run_publisher_only)
-    schedule.every().day.at("21:30").do(run_publisher_only)
+    """Configura agendamento dos workers (modo legado, sem APScheduler)"""
+    for at in PIPELINE_TIMES:
+        schedule.every().day.at(at).do(run_pipeline)
+    for at in PUBLISHER_TIMES:
+        schedule.every().day.at(at).do(run_publisher_only)
     
     logger.info("📅 Scheduler configurado:")
-    logger.info("   Pipeline completo: 07:00, 10:00, 13:00, 17:00")
-    logger.info("   Publicador: 07:30, 10:30, 13:30, 17:30, 21:30")
+    logger.info(f"   Pipeline completo: {', '.join(PIPELINE_TIMES)}")
+    logger.info(f"   Publicador: {', '.join(PUBLISHER_TIMES)}")
 
 
 def run_scheduler():
-    """Executa o scheduler em loop"""
+    """Executa o scheduler"""
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT, METRICS_HOST)
+    
+    # Copy e canais das próximas ofertas ficam prontos antes de cada carga
+    if PREWARM_ENABLED:
+        start_prewarm_thread()
+    
+    try:
+        from job_scheduler import JobScheduler
+    except ImportError:
+        logger.warning("APScheduler não instalado, usando o scheduler legado (polling de 60s)")
+        run_legacy_scheduler()
+        return
+    
+    scheduler = JobScheduler()
+    # Pipeline e publicador criam drafts das mesmas ofertas: rodam um após o outro
+    scheduler.add_daily_job("pipeline", run_pipeline, PIPELINE_TIMES, group="publish")
+    scheduler.add_daily_job("publisher", run_publisher_only, PUBLISHER_TIMES, group="publish")
+    
+    logger.info("🔄 Scheduler iniciado. Pressione Ctrl+C para parar.")
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        scheduler.shutdown()
+
+
+def run_worker_node():
+    """
+    Executa este processo como um nó do modo distribuído
+    
+    Vários nós (na mesma máquina ou não, com o mesmo COORDINATION_URL)
+    dividem as fontes de coleta e as faixas de ofertas por lease. A cada
+    ciclo o nó coleta só as suas fontes e valida/publica só as ofertas das
+    suas faixas; se um nó cai, os outros assumem a parte dele.
+    """
+    from coordination import ShardCoordinator
+    
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT, METRICS_HOST)
+    
+    coordinator = ShardCoordinator()
+    coordinator.start()
+    logger.info(f"🧩 Worker {coordinator.worker_id} iniciado. Pressione Ctrl+C para parar.")
+    
+    try:
+        while True:
+            started = time.monotonic()
+            # Cada etapa isolada: uma falha na coleta não impede validar/publicar o backlog
+            try:
+                sources = coordinator.owned_sources()
+                if sources:
+                    logger.info("\n📥 Coleta das fontes deste worker")
+                    run_collector(categories=sources)
+            except Exception as e:
+                logger.error(f"❌ Erro na coleta do worker: {e}")
+            
+            try:
+                logger.info("\n✅ Validação das ofertas deste worker")
+                run_validator(offer_filter=coordinator.owns_offer)
+            except Exception as e:
+                logger.error(f"❌ Erro na validação do worker: {e}")
+            
+            try:
+                logger.info("\n📝 Drafts das ofertas deste worker")
+                run_publisher(offer_filter=coordinator.owns_offer)
+            except Exception as e:
+                logger.error(f"❌ Erro na publicação do worker: {e}")
+            
+            get_api_client().log_latency()
+            time.sleep(max(WORKER_CYCLE_INTERVAL - (time.monotonic() - started), 0))
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        # Libera os shards na hora em vez de esperar o lease expirar
+        coordinator.stop()
+
+
+async def serve_outbox():
+    """
+    Envia os itens do outbox pelos canais, num único event loop
+    
+    Valida os canais na inicialização, traz para o outbox os envios
+    aprovados na plataforma (dos canais válidos), grava o resultado de cada
+    um de volta na API e fecha os clientes (e o pool de conexões de cada
+    canal) no shutdown.
+    """
+    from dispatcher import (
+        Outbox, OutboxWorker, DraftFeed, FanOutDispatcher, get_registry, close_registry, get_media_pipeline,
+    )
+    
+    registry = get_registry()
+    channels = await registry.validate_all()
+    if not any(channels.values()):
+        logger.warning("Nenhum canal válido: os envios aprovados ficam pendentes até a configuração ser corrigida")
+    
+    outbox = Outbox()
+    feed = DraftFeed(outbox, [channel for channel, valid in channels.items() if valid])
+    worker = OutboxWorker(outbox, FanOutDispatcher(registry).send_one, on_done=feed.report)
+    logger.info("📤 Dispatcher iniciado. Pressione Ctrl+C para parar.")
+    try:
+        await asyncio.gather(feed.run(), worker.run())
+    finally:
+        await close_registry()
+        await get_media_pipeline().close()
+        outbox.close()
+
+
+def run_dispatcher():
+    """Executa o envio do outbox até Ctrl+C"""
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT, METRICS_HOST)
+    try:
+        asyncio.run(serve_outbox())
+    except KeyboardInterrupt:
+        pass
+
+
+def run_profile(stage: str = "pipeline", sampling: bool = False):
+    """
+    Executa uma etapa sob profiling e grava os relatórios em PROFILE_DIR
+    
+    "pipeline" perfila coleta, validação e publicação separadamente (um
+    relatório por etapa); "stream" perfila o pipeline em fluxo contínuo.
+    """
+    from profiling import ProfileSession
+    
+    stages = {
+        "collect": run_collector,
+        "validate": run_validator,
+        "publish": run_publisher,
+        "stream": run_streaming_stages,
+    }
+    names = ["collect", "validate", "publish"] if stage == "pipeline" else [stage]
+    if any(name not in stages for name in names):
+        print(f"Etapa desconhecida: {stage}")
+        print("Etapas disponíveis: pipeline, " + ", ".join(stages))
+        return None
+    
+    session = ProfileSession(sampling=sampling)
+    for name in names:
+        session.run(name, stages[name])
+    get_api_client().log_latency()
+    logger.info(f"📂 Relatórios em {session.output_dir}")
+    return session.output_dir
+
+
+def run_legacy_scheduler():
+    """Executa o scheduler legado em loop"""
     setup_scheduler()
     
     logger.info("🔄 Scheduler iniciado. Pressione Ctrl+C para parar.")
@@ -108,7 +316,7 @@ if __name__ == "__main__":
         command = sys.argv[1]
         
         if command == "pipeline":
-            run_pipeline()
+            run_pipeline(streaming=PIPELINE_STREAMING or "--stream" in sys.argv)
         elif command == "collect":
             run_collector_only()
         elif command == "validate":
@@ -117,9 +325,18 @@ if __name__ == "__main__":
             run_publisher_only()
         elif command == "scheduler":
             run_scheduler()
+        elif command == "prewarm":
+            run_prewarm_loop()
+        elif command == "worker":
+            run_worker_node()
+        elif command == "dispatch":
+            run_dispatcher()
+        elif command == "profile":
+            args = [a for a in sys.argv[2:] if not a.startswith("--")]
+            run_profile(args[0] if args else "pipeline", sampling="--sample" in sys.argv)
         else:
             print(f"Comando desconhecido: {command}")
-            print("Comandos disponíveis: pipeline, collect, validate, publish, scheduler")
+            print("Comandos disponíveis: pipeline, collect, validate, publish, prewarm, scheduler, worker, dispatch, profile")
     else:
         # Executar pipeline por padrão
         run_pipeline()
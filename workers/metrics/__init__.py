@@ -0,0 +1,20 @@
+"""
+Métricas dos workers (contadores, gauges e histogramas)
+
+Registro único por processo, seguro para várias threads, que cada módulo
+usa para declarar suas métricas. O conteúdo pode ser exposto no formato
+texto do Prometheus por um endpoint HTTP local (METRICS_PORT).
+
+Uso:
+    from metrics import get_metrics
+
+    OFFERS_REJECTED = get_metrics().counter(
+        "promo_offers_rejected_total", "Ofertas rejeitadas na validação", ["reason"]
+    )
+    OFFERS_REJECTED.inc(reason="discount")
+
+O pacote dispatcher importa só metrics.registry (sem loguru nem servidor HTTP).
+"""
+
+from .registry import Counter, Gauge, Histogram, MetricsRegistry, DEFAULT_BUCKETS, get_metrics
+from .server import start_metrics_server
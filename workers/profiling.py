@@ -0,0 +1,223 @@
+"""
+Profiling das etapas dos workers
+
+Roda uma etapa (coleta, validação, publicação...) sob um profiler e grava
+os relatórios num diretório com data e hora:
+
+- modo completo: cProfile (em todas as threads da etapa) + tracemalloc,
+  com as funções mais caras, as linhas que mais alocam e o pico de memória
+- modo amostragem: uma thread lê as pilhas de todas as threads a cada
+  intervalo, sem instrumentar as chamadas; overhead baixo o bastante para
+  produção, ao custo de precisão em funções muito rápidas
+
+Arquivos por etapa:
+    <etapa>.cpu.txt        funções por tempo acumulado e próprio (cProfile)
+    <etapa>.prof           estatísticas brutas (snakeviz, pstats)
+    <etapa>.memory.txt     pico de memória e linhas que mais alocam (tracemalloc)
+    <etapa>.sampled.txt    funções mais vistas nas amostras (modo amostragem)
+    <etapa>.collapsed.txt  pilhas no formato do flamegraph.pl/speedscope
+    summary.txt            tempo total e pico de memória de cada etapa
+"""
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, List, Optional
+from loguru import logger
+
+from config import PROFILE_DIR, PROFILE_SAMPLE_INTERVAL, PROFILE_TOP
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Pico de memória residente do processo (MB), se disponível"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB, macOS em bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class _ThreadProfiles:
+    """Liga um cProfile em cada thread criada durante a etapa"""
+
+    def __init__(self):
+        self.profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def hook(self, frame, event, arg):
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+: o profiler da thread principal já vê todas as threads
+            return
+        with self._lock:
+            self.profiles.append(profile)
+
+
+class SamplingProfiler:
+    """Amostra as pilhas de todas as threads a cada `interval` segundos"""
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples = 0
+        self.own = Counter()        # função no topo da pilha
+        self.inclusive = Counter()  # função em qualquer ponto da pilha
+        self.stacks = Counter()     # pilha completa (raiz;...;topo)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _label(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _sample(self):
+        me = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == me:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame))
+                frame = frame.f_back
+            self.samples += 1
+            self.own[stack[0]] += 1
+            self.inclusive.update(set(stack))
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def report(self, top: int = PROFILE_TOP) -> str:
+        lines = [f"{self.samples} amostras a cada {self.interval * 1000:.1f} ms", ""]
+        for title, counts in (("Próprio (topo da pilha)", self.own), ("Inclusivo (na pilha)", self.inclusive)):
+            lines.append(f"== {title} ==")
+            for label, count in counts.most_common(top):
+                lines.append(f"{count / max(self.samples, 1):7.1%}  {count:7d}  {label}")
+            lines.append("")
+        return "\n".join(lines)
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+
+class ProfileSession:
+    """Roda etapas sob profiling e grava os relatórios no mesmo diretório"""
+
+    def __init__(self, output_dir: Optional[str] = None, sampling: bool = False,
+                 interval: float = PROFILE_SAMPLE_INTERVAL, top: int = PROFILE_TOP):
+        self.output_dir = output_dir or os.path.join(PROFILE_DIR, datetime.now().strftime("%Y%m%d-%H%M%S"))
+        self.sampling = sampling
+        self.interval = interval
+        self.top = top
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def _write(self, filename: str, content: str):
+        with open(os.path.join(self.output_dir, filename), 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def run(self, name: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Executa fn(*args, **kwargs) sob o profiler e grava os relatórios da etapa"""
+        logger.info(f"🔬 Profiling de {name} ({'amostragem' if self.sampling else 'cProfile + tracemalloc'})")
+        if self.sampling:
+            return self._run_sampled(name, fn, *args, **kwargs)
+        return self._run_profiled(name, fn, *args, **kwargs)
+
+    def _run_profiled(self, name: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        thread_profiles = _ThreadProfiles()
+        profile = cProfile.Profile()
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+
+        threading.setprofile(thread_profiles.hook)
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - start
+            threading.setprofile(None)
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            if not tracing:
+                tracemalloc.stop()
+
+            stats = pstats.Stats(profile)
+            for thread_profile in thread_profiles.profiles:
+                thread_profile.disable()
+                stats.add(thread_profile)
+            stats.dump_stats(os.path.join(self.output_dir, f"{name}.prof"))
+            self._write(f"{name}.cpu.txt", self._cpu_report(stats, elapsed, len(thread_profiles.profiles)))
+            self._write(f"{name}.memory.txt", self._memory_report(snapshot, current, peak))
+            self._summarize(name, elapsed, f"pico tracemalloc {peak / 1024 / 1024:.1f} MB")
+
+    def _run_sampled(self, name: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        sampler = SamplingProfiler(self.interval)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            sampler.stop()
+            elapsed = time.perf_counter() - start
+            self._write(f"{name}.sampled.txt", sampler.report(self.top))
+            self._write(f"{name}.collapsed.txt", sampler.collapsed())
+            rss = _peak_rss_mb()
+            self._summarize(name, elapsed, f"pico RSS {rss:.1f} MB" if rss is not None else "pico RSS indisponível")
+
+    def _cpu_report(self, stats: pstats.Stats, elapsed: float, threads: int) -> str:
+        out = io.StringIO()
+        out.write(f"Tempo total: {elapsed:.2f}s ({threads} threads além da principal)\n\n")
+        stats.stream = out
+        for sort in ("cumulative", "tottime"):
+            out.write(f"== Top {self.top} por {sort} ==\n")
+            stats.sort_stats(sort).print_stats(self.top)
+        return out.getvalue()
+
+    def _memory_report(self, snapshot: tracemalloc.Snapshot, current: int, peak: int) -> str:
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        lines = [
+            f"Pico de memória (tracemalloc): {peak / 1024 / 1024:.1f} MB",
+            f"Memória ainda alocada ao final: {current / 1024 / 1024:.1f} MB",
+            "",
+            f"== Top {self.top} linhas por memória alocada (ainda viva ao final) ==",
+        ]
+        for stat in snapshot.statistics("lineno")[:self.top]:
+            frame = stat.traceback[0]
+            lines.append(f"{stat.size / 1024:10.1f} KB  {stat.count:8d} blocos  {frame.filename}:{frame.lineno}")
+        return "\n".join(lines) + "\n"
+
+    def _summarize(self, name: str, elapsed: float, memory: str):
+        line = f"{name}: {elapsed:.2f}s, {memory}"
+        with open(os.path.join(self.output_dir, "summary.txt"), 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+        logger.info(f"   {line}")
@@ -0,0 +1,283 @@
+"""
+Tabela de performance por canal (nicho × faixa de desconto × canal)
+
+Guarda quantas vezes cada combinação foi publicada (envios concluídos,
+sincronizados da API) e quantos cliques gerou. Os contadores são atualizados a cada evento novo, sem recalcular o
+histórico, e a lista de canais recomendados de cada célula é mantida
+pronta, então a recomendação é uma consulta O(1).
+
+Formato em disco: uma linha JSON de cabeçalho (nichos, canais, cursores
+dos cliques e dos envios) seguida dos contadores como array de uint32.
+"""
+import json
+import os
+import threading
+from array import array
+from typing import Dict, List, Optional, Tuple
+from loguru import logger
+
+from api_client import get_api_client
+from config import API_URL, CHANNEL_STATS_PATH, CHANNEL_STATS_MIN_SAMPLES
+
+CHANNELS = ["TELEGRAM", "WHATSAPP", "FACEBOOK", "TWITTER", "INSTAGRAM", "SITE"]
+
+# Limites inferiores das faixas de desconto (%)
+DISCOUNT_BANDS = [0, 30, 40, 50]
+
+# Índice da faixa para cada desconto de 0 a 100
+_BAND_INDEX = [max(i for i, low in enumerate(DISCOUNT_BANDS) if d >= low) for d in range(101)]
+
+# Suavização do CTR (evita que poucas publicações dominem a recomendação)
+PRIOR_PUBLICATIONS = 5
+PRIOR_CTR = 0.02
+
+
+def discount_band(discount) -> int:
+    """Faixa de desconto de uma oferta"""
+    return _BAND_INDEX[min(max(int(discount or 0), 0), 100)]
+
+
+class ChannelPerformanceTable:
+    """Contadores de publicações e cliques por nicho, faixa e canal"""
+
+    def __init__(self, min_samples: int = CHANNEL_STATS_MIN_SAMPLES):
+        self.min_samples = min_samples
+        self.niches: List[str] = []
+        self._niche_index: Dict[str, int] = {}
+        # Para cada célula: [publicações, cliques] × canal
+        self._counts = array('I')
+        self._recommended: Dict[Tuple[int, int], Optional[List[str]]] = {}
+        self.last_click_at: Optional[str] = None
+        self.click_cursor: Optional[str] = None  # posição do último clique aplicado
+        self.publication_cursor: Optional[str] = None  # posição do último envio aplicado
+        self._lock = threading.Lock()
+
+    # ==================== ÍNDICES ====================
+
+    @staticmethod
+    def _cell_size() -> int:
+        return len(DISCOUNT_BANDS) * len(CHANNELS) * 2
+
+    def _niche(self, niche: str) -> int:
+        index = self._niche_index.get(niche)
+        if index is None:
+            index = len(self.niches)
+            self.niches.append(niche)
+            self._niche_index[niche] = index
+            self._counts.extend([0] * self._cell_size())
+        return index
+
+    @staticmethod
+    def _offset(niche_index: int, band: int, channel_index: int) -> int:
+        return ((niche_index * len(DISCOUNT_BANDS) + band) * len(CHANNELS) + channel_index) * 2
+
+    # ==================== EVENTOS ====================
+
+    def record_publication(self, niche: str, discount, channel: str):
+        """Registra uma publicação num canal"""
+        self._record(niche, discount, channel, 0)
+
+    def record_click(self, niche: str, discount, channel: str):
+        """Registra um clique vindo de um canal"""
+        self._record(niche, discount, channel, 1)
+
+    def reset_publications(self):
+        """Zera as publicações (cliques ficam), para recontá-las a partir dos envios"""
+        with self._lock:
+            for offset in range(0, len(self._counts), 2):
+                self._counts[offset] = 0
+            for niche_index in range(len(self.niches)):
+                for band in range(len(DISCOUNT_BANDS)):
+                    self._refresh_cell(niche_index, band)
+
+    def _record(self, niche: str, discount, channel: str, field: int):
+        if channel not in CHANNELS:
+            return
+        with self._lock:
+            niche_index = self._niche(niche or "outros")
+            band = discount_band(discount)
+            self._counts[self._offset(niche_index, band, CHANNELS.index(channel)) + field] += 1
+            self._refresh_cell(niche_index, band)
+
+    def _refresh_cell(self, niche_index: int, band: int):
+        """Recalcula só a recomendação da célula afetada"""
+        scored = []
+        for channel_index, channel in enumerate(CHANNELS):
+            offset = self._offset(niche_index, band, channel_index)
+            publications, clicks = self._counts[offset], self._counts[offset + 1]
+            if publications < self.min_samples:
+                continue
+            ctr = (clicks + PRIOR_CTR * PRIOR_PUBLICATIONS) / (publications + PRIOR_PUBLICATIONS)
+            scored.append((ctr, channel))
+
+        if len(scored) < 2:
+            # Histórico insuficiente: deixar as regras padrão decidirem
+            self._recommended[(niche_index, band)] = None
+            return
+
+        average = sum(ctr for ctr, _ in scored) / len(scored)
+        self._recommended[(niche_index, band)] = [
+            channel for ctr, channel in sorted(scored, reverse=True) if ctr >= average
+        ]
+
+    # ==================== CONSULTA ====================
+
+    def recommend(self, niche: str, discount) -> Optional[List[str]]:
+        """Canais com CTR acima da média da célula, ou None se faltar histórico"""
+        niche_index = self._niche_index.get(niche or "outros")
+        if niche_index is None:
+            return None
+        return self._recommended.get((niche_index, discount_band(discount)))
+
+    # ==================== PERSISTÊNCIA ====================
+
+    def save(self, path: str = CHANNEL_STATS_PATH):
+        """Grava a tabela no formato compacto"""
+        with self._lock:
+            header = json.dumps({
+                "niches": self.niches,
+                "channels": CHANNELS,
+                "bands": DISCOUNT_BANDS,
+                "last_click_at": self.last_click_at,
+                "click_cursor": self.click_cursor,
+                "publication_cursor": self.publication_cursor,
+            }).encode("utf-8")
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(header + b"\n")
+                self._counts.tofile(f)
+            os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = CHANNEL_STATS_PATH) -> "ChannelPerformanceTable":
+        """Carrega a tabela do disco (vazia se não existir ou estiver em outro formato)"""
+        table = cls()
+        if not os.path.exists(path):
+            return table
+
+        try:
+            with open(path, 'rb') as f:
+                header = json.loads(f.readline())
+                if header["channels"] != CHANNELS or header["bands"] != DISCOUNT_BANDS:
+                    logger.warning("Tabela de canais em formato antigo, recomeçando do zero")
+                    return table
+                counts = array('I')
+                counts.frombytes(f.read())
+        except Exception as e:
+            logger.error(f"Erro ao carregar tabela de canais: {e}")
+            return table
+
+        table.niches = header["niches"]
+        table._niche_index = {niche: i for i, niche in enumerate(table.niches)}
+        table._counts = counts
+        table.last_click_at = header.get("last_click_at")
+        table.click_cursor = header.get("click_cursor")
+        table.publication_cursor = header.get("publication_cursor")
+        for niche_index in range(len(table.niches)):
+            for band in range(len(DISCOUNT_BANDS)):
+                table._refresh_cell(niche_index, band)
+        return table
+
+
+def _fetch_page(path: str, api_url: str, cursor: Optional[str], params: Dict) -> Tuple[List[Dict], Dict]:
+    """Uma página de eventos (dados, meta) a partir do cursor"""
+    response = get_api_client().get(
+        f"{api_url}{path}",
+        params={**params, "cursor": cursor} if cursor else params,
+        timeout=30,
+    )
+    response.raise_for_status()
+    payload = response.json()
+    return payload.get("data", []), payload.get("meta", {})
+
+
+def sync_clicks(table: ChannelPerformanceTable, api_url: str = API_URL, page_size: int = 100) -> int:
+    """
+    Aplica na tabela os cliques registrados desde a última sincronização
+
+    Pagina do mais antigo para o mais novo pelo cursor (createdAt, id) da
+    API. Cada página é lida por inteiro antes de mexer na tabela, e então
+    os cliques, a marca d'água e o cursor avançam juntos: se uma página
+    falhar, nada dela foi aplicado e a próxima sincronização recomeça do
+    cursor da última página aplicada, sem perder nem repetir cliques.
+    """
+    applied = 0
+    cursor = table.click_cursor
+    params = {"limit": page_size, "order": "asc"}
+
+    # Tabela gravada antes do cursor: retomar pelo horário do último clique
+    legacy_watermark = table.last_click_at if not cursor else None
+    if legacy_watermark:
+        params["dateFrom"] = legacy_watermark[:10]
+
+    try:
+        while True:
+            clicks, meta = _fetch_page("/api/stats/clicks", api_url, cursor, params)
+            events = []
+            for click in clicks:
+                if legacy_watermark and click.get("createdAt", "") <= legacy_watermark:
+                    continue
+                post = click.get("publishedPost") or {}
+                if click.get("channel") and post:
+                    events.append((
+                        (post.get("niche") or {}).get("slug", "outros"),
+                        post.get("discountPct", 0),
+                        click["channel"],
+                    ))
+
+            for event in events:
+                table.record_click(*event)
+            applied += len(events)
+            if clicks:
+                table.last_click_at = clicks[-1].get("createdAt", table.last_click_at)
+            cursor = table.click_cursor = meta.get("nextCursor") or cursor
+            if not meta.get("hasMore"):
+                break
+    except Exception as e:
+        logger.error(f"Erro ao sincronizar cliques: {e}")
+
+    return applied
+
+
+def sync_publications(table: ChannelPerformanceTable, api_url: str = API_URL, page_size: int = 100) -> int:
+    """
+    Aplica na tabela os envios concluídos desde a última sincronização
+
+    Uma publicação só conta quando o canal confirmou o envio (delivery SENT,
+    seja pelo dispatcher ou pela aprovação na plataforma), não quando o
+    draft é criado. Mesma paginação por cursor e mesma garantia de
+    sync_clicks. Tabelas gravadas antes do cursor de envios contavam os
+    drafts criados: a primeira sincronização zera essas contagens e reconta
+    o histórico de envios.
+    """
+    applied = 0
+    cursor = table.publication_cursor
+    if cursor is None:
+        table.reset_publications()
+
+    try:
+        while True:
+            deliveries, meta = _fetch_page("/api/stats/deliveries", api_url, cursor, {"limit": page_size})
+            events = []
+            for delivery in deliveries:
+                offer = (delivery.get("draft") or {}).get("offer") or {}
+                if delivery.get("channel"):
+                    events.append((
+                        (offer.get("niche") or {}).get("slug", "outros"),
+                        offer.get("discountPct", 0),
+                        delivery["channel"],
+                    ))
+
+            for event in events:
+                table.record_publication(*event)
+            applied += len(events)
+            cursor = table.publication_cursor = meta.get("nextCursor") or cursor
+            if not meta.get("hasMore"):
+                break
+    except Exception as e:
+        logger.error(f"Erro ao sincronizar envios: {e}")
+
+    return applied
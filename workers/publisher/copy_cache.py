@@ -0,0 +1,106 @@
+"""
+Cache de copy gerada por IA
+
+Quando a IA estoura o orçamento de latência, a copy de template é usada na
+hora e a resposta da IA, que chega depois, fica guardada aqui para a
+próxima execução. A entrada é invalidada se a oferta mudar.
+
+As alterações ficam em memória e vão para o disco em lote (flush() ao fim
+da execução, a cada FLUSH_EVERY alterações e na saída do processo); o
+cache guarda no máximo AI_COPY_CACHE_MAX_ENTRIES ofertas, descartando as
+mais antigas. O processo usa um único cache (get_copy_cache), compartilhado
+pelo publicador e pelo prewarm, para não haver várias cópias gravando o
+mesmo arquivo.
+"""
+import atexit
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+from loguru import logger
+
+from config import AI_COPY_CACHE_PATH, AI_COPY_CACHE_MAX_ENTRIES
+from publisher.prewarm import offer_fingerprint
+
+
+class CopyCache:
+    """Copy de IA por id de oferta, persistida em JSON"""
+
+    FLUSH_EVERY = 20  # alterações pendentes que forçam uma gravação
+
+    def __init__(self, path: str = AI_COPY_CACHE_PATH, max_entries: int = AI_COPY_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._dirty = 0
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._entries = OrderedDict(json.load(f))
+            except Exception as e:
+                logger.error(f"Erro ao ler cache de copy: {e}")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, offer: Dict) -> Optional[str]:
+        """Retorna a copy da oferta se ela não mudou desde a geração"""
+        with self._lock:
+            entry = self._entries.get(offer.get("id"))
+        if entry and entry["fingerprint"] == offer_fingerprint(offer):
+            return entry["copy"]
+        return None
+
+    def put(self, offer: Dict, copy_text: str):
+        """Guarda a copy de uma oferta (descartando as mais antigas acima do limite)"""
+        with self._lock:
+            self._entries.pop(offer["id"], None)
+            self._entries[offer["id"]] = {
+                "fingerprint": offer_fingerprint(offer),
+                "copy": copy_text,
+            }
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty += 1
+            should_flush = self._dirty >= self.FLUSH_EVERY
+        if should_flush:
+            self.flush()
+
+    def discard(self, offer_id: str):
+        """Remove a copy de uma oferta (ex.: draft já criado)"""
+        with self._lock:
+            if self._entries.pop(offer_id, None) is not None:
+                self._dirty += 1
+
+    def flush(self):
+        """Grava o cache em disco, se houver alterações"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._entries, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+                self._dirty = 0
+            except Exception as e:
+                logger.error(f"Erro ao salvar cache de copy: {e}")
+
+
+_cache: Optional[CopyCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_copy_cache() -> CopyCache:
+    """Cache de copy compartilhado pelo processo (gravado também na saída)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CopyCache()
+            atexit.register(_cache.flush)
+        return _cache
@@ -6,15 +6,43 @@ Responsabilidades:
 - Criar PostDraft para cada Offer
 - Sugerir canais e carga
 """
-import requests
-import random
-from datetime import datetime
-from typing import List, Optional, Dict, Any
+import heapq
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, date
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import List, Optional, Dict, Any, Set, Tuple, Iterator, Callable
 from loguru import logger
 import sys
 
 sys.path.append('..')
-from config import API_URL, OPENAI_API_KEY, BATCH_TIMES
+from config import (
+    API_URL,
+    OPENAI_API_KEY,
+    OFFERS_PAGE_SIZE,
+    PUBLISHER_COPY_WORKERS,
+    PUBLISHER_SUBMIT_WORKERS,
+    PUBLISHER_QUEUE_SIZE,
+    AI_LATENCY_BUDGET,
+    AI_REQUEST_TIMEOUT,
+    AI_MAX_CONCURRENCY,
+    AI_CALLS_PER_RUN,
+    AI_CALLS_PER_DAY,
+    AI_MIN_SCORE,
+    PUBLISHER_MAX_DRAFTS,
+    PUBLISHER_TIME_LIMIT,
+    PUBLISHER_PRIORITY_WINDOW,
+)
+from api_client import get_api_client
+from publisher.templates import TemplateEngine
+from publisher.pipeline import Pipeline, Stage
+from publisher.prewarm import default_plan_store
+from publisher.channel_stats import ChannelPerformanceTable, sync_clicks, sync_publications
+from publisher.copy_cache import CopyCache, get_copy_cache
+from publisher.priority import prioritize, until
+from metrics import get_metrics
+from validator.main import OfferValidator
 
 # Tentar importar OpenAI
 try:
@@ -24,25 +52,133 @@ except ImportError:
     HAS_OPENAI = False
     logger.warning("OpenAI não instalado, usando gerador de fallback")
 
+LLM_SECONDS = get_metrics().histogram("promo_llm_request_seconds", "Latência das chamadas à IA de copy")
+COPY_GENERATED = get_metrics().counter("promo_copy_generated_total", "Copies geradas por origem", ["source"])
+DRAFTS = get_metrics().counter("promo_drafts_total", "Drafts enviados à API por resultado", ["outcome"])
+
+
+class DailyAiBudget:
+    """Chamadas à IA do dia, divididas por todos os geradores de copy do processo"""
+    
+    def __init__(self, limit: int = AI_CALLS_PER_DAY):
+        self.limit = limit
+        self._day = date.today()
+        self._used = 0
+        self._lock = threading.Lock()
+        
+    @property
+    def used(self) -> int:
+        with self._lock:
+            self._roll()
+            return self._used
+        
+    def _roll(self):
+        today = date.today()
+        if today != self._day:
+            self._day = today
+            self._used = 0
+            
+    def take(self) -> bool:
+        """Reserva uma chamada; False se o teto do dia já foi atingido"""
+        with self._lock:
+            self._roll()
+            if self.limit and self._used >= self.limit:
+                return False
+            self._used += 1
+            return True
+            
+    def refund(self):
+        with self._lock:
+            self._used = max(self._used - 1, 0)
+
+
+_daily_ai_budget: Optional[DailyAiBudget] = None
+_daily_ai_budget_lock = threading.Lock()
+
+
+def get_daily_ai_budget() -> DailyAiBudget:
+    """Teto diário de chamadas à IA compartilhado pelo publicador e pelo prewarm"""
+    global _daily_ai_budget
+    with _daily_ai_budget_lock:
+        if _daily_ai_budget is None:
+            _daily_ai_budget = DailyAiBudget()
+        return _daily_ai_budget
+
 
 class CopyGenerator:
-    """Gerador de copy para posts"""
+    """
+    Gerador de copy para posts
+    
+    Cada chamada à IA tem um orçamento de latência: se a resposta não chega
+    a tempo, a copy de template é usada e a resposta tardia vai para o
+    CopyCache, sendo aproveitada na próxima execução. As chamadas à IA são
+    reservadas às ofertas com score (score_offer) a partir de AI_MIN_SCORE,
+    até AI_CALLS_PER_RUN por execução e dentro do teto diário do processo
+    (AI_CALLS_PER_DAY, dividido com o prewarm); como o feed chega ordenado por
+    score, o orçamento vai para as ofertas mais valiosas. Uma chamada só é
+    feita com uma thread de IA livre, para o orçamento de latência contar
+    a partir do início da requisição e não do tempo na fila.
+    """
     
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None, copy_cache: Optional[CopyCache] = None,
+                 score: Optional[Callable[[Dict], float]] = None):
         if HAS_OPENAI and OPENAI_API_KEY:
-            self.client = OpenAI(api_key=OPENAI_API_KEY)
+            self.client = OpenAI(api_key=OPENAI_API_KEY, timeout=AI_REQUEST_TIMEOUT, max_retries=0)
             self.use_ai = True
         else:
             self.client = None
             self.use_ai = False
             
-    def generate_with_ai(self, offer: Dict) -> str:
-        """Gera copy usando OpenAI"""
-        if not self.use_ai:
-            return self.generate_fallback(offer)
+        # Seed diária: a mesma oferta recebe a mesma copy durante o dia
+        self.template_engine = TemplateEngine(seed if seed is not None else date.today().toordinal())
+        
+        self.copy_cache = copy_cache if copy_cache is not None else get_copy_cache()
+        self.score = score or (lambda offer: float(offer.get("discount", 0) or 0))
+        self.latency_budget = AI_LATENCY_BUDGET
+        self._ai_executor = ThreadPoolExecutor(max_workers=AI_MAX_CONCURRENCY, thread_name_prefix="ai-copy")
+        self._ai_slots = threading.BoundedSemaphore(AI_MAX_CONCURRENCY)
+        self._ai_calls = 0
+        self._budget_lock = threading.Lock()
+        self.daily_budget = get_daily_ai_budget()
+        
+    def reset_budget(self):
+        """Zera o contador de chamadas à IA (nova execução)"""
+        with self._budget_lock:
+            self._ai_calls = 0
             
+    def _take_ai_budget(self, offer: Dict) -> bool:
+        """Reserva uma chamada à IA (e uma thread livre) se a oferta tiver score para isso"""
+        if self.score(offer) < AI_MIN_SCORE:
+            return False
+        with self._budget_lock:
+            if AI_CALLS_PER_RUN and self._ai_calls >= AI_CALLS_PER_RUN:
+                return False
+            # Sem thread livre a chamada esperaria na fila com o relógio correndo
+            if not self._ai_slots.acquire(blocking=False):
+                return False
+            if not self.daily_budget.take():
+                self._ai_slots.release()
+                return False
+            self._ai_calls += 1
+            return True
+            
+    def _refund_ai_budget(self):
+        """Devolve a chamada e a thread reservadas para uma chamada que não chegou a rodar"""
+        with self._budget_lock:
+            self._ai_calls = max(self._ai_calls - 1, 0)
+        self.daily_budget.refund()
+        self._ai_slots.release()
+            
+    def _run_ai_call(self, offer: Dict) -> str:
+        """Executa a chamada e libera a thread reservada em _take_ai_budget"""
         try:
-            prompt = f"""Crie um texto curto e persuasivo para divulgar esta oferta em redes sociais.
+            return self._request_ai_copy(offer)
+        finally:
+            self._ai_slots.release()
+            
+    def _request_ai_copy(self, offer: Dict) -> str:
+        """Chamada à OpenAI (roda no executor de IA)"""
+        prompt = f"""Crie um texto curto e persuasivo para divulgar esta oferta em redes sociais.
 
 Produto: {offer['title']}
 Preço original: R$ {offer['originalPrice']:.2f}
@@ -62,6 +198,7 @@ Exemplo de formato:
 Oferta imperdível! [produto] com [X]% de desconto.
 Aproveite antes que acabe!"""
 
+        with LLM_SECONDS.time():
             response = self.client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[
@@ -71,41 +208,75 @@ Aproveite antes que acabe!"""
                 max_tokens=150,
                 temperature=0.7,
             )
+        
+        return response.choices[0].message.content.strip()
+    
+    def _cache_late_result(self, offer: Dict):
+        """Callback que guarda a resposta da IA que chegou depois do orçamento"""
+        def callback(future):
+            try:
+                self.copy_cache.put(offer, future.result())
+                logger.debug(f"Copy tardia da IA guardada: {offer['title'][:50]}")
+            except Exception as e:
+                logger.error(f"Erro ao gerar copy com IA: {e}")
+        return callback
             
-            return response.choices[0].message.content.strip()
-            
+    def generate_with_ai(self, offer: Dict) -> str:
+        """Gera copy usando OpenAI, respeitando o orçamento de latência (vaga já reservada)"""
+        future = self._ai_executor.submit(self._run_ai_call, offer)
+        try:
+            copy_text = future.result(timeout=self.latency_budget)
+            COPY_GENERATED.inc(source="ai")
+            return copy_text
+        except FutureTimeoutError:
+            logger.warning(f"IA passou de {self.latency_budget}s, usando template: {offer['title'][:50]}")
+            # Ainda na fila: cancelar em vez de gastar a chamada; em andamento: guardar o resultado
+            if future.cancel():
+                self._refund_ai_budget()
+            else:
+                future.add_done_callback(self._cache_late_result(offer))
+            COPY_GENERATED.inc(source="ai_timeout")
+            return self.generate_fallback(offer)
         except Exception as e:
             logger.error(f"Erro ao gerar copy com IA: {e}")
+            COPY_GENERATED.inc(source="ai_error")
             return self.generate_fallback(offer)
     
     def generate_fallback(self, offer: Dict) -> str:
         """Gera copy usando templates (fallback)"""
-        templates = [
-            "🔥 OFERTA IMPERDÍVEL!\n\n{title}\n\nDe R$ {original} por apenas R$ {final}!\n\n⚡ {discount}% de desconto - Corre que é por tempo limitado!",
-            "💰 PREÇO BAIXOU!\n\n{title}\n\nAntes: R$ {original}\nAgora: R$ {final}\n\n🏷️ Economize {discount}%!",
-            "⚡ PROMOÇÃO RELÂMPAGO!\n\n{title}\n\nR$ {final} ({discount}% OFF)\n\n🛒 Aproveite enquanto dura!",
-            "🎯 ACHADO DO DIA!\n\n{title}\n\nPreço especial: R$ {final}\nDesconto de {discount}%\n\n✅ Oferta verificada!",
-            "🛍️ OPORTUNIDADE!\n\n{title}\n\nDe R$ {original} → R$ {final}\n\n💸 Você economiza {discount}%!",
-        ]
-        
-        template = random.choice(templates)
-        
-        return template.format(
-            title=offer['title'],
-            original=f"{offer['originalPrice']:.2f}",
-            final=f"{offer['finalPrice']:.2f}",
-            discount=offer['discount'],
-        )
+        return self.template_engine.render(offer)
     
     def generate(self, offer: Dict) -> str:
         """Gera copy para uma oferta"""
-        if self.use_ai:
+        # Copy da IA que chegou atrasada numa execução anterior
+        cached = self.copy_cache.get(offer)
+        if cached:
+            COPY_GENERATED.inc(source="cache")
+            return cached
+            
+        if self.use_ai and self._take_ai_budget(offer):
             return self.generate_with_ai(offer)
+        COPY_GENERATED.inc(source="template")
         return self.generate_fallback(offer)
+    
+    def generate_many(self, offers: List[Dict]) -> List[str]:
+        """Gera copy para uma lista de ofertas (em lote quando sem IA)"""
+        if self.use_ai:
+            return [self.generate(offer) for offer in offers]
+        COPY_GENERATED.inc(len(offers), source="template")
+        return self.template_engine.render_many(offers)
 
 
 class ChannelRecommender:
-    """Recomenda canais baseado no tipo de oferta"""
+    """
+    Recomenda canais baseado no tipo de oferta
+    
+    Quando há histórico suficiente, consulta a tabela de performance
+    (nicho × faixa de desconto × canal); senão usa as regras fixas.
+    """
+    
+    def __init__(self, table: Optional[ChannelPerformanceTable] = None):
+        self.table = table
     
     def recommend(self, offer: Dict) -> List[str]:
         """Recomenda canais para uma oferta"""
@@ -114,6 +285,13 @@ class ChannelRecommender:
         discount = offer.get("discount", 0)
         niche = offer.get("niche", {}).get("slug", "")
         
+        # Canais que mais convertem para ofertas parecidas
+        if self.table:
+            best = self.table.recommend(niche, discount)
+            if best:
+                channels.extend(c for c in best if c != "SITE")
+                return channels
+        
         # Ofertas com alto desconto vão para todos os canais
         if discount >= 40:
             channels.extend(["TELEGRAM", "WHATSAPP", "FACEBOOK"])
@@ -136,77 +314,215 @@ class ChannelRecommender:
 
 
 class BatchSelector:
-    """Seleciona carga apropriada para o post"""
+    """
+    Seleciona carga apropriada para o post
+
+    As cargas do dia são carregadas uma única vez por execução num min-heap
+    ordenado por quantidade de pendentes. Os contadores são atualizados
+    localmente a cada draft atribuído e só são reconciliados com o servidor
+    no fim da execução ou quando a API recusa a carga escolhida.
+    """
     
     def __init__(self, api_url: str = API_URL):
         self.api_url = api_url
+        self._heap: List[Tuple[int, str, str]] = []  # (pendentes, horário, id)
+        self._assigned: Dict[str, int] = {}
+        self._invalidated: Set[str] = set()  # cargas recusadas pela API (valem entre recargas)
+        self._loaded = False
+        self._lock = threading.Lock()
         
-    def get_next_batch(self) -> Optional[str]:
-        """Obtém ou cria a próxima carga disponível"""
+    def _fetch_batches(self) -> List[Dict]:
+        """Busca as cargas do dia na API"""
+        response = get_api_client().get(f"{self.api_url}/api/batches")
+        response.raise_for_status()
+        payload = response.json()
+        return (payload.get("data") if isinstance(payload, dict) else payload) or []
+        
+    def _build_heap(self, batches: List[Dict]):
+        """Monta o heap com as cargas futuras do dia que ainda aceitam drafts"""
+        # Cargas bloqueadas/fechadas (no servidor ou recusadas nesta execução) não recebem drafts
+        batches = [
+            b for b in batches
+            if b.get("status") == "PENDING" and b["id"] not in self._invalidated
+        ]
+        
+        # Filtrar cargas futuras
+        current_time = datetime.now().strftime("%H:%M")
+        future_batches = [b for b in batches if b["scheduledTime"] > current_time]
+        
+        if not future_batches:
+            # Se não há cargas futuras hoje, usar todas as do dia
+            future_batches = batches
+            
+        self._heap = [
+            (b.get("pendingCount", 0), b["scheduledTime"], b["id"])
+            for b in future_batches
+        ]
+        heapq.heapify(self._heap)
+        self._assigned = {}
+        
+    def load_snapshot(self) -> bool:
+        """Carrega as cargas do dia no heap local"""
         try:
-            # Buscar cargas do dia
-            response = requests.get(f"{self.api_url}/api/batches")
-            batches = response.json()
+            batches = self._fetch_batches()
             
             if not batches:
                 # Criar cargas do dia
-                return self.create_today_batches()
-            
-            # Encontrar carga com menos posts pendentes
-            now = datetime.now()
-            current_time = now.strftime("%H:%M")
+                self.create_today_batches()
+                batches = self._fetch_batches()
+                
+            self._build_heap(batches)
+        except Exception as e:
+            logger.error(f"Erro ao buscar batch: {e}")
+            return False
             
-            # Filtrar cargas futuras
-            future_batches = [
-                b for b in batches 
-                if b["scheduledTime"] > current_time
-            ]
+        self._loaded = True
+        return True
+        
+    def get_next_batch(self) -> Optional[str]:
+        """Retorna a carga com menos posts pendentes e reserva uma vaga nela"""
+        with self._lock:
+            if not self._loaded and not self.load_snapshot():
+                return None
+                
+            if not self._heap:
+                return None
+                
+            pending, scheduled_time, batch_id = self._heap[0]
+            heapq.heapreplace(self._heap, (pending + 1, scheduled_time, batch_id))
+            self._assigned[batch_id] = self._assigned.get(batch_id, 0) + 1
+            return batch_id
             
-            if not future_batches:
-                # Se não há cargas futuras hoje, pegar a primeira do dia
-                future_batches = batches
+    def release(self, batch_id: str):
+        """Devolve a vaga reservada quando o draft não foi criado"""
+        with self._lock:
+            for i, (pending, scheduled_time, bid) in enumerate(self._heap):
+                if bid == batch_id:
+                    self._heap[i] = (max(pending - 1, 0), scheduled_time, bid)
+                    heapq.heapify(self._heap)
+                    break
+            if self._assigned.get(batch_id):
+                self._assigned[batch_id] -= 1
                 
-            # Ordenar por quantidade de pendentes (menor primeiro)
-            future_batches.sort(key=lambda x: x.get("pendingCount", 0))
+    def invalidate(self, batch_id: str):
+        """Descarta a carga após conflito (ex.: bloqueada ou fechada) e recarrega as demais"""
+        with self._lock:
+            logger.warning(f"Conflito na carga {batch_id}, recarregando cargas do dia")
+            self._invalidated.add(batch_id)
+            self._heap = [entry for entry in self._heap if entry[2] != batch_id]
+            heapq.heapify(self._heap)
+            self._loaded = False
             
-            return future_batches[0]["id"] if future_batches else None
+    def reconcile(self):
+        """
+        Troca os contadores locais pelos do servidor ao fim da execução
+        
+        Outros publicadores (e aprovações/rejeições no painel) mudam os
+        pendentes das cargas; a próxima seleção parte dos números reais.
+        """
+        with self._lock:
+            if not self._loaded:
+                return
+                
+            expected = {bid: pending for pending, _, bid in self._heap}
             
-        except Exception as e:
-            logger.error(f"Erro ao buscar batch: {e}")
-            return None
+            try:
+                batches = self._fetch_batches()
+            except Exception as e:
+                logger.error(f"Erro ao reconciliar batches: {e}")
+                self._loaded = False
+                return
+                
+            drift = 0
+            for batch in batches:
+                local = expected.get(batch["id"])
+                remote = batch.get("pendingCount", 0)
+                if local is not None and local != remote:
+                    drift += 1
+                    logger.debug(
+                        f"Carga {batch['scheduledTime']}: pendentes local={local} servidor={remote}"
+                    )
+            if drift:
+                logger.info(f"{drift} cargas com pendentes diferentes do servidor, usando os do servidor")
+                
+            self._build_heap(batches)
     
     def create_today_batches(self) -> Optional[str]:
-        """Cria cargas para hoje"""
+        """
+        Cria as cargas do dia
+        
+        Não há trava entre publicadores: a API cria uma carga por horário
+        cadastrado e devolve as que já existem (chave única data+horário),
+        então workers em processos ou hosts diferentes podem chamar ao mesmo
+        tempo sem duplicar cargas. Se duas chamadas concorrentes esbarrarem
+        no índice único, a retentativa (ou a recarga em load_snapshot)
+        encontra as cargas criadas pela outra.
+        """
         try:
-            first_batch_id = None
-            
-            for time in BATCH_TIMES:
-                response = requests.post(
-                    f"{self.api_url}/api/batches",
-                    json={"scheduledTime": time}
-                )
+            response = get_api_client().post(f"{self.api_url}/api/batches/generate", retry=True)
+            if response.status_code not in (200, 201):
+                logger.error(f"Erro ao criar batches: {response.text}")
+                return None
                 
-                if response.status_code == 200 and not first_batch_id:
-                    first_batch_id = response.json().get("id")
-                    
-            return first_batch_id
+            batches = response.json().get("data", [])
+            return batches[0]["id"] if batches else None
             
         except Exception as e:
             logger.error(f"Erro ao criar batches: {e}")
             return None
 
 
+@dataclass
+class DraftPlan:
+    """Draft pronto para envio (copy e canais já definidos)"""
+    offer: Dict
+    copy_text: str
+    channels: List[str]
+    priority: str
+
+
 class DraftCreator:
     """Cria PostDrafts a partir de ofertas"""
     
-    def __init__(self, api_url: str = API_URL):
+    # Códigos de erro da API que indicam que a carga escolhida não aceita mais drafts
+    BATCH_CONFLICT_CODES = {"BATCH_LOCKED", "BATCH_CLOSED"}
+    
+    def __init__(self, api_url: str = API_URL, plan_store=None):
         self.api_url = api_url
-        self.copy_generator = CopyGenerator()
-        self.channel_recommender = ChannelRecommender()
+        self.copy_generator = CopyGenerator(score=self.score_offer)
+        self.channel_recommender = ChannelRecommender(ChannelPerformanceTable.load())
         self.batch_selector = BatchSelector(api_url)
+        self.plan_store = plan_store  # planos pré-calculados pelo prewarm
+        self.offer_validator = OfferValidator(api_url)
         
-    def create_draft(self, offer: Dict) -> Optional[str]:
-        """Cria um PostDraft para uma oferta"""
+    def reload_channel_table(self):
+        """Relê a tabela de canais do disco (o publicador a grava ao fim de cada execução)"""
+        self.channel_recommender.table = ChannelPerformanceTable.load()
+        
+    def prepare(self, offer: Dict) -> Optional[DraftPlan]:
+        """Plano pré-calculado da oferta, ou gera copy e canais na hora (sem chamar a API)"""
+        store = self.plan_store
+        if not store:
+            return self.build_plan(offer)
+            
+        cached = store.get(offer)
+        if cached:
+            return DraftPlan(offer=offer, **cached)
+            
+        if not store.begin(offer["id"]):
+            # O prewarm está gerando este plano agora: aguardar em vez de chamar a IA de novo
+            cached = store.wait(offer, timeout=AI_REQUEST_TIMEOUT)
+            if cached:
+                return DraftPlan(offer=offer, **cached)
+            return self.build_plan(offer)
+            
+        try:
+            return self.build_plan(offer)
+        finally:
+            store.end(offer["id"])
+    
+    def build_plan(self, offer: Dict) -> Optional[DraftPlan]:
+        """Gera copy e canais de uma oferta"""
         try:
             # Gerar copy
             copy_text = self.copy_generator.generate(offer)
@@ -214,6 +530,21 @@ class DraftCreator:
             # Recomendar canais
             channels = self.channel_recommender.recommend(offer)
             
+            return DraftPlan(
+                offer=offer,
+                copy_text=copy_text,
+                channels=channels,
+                priority=self._determine_priority(offer),
+            )
+            
+        except Exception as e:
+            logger.error(f"Erro ao preparar draft: {e}")
+            return None
+    
+    def submit(self, plan: DraftPlan) -> Optional[str]:
+        """Seleciona a carga e cria o PostDraft via API"""
+        offer = plan.offer
+        try:
             # Selecionar batch
             batch_id = self.batch_selector.get_next_batch()
             if not batch_id:
@@ -221,27 +552,90 @@ class DraftCreator:
                 return None
             
             # Criar draft via API
-            response = requests.post(
-                f"{self.api_url}/api/offers/{offer['id']}/create-draft",
-                json={
-                    "copyText": copy_text,
-                    "batchId": batch_id,
-                    "channels": channels,
-                    "priority": self._determine_priority(offer),
-                }
-            )
+            payload = {
+                "copyText": plan.copy_text,
+                "batchId": batch_id,
+                "channels": plan.channels,
+                "priority": plan.priority,
+            }
+            response = self._post_draft(offer, payload)
+            
+            if self._is_batch_conflict(response):
+                # Carga bloqueada/fechada no servidor: recarregar e tentar outra
+                self.batch_selector.invalidate(batch_id)
+                batch_id = self.batch_selector.get_next_batch()
+                if not batch_id:
+                    logger.error("Não foi possível obter batch")
+                    return None
+                payload["batchId"] = batch_id
+                response = self._post_draft(offer, payload)
             
-            if response.status_code == 200:
-                draft = response.json()
-                logger.info(f"✅ Draft criado: {offer['title'][:50]}... → {channels}")
+            if response.status_code in (200, 201):
+                body = response.json()
+                draft = body.get("data", body)
+                logger.info(f"✅ Draft criado: {offer['title'][:50]}... → {plan.channels}")
+                if self.plan_store:
+                    self.plan_store.discard(offer["id"])
+                self.copy_generator.copy_cache.discard(offer["id"])
+                DRAFTS.inc(outcome="created")
                 return draft.get("id")
             else:
+                self.batch_selector.release(batch_id)
                 logger.error(f"Erro ao criar draft: {response.text}")
+                DRAFTS.inc(outcome="failed")
                 return None
                 
         except Exception as e:
             logger.error(f"Erro ao criar draft: {e}")
+            DRAFTS.inc(outcome="failed")
+            return None
+    
+    def _is_batch_conflict(self, response) -> bool:
+        """Indica se a API recusou o draft por causa da carga (e não da oferta)"""
+        if response.status_code < 400:
+            return False
+        try:
+            error = response.json().get("error")
+        except ValueError:
+            return False
+        return isinstance(error, dict) and error.get("code") in self.BATCH_CONFLICT_CODES
+    
+    def create_draft(self, offer: Dict) -> Optional[str]:
+        """Cria um PostDraft para uma oferta"""
+        plan = self.prepare(offer)
+        if not plan:
             return None
+        return self.submit(plan)
+    
+    def _post_draft(self, offer: Dict, payload: Dict):
+        """Envia o draft para a API"""
+        return get_api_client().post(
+            f"{self.api_url}/api/offers/{offer['id']}/create-draft",
+            json=payload
+        )
+    
+    # Pesos do score usado para ordenar as ofertas da execução
+    PRIORITY_WEIGHT = {"HIGH": 20, "NORMAL": 10, "LOW": 0}
+    URGENCY_WEIGHT = {"HOJE": 30, "ULTIMAS_UNIDADES": 20, "LIMITADO": 10, "NORMAL": 0}
+    EXPIRY_HORIZON_HOURS = 72
+    
+    def score_offer(self, offer: Dict) -> float:
+        """Valor da oferta: desconto, urgência e proximidade da expiração"""
+        score = float(offer.get("discount", 0) or 0)
+        score += self.PRIORITY_WEIGHT[self._determine_priority(offer)]
+        score += self.URGENCY_WEIGHT.get(self.offer_validator.determine_urgency(offer), 0)
+        
+        expires_at = offer.get("expiresAt")
+        if expires_at:
+            try:
+                expires = datetime.fromisoformat(expires_at.replace("Z", "+00:00"))
+                hours_left = (expires - datetime.now(expires.tzinfo)).total_seconds() / 3600
+                if 0 < hours_left < self.EXPIRY_HORIZON_HOURS:
+                    score += 20 * (1 - hours_left / self.EXPIRY_HORIZON_HOURS)
+            except ValueError:
+                pass
+                
+        return score
     
     def _determine_priority(self, offer: Dict) -> str:
         """Determina prioridade do post"""
@@ -254,38 +648,149 @@ class DraftCreator:
         return "LOW"
 
 
+def fetch_offers_page(cursor: Optional[str] = None, limit: int = OFFERS_PAGE_SIZE) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Busca uma página de ofertas ativas sem drafts
+    
+    Returns:
+        Tuple[List[Dict], Optional[str]]: (ofertas, cursor_da_próxima_página)
+        
+    Raises:
+        httpx.HTTPStatusError: se a API responder com erro (um corpo de erro
+            não é uma página vazia)
+    """
+    params = {"active": "true", "hasDrafts": "false", "limit": limit}
+    if cursor:
+        params["cursor"] = cursor
+        
+    response = get_api_client().get(f"{API_URL}/api/offers", params=params)
+    response.raise_for_status()
+    payload = response.json()
+    
+    if isinstance(payload, dict):
+        offers = payload.get("data", [])
+        next_cursor = payload.get("meta", {}).get("nextCursor")
+    else:
+        offers, next_cursor = payload, None
+        
+    return offers, next_cursor
+
+
+def iter_offers_without_drafts(page_size: int = OFFERS_PAGE_SIZE) -> Iterator[Dict]:
+    """
+    Percorre todas as ofertas sem drafts, página a página
+    
+    A API filtra as ofertas no servidor e pagina por cursor. A próxima
+    página é buscada em segundo plano enquanto a atual é consumida, então
+    no máximo duas páginas ficam em memória, independente do backlog.
+    """
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="offers-feed") as prefetcher:
+        try:
+            future = prefetcher.submit(fetch_offers_page, None, page_size)
+            
+            while future is not None:
+                offers, next_cursor = future.result()
+                future = prefetcher.submit(fetch_offers_page, next_cursor, page_size) if next_cursor else None
+                
+                for offer in offers:
+                    # Servidores antigos ignoram hasDrafts
+                    if offer.get("_count", {}).get("drafts", 0) == 0:
+                        yield offer
+                        
+        except Exception as e:
+            logger.error(f"Erro ao buscar ofertas: {e}")
+
+
 def get_offers_without_drafts() -> List[Dict]:
-    """Busca ofertas que ainda não têm drafts"""
+    """Busca a primeira página de ofertas que ainda não têm drafts"""
     try:
-        response = requests.get(
-            f"{API_URL}/api/offers",
-            params={"active": "true", "limit": 50}
-        )
-        offers = response.json()
-        
-        # Filtrar ofertas sem drafts
+        offers, _ = fetch_offers_page()
         return [o for o in offers if o.get("_count", {}).get("drafts", 0) == 0]
-        
     except Exception as e:
         logger.error(f"Erro ao buscar ofertas: {e}")
         return []
 
 
-def run_publisher():
-    """Executa o publicador de ofertas"""
-    logger.info("=== Iniciando IA Publicadora ===")
+def start_publisher_run() -> DraftCreator:
+    """Cria o DraftCreator da execução com a tabela de canais em dia"""
+    creator = DraftCreator(plan_store=default_plan_store())
     
-    creator = DraftCreator()
+    # Atualizar a tabela de canais com os envios concluídos e os cliques novos
+    table = creator.channel_recommender.table
+    publications = sync_publications(table)
+    clicks = sync_clicks(table)
+    if publications or clicks:
+        logger.info(f"Tabela de canais atualizada com {publications} envios e {clicks} cliques")
+    return creator
+
+
+def publisher_stages(creator: DraftCreator) -> List[Stage]:
+    """Estágios de copy/canais e envio do draft"""
+    return [
+        Stage("copy", creator.prepare, workers=PUBLISHER_COPY_WORKERS),
+        Stage("submit", creator.submit, workers=PUBLISHER_SUBMIT_WORKERS),
+    ]
+
+
+def finish_publisher_run(creator: DraftCreator):
+    """Confere as cargas com o servidor e grava a tabela de canais e os planos usados"""
+    creator.batch_selector.reconcile()
+    
+    if creator.plan_store:
+        creator.plan_store.flush()
+    creator.copy_generator.copy_cache.flush()
+    
+    try:
+        creator.channel_recommender.table.save()
+    except Exception as e:
+        logger.error(f"Erro ao salvar tabela de canais: {e}")
+
+
+# Fração do PUBLISHER_TIME_LIMIT que a leitura do feed pode usar quando há
+# PUBLISHER_MAX_DRAFTS (o ranking lê o feed antes do primeiro draft)
+FEED_READ_SHARE = 0.5
+
+
+def publish_pending(creator: DraftCreator, offer_filter: Optional[Callable[[Dict], bool]] = None) -> int:
+    """Cria drafts das ofertas sem drafts, das mais valiosas para as menos; retorna quantos"""
+    # Copy/canais e envio rodam em estágios sobrepostos
+    pipeline = Pipeline(publisher_stages(creator), queue_size=PUBLISHER_QUEUE_SIZE)
+    
+    # Consumir o feed de ofertas sem drafts, das mais valiosas para as menos
+    started = time.monotonic()
+    deadline = started + PUBLISHER_TIME_LIMIT if PUBLISHER_TIME_LIMIT else None
+    feed = iter_offers_without_drafts()
+    if offer_filter:
+        feed = filter(offer_filter, feed)
+    if PUBLISHER_MAX_DRAFTS and deadline:
+        # Com limite, nenhum draft sai antes do fim da leitura: ela para na
+        # fração do prazo e as melhores ofertas saem do que foi lido até ali
+        feed = until(feed, started + PUBLISHER_TIME_LIMIT * FEED_READ_SHARE)
+    offers = prioritize(
+        feed,
+        creator.score_offer,
+        limit=PUBLISHER_MAX_DRAFTS or None,
+        window=PUBLISHER_PRIORITY_WINDOW,
+    )
+    draft_ids = pipeline.run(until(offers, deadline))
     
-    # Buscar ofertas sem drafts
-    offers = get_offers_without_drafts()
-    logger.info(f"Encontradas {len(offers)} ofertas sem drafts")
+    found = pipeline.processed["copy"] + pipeline.failed["copy"]
+    logger.info(f"Processadas {found} ofertas sem drafts")
+    return len(draft_ids)
+
+
+def run_publisher(offer_filter: Optional[Callable[[Dict], bool]] = None):
+    """
+    Executa o publicador de ofertas
+    
+    Args:
+        offer_filter: cria drafts só das ofertas aceitas (ex.: faixas deste worker)
+    """
+    logger.info("=== Iniciando IA Publicadora ===")
     
-    # Criar drafts
-    created = 0
-    for offer in offers:
-        if creator.create_draft(offer):
-            created += 1
+    creator = start_publisher_run()
+    created = publish_pending(creator, offer_filter)
+    finish_publisher_run(creator)
     
     logger.info(f"=== Publicação finalizada: {created} drafts criados ===")
     return created
@@ -0,0 +1,122 @@
+"""
+Pipeline em estágios para o publicador
+
+Cada estágio roda em seu próprio conjunto de threads e é ligado ao próximo
+por uma fila limitada: quando um estágio lento enche sua fila de entrada, os
+anteriores ficam bloqueados (backpressure) em vez de acumular trabalho em
+memória. Assim a geração de copy das próximas ofertas acontece enquanto os
+drafts das anteriores ainda estão sendo enviados.
+"""
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, List, Optional
+from loguru import logger
+
+from metrics import get_metrics
+
+STAGE_ITEMS = get_metrics().counter(
+    "promo_stage_items_total", "Itens que passaram por cada estágio", ["stage", "outcome"]
+)
+STAGE_SECONDS = get_metrics().histogram("promo_stage_seconds", "Tempo por item em cada estágio", ["stage"])
+QUEUE_DEPTH = get_metrics().gauge("promo_stage_queue_depth", "Itens na fila de entrada de cada estágio", ["stage"])
+
+# Marca de fim de fluxo entre estágios
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """Estágio do pipeline: função aplicada a cada item por N workers"""
+    name: str
+    fn: Callable[[Any], Optional[Any]]
+    workers: int = 1
+
+
+class Pipeline:
+    """Encadeia estágios por filas limitadas"""
+
+    def __init__(self, stages: List[Stage], queue_size: int = 10):
+        if not stages:
+            raise ValueError("Pipeline precisa de ao menos um estágio")
+        self.stages = stages
+        self.queue_size = queue_size
+        self.processed = {stage.name: 0 for stage in stages}
+        self.failed = {stage.name: 0 for stage in stages}
+        self._counter_lock = threading.Lock()
+
+    def _count(self, counters: dict, name: str):
+        with self._counter_lock:
+            counters[name] += 1
+
+    def _run_stage(self, stage: Stage, inbox: queue.Queue, outbox: Optional[queue.Queue],
+                   results: List[Any], remaining: List[int], remaining_lock: threading.Lock):
+        while True:
+            item = inbox.get()
+            QUEUE_DEPTH.set(inbox.qsize(), stage=stage.name)
+            if item is _DONE:
+                # Repassa a marca para os demais workers do mesmo estágio
+                inbox.put(_DONE)
+                break
+
+            start = time.perf_counter()
+            try:
+                result = stage.fn(item)
+            except Exception as e:
+                logger.error(f"Erro no estágio {stage.name}: {e}")
+                result = None
+            STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage.name)
+
+            if result is None:
+                self._count(self.failed, stage.name)
+                STAGE_ITEMS.inc(stage=stage.name, outcome="failed")
+                continue
+
+            self._count(self.processed, stage.name)
+            STAGE_ITEMS.inc(stage=stage.name, outcome="processed")
+            if outbox is not None:
+                outbox.put(result)
+            else:
+                with self._counter_lock:
+                    results.append(result)
+
+        # O último worker do estágio encerra o estágio seguinte
+        with remaining_lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last and outbox is not None:
+            outbox.put(_DONE)
+
+    def run(self, items: Iterable[Any]) -> List[Any]:
+        """Processa os itens por todos os estágios e retorna os resultados finais"""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results: List[Any] = []
+        threads = []
+
+        for index, stage in enumerate(self.stages):
+            inbox = queues[index]
+            outbox = queues[index + 1] if index + 1 < len(queues) else None
+            workers = max(stage.workers, 1)
+            remaining = [workers]
+            remaining_lock = threading.Lock()
+
+            for n in range(workers):
+                thread = threading.Thread(
+                    target=self._run_stage,
+                    args=(stage, inbox, outbox, results, remaining, remaining_lock),
+                    name=f"{stage.name}-{n}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        try:
+            for item in items:
+                queues[0].put(item)  # bloqueia quando o primeiro estágio está cheio
+        finally:
+            queues[0].put(_DONE)
+            for thread in threads:
+                thread.join()
+
+        return results
@@ -0,0 +1,256 @@
+"""
+Pré-cálculo de drafts antes das cargas
+
+O modo prewarm roda em segundo plano gerando copy e canais das ofertas
+ainda sem draft e guarda o resultado num arquivo local. Na hora da carga o
+publicador só envia os planos prontos, sem esperar a IA.
+"""
+import json
+import os
+import threading
+import time
+from dataclasses import asdict
+from typing import Dict, Optional
+from loguru import logger
+
+from config import PREWARM_STORE_PATH, PREWARM_TTL_HOURS, PREWARM_INTERVAL, PREWARM_MAX_PLANS, PUBLISHER_PRIORITY_WINDOW
+
+
+def offer_fingerprint(offer: Dict) -> str:
+    """Identifica a versão da oferta usada para gerar o plano"""
+    niche = (offer.get("niche") or {}).get("slug", "")
+    return "|".join(str(v) for v in (
+        offer.get("title"),
+        offer.get("originalPrice"),
+        offer.get("finalPrice"),
+        offer.get("discount"),
+        niche,
+    ))
+
+
+class PlanStore:
+    """
+    Planos de draft prontos, persistidos em JSON por id de oferta
+
+    Alterações ficam em memória e são gravadas de uma vez por flush() (uma
+    vez por ciclo de prewarm ou por execução do publicador). O arquivo é
+    relido no máximo a cada RELOAD_INTERVAL segundos, para ver planos
+    gravados por outro processo (ex.: `main.py prewarm`), sem perder as
+    alterações locais ainda não gravadas.
+
+    Também marca as ofertas com plano em preparação, para que o prewarm e
+    o publicador não chamem a IA para a mesma oferta ao mesmo tempo.
+    """
+
+    RELOAD_INTERVAL = 5.0  # segundos entre verificações do arquivo
+
+    def __init__(self, path: str = PREWARM_STORE_PATH, ttl_hours: float = PREWARM_TTL_HOURS):
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        self._lock = threading.Lock()
+        self._plans: Dict[str, Dict] = {}
+        self._pending: Dict[str, Optional[Dict]] = {}  # alterações não gravadas (None = removido)
+        self._in_flight: Dict[str, threading.Event] = {}
+        self._mtime = 0.0
+        self._checked_at = 0.0
+        self._load(force=True)
+
+    def _load(self, force: bool = False):
+        """Relê o arquivo se outro processo o alterou"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.RELOAD_INTERVAL:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                plans = json.load(f)
+            self._mtime = mtime
+        except Exception as e:
+            logger.error(f"Erro ao ler planos pré-calculados: {e}")
+            return
+        for key, entry in self._pending.items():
+            if entry is None:
+                plans.pop(key, None)
+            else:
+                plans[key] = entry
+        self._plans = plans
+
+    def _set(self, key: str, entry: Optional[Dict]):
+        if entry is None:
+            self._plans.pop(key, None)
+        else:
+            self._plans[key] = entry
+        self._pending[key] = entry
+
+    def flush(self) -> None:
+        """Grava as alterações pendentes em disco"""
+        with self._lock:
+            if not self._pending:
+                return
+            self._load(force=True)
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._plans, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+                self._mtime = os.path.getmtime(self.path)
+                self._pending.clear()
+            except OSError as e:
+                logger.error(f"Erro ao gravar planos pré-calculados: {e}")
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def has(self, offer: Dict) -> bool:
+        """Indica se já existe plano válido para a versão atual da oferta"""
+        return self.get(offer) is not None
+
+    def get(self, offer: Dict) -> Optional[Dict]:
+        """Retorna o plano da oferta, se ainda for válido"""
+        with self._lock:
+            self._load()
+            entry = self._plans.get(offer.get("id"))
+        if not entry:
+            return None
+        if entry["fingerprint"] != offer_fingerprint(offer):
+            return None
+        if time.time() - entry["prepared_at"] > self.ttl:
+            return None
+        return entry["plan"]
+
+    def put(self, plan) -> None:
+        """Guarda um DraftPlan"""
+        data = asdict(plan)
+        offer = data.pop("offer")
+        with self._lock:
+            self._set(offer["id"], {
+                "fingerprint": offer_fingerprint(offer),
+                "prepared_at": time.time(),
+                "plan": data,
+            })
+
+    def discard(self, offer_id: str) -> None:
+        """Remove o plano de uma oferta (ex.: draft já criado)"""
+        with self._lock:
+            if offer_id in self._plans:
+                self._set(offer_id, None)
+
+    def prune(self) -> int:
+        """Remove planos expirados"""
+        now = time.time()
+        with self._lock:
+            self._load()
+            expired = [k for k, v in self._plans.items() if now - v["prepared_at"] > self.ttl]
+            for key in expired:
+                self._set(key, None)
+        return len(expired)
+
+    # ==================== EM PREPARAÇÃO ====================
+
+    def begin(self, offer_id: str) -> bool:
+        """Marca o plano da oferta como em preparação; False se já estiver"""
+        with self._lock:
+            if offer_id in self._in_flight:
+                return False
+            self._in_flight[offer_id] = threading.Event()
+            return True
+
+    def end(self, offer_id: str) -> None:
+        """Encerra a preparação (depois do put, se houve plano)"""
+        with self._lock:
+            event = self._in_flight.pop(offer_id, None)
+        if event:
+            event.set()
+
+    def wait(self, offer: Dict, timeout: float) -> Optional[Dict]:
+        """Aguarda a preparação em andamento e retorna o plano resultante"""
+        with self._lock:
+            event = self._in_flight.get(offer.get("id"))
+        if event:
+            event.wait(timeout)
+        return self.get(offer)
+
+
+_default_store: Optional[PlanStore] = None
+_default_store_lock = threading.Lock()
+
+
+def default_plan_store() -> PlanStore:
+    """Store compartilhado pelo prewarm e pelo publicador no mesmo processo"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = PlanStore()
+        return _default_store
+
+
+def prewarm_once(creator, offers, max_plans: int = PREWARM_MAX_PLANS) -> int:
+    """
+    Pré-calcula planos para ofertas ainda sem plano válido
+    
+    Cada ciclo recomeça o orçamento de IA por execução, mas continua preso
+    ao teto diário compartilhado com o publicador (AI_CALLS_PER_DAY).
+    """
+    store = creator.plan_store
+    store.prune()
+    creator.reload_channel_table()
+    creator.copy_generator.reset_budget()
+
+    prepared = 0
+    try:
+        for offer in offers:
+            if prepared >= max_plans:
+                break
+            # Plano pronto, ou o publicador já está gerando este agora
+            if store.has(offer) or not store.begin(offer["id"]):
+                continue
+            try:
+                plan = creator.build_plan(offer)
+                if plan:
+                    store.put(plan)
+                    prepared += 1
+            finally:
+                store.end(offer["id"])
+    finally:
+        store.flush()
+        creator.copy_generator.copy_cache.flush()
+
+    return prepared
+
+
+def run_prewarm_loop(stop_event: Optional[threading.Event] = None, interval: int = PREWARM_INTERVAL):
+    """Mantém os planos das próximas ofertas prontos até stop_event ser sinalizado"""
+    from publisher.main import DraftCreator, iter_offers_without_drafts
+    from publisher.priority import prioritize
+
+    stop_event = stop_event or threading.Event()
+    creator = DraftCreator(plan_store=default_plan_store())
+    logger.info(f"🔥 Prewarm iniciado (a cada {interval}s)")
+
+    while not stop_event.is_set():
+        try:
+            # Mais valiosas primeiro: são elas que recebem o orçamento de IA
+            offers = prioritize(iter_offers_without_drafts(), creator.score_offer, window=PUBLISHER_PRIORITY_WINDOW)
+            prepared = prewarm_once(creator, offers)
+            if prepared:
+                logger.info(f"🔥 Prewarm: {prepared} planos prontos ({len(creator.plan_store)} no total)")
+        except Exception as e:
+            logger.error(f"Erro no prewarm: {e}")
+        stop_event.wait(interval)
+
+
+def start_prewarm_thread() -> threading.Event:
+    """Inicia o prewarm em thread de fundo e retorna o evento para pará-lo"""
+    stop_event = threading.Event()
+    thread = threading.Thread(target=run_prewarm_loop, args=(stop_event,), name="prewarm", daemon=True)
+    thread.start()
+    return stop_event
@@ -0,0 +1,58 @@
+"""
+Ordenação das ofertas por valor antes da criação de drafts
+
+O feed de ofertas é paginado e pode ser maior que a memória disponível, então
+a ordenação usa heaps limitados e a garantia de ordem depende do modo:
+
+- com limite de drafts por execução, mantém as N melhores entre todas as
+  ofertas lidas (min-heap de tamanho N) e só entrega depois de ler o feed
+  inteiro; quem chama limita a leitura (until) quando há prazo;
+- sem limite, a ordem é só local: sai sempre a melhor oferta entre as
+  `window` + 1 lidas e ainda não entregues, então uma oferta sai no máximo
+  `window` posições depois da sua posição no feed e nunca antes de ofertas
+  melhores que estejam até `window` posições depois dela. A ordem só é
+  global se o feed couber na janela. A janela padrão é de uma página do
+  feed, para a primeira oferta sair logo que a primeira página chega.
+"""
+import heapq
+import itertools
+import time
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+
+def prioritize(
+    offers: Iterable[Dict],
+    score: Callable[[Dict], float],
+    limit: Optional[int] = None,
+    window: int = 50,
+) -> Iterator[Dict]:
+    """Entrega as ofertas da mais valiosa para a menos valiosa (ver garantias no módulo)"""
+    seq = itertools.count()  # desempate estável sem comparar dicts
+
+    if limit:
+        best = []
+        for offer in offers:
+            entry = (score(offer), -next(seq), offer)
+            if len(best) < limit:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+        for _, _, offer in sorted(best, reverse=True):
+            yield offer
+        return
+
+    pending = []
+    for offer in offers:
+        heapq.heappush(pending, (-score(offer), next(seq), offer))
+        if len(pending) > window:
+            yield heapq.heappop(pending)[2]
+    while pending:
+        yield heapq.heappop(pending)[2]
+
+
+def until(items: Iterable, deadline: Optional[float]) -> Iterator:
+    """Interrompe o iterador quando o prazo (time.monotonic) é atingido"""
+    for item in items:
+        if deadline is not None and time.monotonic() >= deadline:
+            return
+        yield item
@@ -0,0 +1,152 @@
+"""
+Templates de copy pré-compilados (fallback sem IA)
+
+Os templates são validados (string.Formatter().parse), agrupados por nicho
+e convertidos em funções com uma f-string uma única vez na criação do
+engine. Por oferta resta escolher o template e chamar a função com os
+valores crus da oferta: sem interpretar o template nem montar um dict de
+campos a cada chamada, e com os preços formatados dentro da própria
+f-string.
+A escolha do template é determinística: depende apenas da seed e do id da
+oferta, então a mesma oferta recebe a mesma copy em qualquer execução com
+a mesma seed.
+
+Os templates por nicho mudam a copy publicada (ex.: citam a loja) e só são
+usados com COPY_NICHE_TEMPLATES=true.
+"""
+import sys
+import zlib
+from string import Formatter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+sys.path.append('..')
+from config import COPY_NICHE_TEMPLATES
+
+# Templates padrão (os mesmos do gerador original)
+DEFAULT_TEMPLATES = [
+    "🔥 OFERTA IMPERDÍVEL!\n\n{title}\n\nDe R$ {original} por apenas R$ {final}!\n\n⚡ {discount}% de desconto - Corre que é por tempo limitado!",
+    "💰 PREÇO BAIXOU!\n\n{title}\n\nAntes: R$ {original}\nAgora: R$ {final}\n\n🏷️ Economize {discount}%!",
+    "⚡ PROMOÇÃO RELÂMPAGO!\n\n{title}\n\nR$ {final} ({discount}% OFF)\n\n🛒 Aproveite enquanto dura!",
+    "🎯 ACHADO DO DIA!\n\n{title}\n\nPreço especial: R$ {final}\nDesconto de {discount}%\n\n✅ Oferta verificada!",
+    "🛍️ OPORTUNIDADE!\n\n{title}\n\nDe R$ {original} → R$ {final}\n\n💸 Você economiza {discount}%!",
+]
+
+# Templates por nicho (somados aos padrão, se COPY_NICHE_TEMPLATES)
+NICHE_TEMPLATES = {
+    "eletronicos": [
+        "📱 TECH EM OFERTA!\n\n{title}\n\nDe R$ {original} por R$ {final}\n\n⚡ {discount}% OFF na {store}!",
+        "🎮 PRA QUEM TAVA ESPERANDO BAIXAR\n\n{title}\n\nR$ {final} ({discount}% OFF)",
+    ],
+    "moda": [
+        "👗 LOOK NOVO COM DESCONTO!\n\n{title}\n\nDe R$ {original} por R$ {final}\n\n🏷️ {discount}% OFF",
+    ],
+    "casa": [
+        "🏠 PRA DEIXAR A CASA EM DIA\n\n{title}\n\nR$ {final} ({discount}% OFF) na {store}",
+    ],
+    "beleza": [
+        "💄 BELEZA EM PROMOÇÃO!\n\n{title}\n\nDe R$ {original} por R$ {final}\n\n✨ {discount}% de desconto",
+    ],
+}
+
+# Campos disponíveis nos templates
+TEMPLATE_FIELDS = ("title", "original", "final", "discount", "store")
+
+# Preenchedor: (title, original, final, discount, store) -> copy
+Filler = Callable[[str, Optional[float], float, object, str], str]
+CompiledTemplate = Tuple[Filler, frozenset]
+
+# Campos de preço, formatados com duas casas na própria f-string
+PRICE_FIELDS = ("original", "final")
+
+
+def compile_template(template: str, with_original: bool = True) -> CompiledTemplate:
+    """
+    Valida o template uma única vez e retorna (preenchedor, campos usados)
+
+    O preenchedor é uma função gerada com o texto do template numa f-string,
+    que recebe os valores da oferta por posição. Só são aceitos campos
+    simples de TEMPLATE_FIELDS, sem formatação nem conversão, então o código
+    gerado só referencia esses nomes. Com with_original=False o preço
+    original sai vazio (oferta sem preço original).
+    """
+    parts = []
+    fields = set()
+    for literal, field, spec, conversion in Formatter().parse(template):
+        parts.append(literal.replace("{", "{{").replace("}", "}}"))
+        if field is None:
+            continue
+        if field not in TEMPLATE_FIELDS or spec or conversion:
+            raise ValueError(f"Campo inválido no template: {{{field}}}")
+        fields.add(field)
+        if field == "original" and not with_original:
+            continue
+        parts.append(f"{{{field}:.2f}}" if field in PRICE_FIELDS else f"{{{field}}}")
+
+    source = f"lambda {', '.join(TEMPLATE_FIELDS)}: f{''.join(parts)!r}"
+    fill = eval(source, {"__builtins__": {}})
+    return fill, frozenset(fields)
+
+
+class TemplateEngine:
+    """Renderiza copy de fallback a partir de templates pré-compilados"""
+
+    def __init__(
+        self,
+        seed: int = 0,
+        default_templates: List[str] = None,
+        niche_templates: Dict[str, List[str]] = None,
+    ):
+        self.seed = seed
+        self._seed_crc = zlib.crc32(f"{seed}:".encode("utf-8"))
+        self._default = self._compile_pool(default_templates or DEFAULT_TEMPLATES)
+        if niche_templates is None:
+            niche_templates = NICHE_TEMPLATES if COPY_NICHE_TEMPLATES else {}
+        self._by_niche = {
+            niche: self._compile_pool((default_templates or DEFAULT_TEMPLATES) + templates)
+            for niche, templates in niche_templates.items()
+        }
+
+    @staticmethod
+    def _compile_pool(templates: List[str]) -> Dict[bool, List[Filler]]:
+        """Preenchedores por presença do preço original (sem ele, só templates que não o usam)"""
+        with_original = [compile_template(t) for t in templates]
+        without_original = [compile_template(t, with_original=False)[0] for t in templates]
+        return {
+            True: [fill for fill, _ in with_original],
+            False: [
+                fill for fill, (_, fields) in zip(without_original, with_original)
+                if "original" not in fields
+            ] or without_original,
+        }
+
+    def render(self, offer: Dict) -> str:
+        """Renderiza a copy de uma oferta"""
+        return self.render_many((offer,))[0]
+
+    def render_many(self, offers: Iterable[Dict]) -> List[str]:
+        """Renderiza a copy de uma lista de ofertas, na mesma ordem"""
+        by_niche = self._by_niche
+        default = self._default
+        seed_crc = self._seed_crc
+        crc32 = zlib.crc32
+        rendered = []
+        append = rendered.append
+
+        for offer in offers:
+            niche = offer.get('niche')
+            pool = by_niche.get(niche.get('slug'), default) if niche and by_niche else default
+            original = offer.get('originalPrice')
+            fillers = pool[bool(original)]
+            key = str(offer.get('id') or offer['title']).encode("utf-8")
+            fill = fillers[crc32(key, seed_crc) % len(fillers)]
+
+            store = offer.get('store') or {}
+            append(fill(
+                offer['title'],
+                original,
+                offer['finalPrice'],
+                offer['discount'],
+                store.get('name', 'Loja') if isinstance(store, dict) else str(store),
+            ))
+
+        return rendered
@@ -0,0 +1,23 @@
+"""
+Configuração dos testes dos workers
+
+Os módulos dos workers se importam pelo diretório raiz (from config import
+..., from dispatcher import ...), como em `python main.py`.
+"""
+import os
+import sys
+
+import pytest
+
+WORKERS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if WORKERS_DIR not in sys.path:
+    sys.path.insert(0, WORKERS_DIR)
+
+
+@pytest.fixture(autouse=True)
+def isolated_process_state(tmp_path, monkeypatch):
+    """Cada teste usa cache de copy e teto diário de IA próprios (os do processo são compartilhados)"""
+    from publisher import copy_cache
+    from publisher import main as publisher
+    monkeypatch.setattr(copy_cache, "_cache", copy_cache.CopyCache(str(tmp_path / "ai_copy.json")))
+    monkeypatch.setattr(publisher, "_daily_ai_budget", None)
@@ -0,0 +1,82 @@
+"""
+Dublês da API usados pelos testes
+
+FakeApi responde por (método, caminho) e guarda as requisições; cada
+rota é uma FakeResponse fixa ou uma função (params, json) -> FakeResponse.
+FakeAsyncApi é a mesma coisa para o cliente assíncrono.
+"""
+import copy
+from typing import Callable, Dict, List, Tuple, Union
+from urllib.parse import urlparse
+
+
+class FakeResponse:
+    def __init__(self, payload=None, status_code: int = 200):
+        self.payload = payload if payload is not None else {}
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self.payload
+
+    @property
+    def text(self) -> str:
+        return str(self.payload)
+
+
+Route = Union[FakeResponse, Callable[[Dict, Dict], FakeResponse]]
+
+
+class FakeApi:
+    """Cliente da API falso com a interface de api_client.ApiClient"""
+
+    def __init__(self, routes: Dict[Tuple[str, str], Route] = None):
+        self.routes = dict(routes or {})
+        self.requests: List[Tuple[str, str, Dict, Dict]] = []
+
+    def request(self, method: str, url: str, params=None, json=None, **kwargs) -> FakeResponse:
+        path = urlparse(url).path
+        params = dict(params or {})
+        json = copy.deepcopy(json)  # o chamador pode reaproveitar o dict
+        self.requests.append((method, path, params, json))
+        route = self.routes.get((method, path))
+        if route is None:
+            return FakeResponse({"error": "not found"}, status_code=404)
+        return route(params, json) if callable(route) else route
+
+    def calls(self, method: str, path: str) -> List[Tuple[Dict, Dict]]:
+        return [(params, body) for m, p, params, body in self.requests if (m, p) == (method, path)]
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def log_latency(self):
+        pass
+
+
+class FakeAsyncApi(FakeApi):
+    """Mesma FakeApi com a interface de api_client.AsyncApiClient"""
+
+    async def request(self, method: str, url: str, **kwargs) -> FakeResponse:
+        return FakeApi.request(self, method, url, **kwargs)
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
@@ -0,0 +1,52 @@
+"""Bloom filter com decaimento contra repetições"""
+from dispatcher.anti_repeat import DecayingBloomFilter, RecentOffers, offer_key
+
+
+def test_offer_key_normalizes_title():
+    assert offer_key("Fone  Bluetooth JBL!", "Amazon") == offer_key("fone bluetooth jbl", "amazon")
+    assert offer_key("Pão de Açúcar") == offer_key("pao de acucar")
+    assert offer_key("Fone", "Amazon") != offer_key("Fone", "Magalu")
+
+
+def test_added_keys_are_found_and_false_positives_are_rare():
+    bloom = DecayingBloomFilter(capacity=1000, fp_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"oferta-{i}")
+
+    assert all(f"oferta-{i}" in bloom for i in range(1000))
+    false_positives = sum(f"outra-{i}" in bloom for i in range(5000))
+    assert false_positives / 5000 < 0.03
+
+
+def test_keys_expire_after_the_window():
+    bloom = DecayingBloomFilter(capacity=100, window_hours=12, generations=4)
+    bloom.add("oferta")
+
+    bloom._started_at -= bloom.slice_seconds  # uma geração depois
+    assert "oferta" in bloom
+
+    bloom._started_at -= bloom.slice_seconds * bloom.generations  # janela inteira depois
+    assert "oferta" not in bloom
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    path = str(tmp_path / "bloom.bin")
+    bloom = DecayingBloomFilter(capacity=100)
+    bloom.add("oferta")
+    bloom.save(path)
+
+    loaded = DecayingBloomFilter(capacity=100)
+    assert loaded.load(path)
+    assert "oferta" in loaded
+    # Outra configuração não reaproveita os bits
+    assert not DecayingBloomFilter(capacity=200).load(path)
+
+
+def test_recent_offers_persist_between_runs(tmp_path):
+    config = {"anti_repeat_dir": str(tmp_path)}
+    recent = RecentOffers("telegram", config)
+    recent.remember("Fone Bluetooth", "Amazon")
+    recent.flush()
+
+    assert RecentOffers("telegram", config).seen("fone bluetooth", "amazon")
+    assert not RecentOffers("twitter", config).seen("fone bluetooth", "amazon")
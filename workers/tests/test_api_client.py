@@ -0,0 +1,101 @@
+"""Cliente HTTP compartilhado: retentativas, backoff e latência por endpoint"""
+import asyncio
+
+import httpx
+import pytest
+
+from api_client import ApiClient, AsyncApiClient
+
+
+def replies(*steps):
+    """Handler do MockTransport que devolve os passos em ordem (status ou exceção)"""
+    calls = []
+
+    def handler(request):
+        step = steps[min(len(calls), len(steps) - 1)]
+        calls.append(request.method)
+        if isinstance(step, Exception):
+            raise step
+        return httpx.Response(step, json={})
+
+    return handler, calls
+
+
+def client_with(handler, retries: int = 2, cls=ApiClient):
+    client = cls(base_url="http://api", retries=retries)
+    transport = httpx.MockTransport(handler)
+    client._client = (httpx.AsyncClient if cls is AsyncApiClient else httpx.Client)(base_url="http://api", transport=transport)
+    client._backoff = lambda attempt, response=None: 0
+    return client
+
+
+def test_idempotent_requests_retry_temporary_failures():
+    handler, calls = replies(503, 200)
+    assert client_with(handler).get("/api/offers").status_code == 200
+    assert calls == ["GET", "GET"]
+
+
+def test_retries_are_bounded():
+    handler, calls = replies(503)
+    assert client_with(handler, retries=2).get("/api/offers").status_code == 503
+    assert len(calls) == 3
+
+
+def test_post_is_retried_only_when_asked():
+    handler, calls = replies(503, 200)
+    assert client_with(handler).post("/api/drafts").status_code == 503
+    assert len(calls) == 1
+
+    handler, calls = replies(503, 200)
+    assert client_with(handler).post("/api/drafts", retry=True).status_code == 200
+    assert len(calls) == 2
+
+
+def test_connection_errors_are_retried_for_get_and_raised_for_post():
+    error = httpx.ConnectError("recusada")
+    handler, calls = replies(error, 200)
+    assert client_with(handler).get("/api/offers").status_code == 200
+
+    handler, calls = replies(error, 200)
+    with pytest.raises(httpx.ConnectError):
+        client_with(handler).post("/api/drafts")
+    assert len(calls) == 1
+
+
+def test_client_errors_are_not_retried():
+    handler, calls = replies(404, 200)
+    assert client_with(handler).get("/api/offers/x").status_code == 404
+    assert len(calls) == 1
+
+
+def test_backoff_honors_retry_after_up_to_the_maximum():
+    client = ApiClient(base_url="http://api")
+    assert client._backoff(0, httpx.Response(429, headers={"retry-after": "3"})) == 3
+    assert client._backoff(0, httpx.Response(429, headers={"retry-after": "600"})) == ApiClient.BACKOFF_MAX
+    assert 0 <= client._backoff(10) <= ApiClient.BACKOFF_MAX
+
+
+def test_latency_is_grouped_by_endpoint_with_ids_collapsed():
+    handler, _ = replies(200)
+    client = client_with(handler)
+    client.post("/api/offers/cl9zq2x8b0000abcdefghijkl/create-draft")
+    client.post("/api/offers/cl9zq2x8b0000mnopqrstuvwx/create-draft")
+    client.get("/api/batches/42")
+
+    stats = client.latency_stats()
+    assert set(stats) == {"POST /api/offers/:id/create-draft", "GET /api/batches/:id"}
+    assert stats["POST /api/offers/:id/create-draft"]["calls"] == 2
+
+
+def test_async_client_retries_the_same_way():
+    handler, calls = replies(502, 200)
+
+    async def scenario():
+        client = client_with(handler, cls=AsyncApiClient)
+        try:
+            return (await client.get("/api/drafts")).status_code
+        finally:
+            await client.close()
+
+    assert asyncio.run(scenario()) == 200
+    assert calls == ["GET", "GET"]
@@ -0,0 +1,111 @@
+"""Escolha da carga de cada draft e conflitos com cargas bloqueadas/fechadas"""
+import pytest
+
+from publisher import main as publisher
+from publisher.main import BatchSelector, DraftPlan
+from fakes import FakeApi, FakeResponse
+
+
+def batch(batch_id, pending=0, status="PENDING", time="23:59"):
+    return {"id": batch_id, "scheduledTime": time, "pendingCount": pending, "status": status}
+
+
+@pytest.fixture
+def api(monkeypatch):
+    api = FakeApi()
+    monkeypatch.setattr(publisher, "get_api_client", lambda: api)
+    return api
+
+
+def list_batches(api, batches):
+    api.routes[("GET", "/api/batches")] = FakeResponse({"data": batches})
+
+
+def test_assigns_to_the_least_loaded_pending_batch(api):
+    list_batches(api, [
+        batch("b1", pending=3),
+        batch("b2", pending=1),
+        batch("locked", pending=0, status="LOCKED"),
+        batch("closed", pending=0, status="CLOSED"),
+    ])
+    selector = BatchSelector()
+
+    assert [selector.get_next_batch() for _ in range(4)] == ["b2", "b2", "b1", "b2"]
+    assert len(api.calls("GET", "/api/batches")) == 1
+
+
+def test_no_pending_batch_means_no_assignment(api):
+    list_batches(api, [batch("locked", status="LOCKED")])
+    assert BatchSelector().get_next_batch() is None
+
+
+def test_release_returns_the_slot(api):
+    list_batches(api, [batch("b1", pending=1), batch("b2", pending=1)])
+    selector = BatchSelector()
+
+    assert selector.get_next_batch() == "b1"
+    selector.release("b1")
+    assert selector.get_next_batch() == "b1"
+
+
+def test_reconcile_drops_batches_locked_on_the_server(api):
+    list_batches(api, [batch("b1"), batch("b2", pending=5)])
+    selector = BatchSelector()
+    assert selector.get_next_batch() == "b1"
+
+    list_batches(api, [batch("b1", status="LOCKED"), batch("b2", pending=5)])
+    selector.reconcile()
+    assert selector.get_next_batch() == "b2"
+
+
+def test_creates_the_day_batches_when_there_are_none(api):
+    created = []
+
+    def generate(params, body):
+        created.append(True)
+        list_batches(api, [batch("b1")])
+        return FakeResponse({"data": [batch("b1")]}, status_code=201)
+
+    list_batches(api, [])
+    api.routes[("POST", "/api/batches/generate")] = generate
+
+    assert BatchSelector().get_next_batch() == "b1"
+    assert created == [True]
+
+
+@pytest.fixture
+def creator(api, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return publisher.DraftCreator()
+
+
+def plan(offer_id="o1"):
+    offer = {"id": offer_id, "title": "Fone Bluetooth", "discount": 50, "niche": {"slug": "eletronicos"}}
+    return DraftPlan(offer=offer, copy_text="copy", channels=["TELEGRAM"], priority="HIGH")
+
+
+def test_draft_rejected_by_a_locked_batch_goes_to_another(api, creator):
+    list_batches(api, [batch("b1"), batch("b2", pending=2)])
+
+    def create_draft(params, body):
+        if body["batchId"] == "b1":
+            return FakeResponse({"error": {"code": "BATCH_LOCKED", "message": "Carga já está bloqueada"}},
+                                status_code=400)
+        return FakeResponse({"data": {"id": "d1"}}, status_code=201)
+
+    api.routes[("POST", "/api/offers/o1/create-draft")] = create_draft
+
+    assert creator.submit(plan()) == "d1"
+    assert [body["batchId"] for _, body in api.calls("POST", "/api/offers/o1/create-draft")] == ["b1", "b2"]
+    # A carga recusada não volta nem depois da recarga
+    assert creator.batch_selector.get_next_batch() == "b2"
+
+
+def test_other_errors_release_the_slot(api, creator):
+    list_batches(api, [batch("b1"), batch("b2", pending=1)])
+    api.routes[("POST", "/api/offers/o1/create-draft")] = FakeResponse(
+        {"error": {"code": "NOT_FOUND", "message": "Oferta não encontrada"}}, status_code=404
+    )
+
+    assert creator.submit(plan()) is None
+    assert creator.batch_selector.get_next_batch() == "b1"
@@ -0,0 +1,178 @@
+"""Tabela de performance por canal e sincronização dos cliques e envios"""
+import pytest
+
+from publisher import channel_stats
+from publisher.channel_stats import ChannelPerformanceTable, discount_band, sync_clicks, sync_publications
+from fakes import FakeApi, FakeResponse
+
+
+def click(click_id: str, created_at: str, channel: str = "TELEGRAM", niche: str = "eletronicos", discount: int = 50):
+    return {
+        "id": click_id,
+        "createdAt": created_at,
+        "channel": channel,
+        "publishedPost": {"niche": {"slug": niche}, "discountPct": discount},
+    }
+
+
+class FakeClicksApi(FakeApi):
+    """Responde /api/stats/clicks com páginas indexadas pelo cursor recebido"""
+
+    def __init__(self, pages):
+        super().__init__({("GET", "/api/stats/clicks"): lambda params, _: pages[params.get("cursor")]})
+
+    @property
+    def clicks_requests(self):
+        return [params for params, _ in self.calls("GET", "/api/stats/clicks")]
+
+
+@pytest.fixture
+def table():
+    return ChannelPerformanceTable(min_samples=2)
+
+
+def use_api(monkeypatch, api: FakeClicksApi):
+    monkeypatch.setattr(channel_stats, "get_api_client", lambda: api)
+
+
+def test_discount_band():
+    assert [discount_band(d) for d in (None, 10, 30, 45, 50, 120)] == [0, 0, 1, 2, 3, 3]
+
+
+def test_recommend_needs_history_in_two_channels(table):
+    for _ in range(2):
+        table.record_publication("moda", 40, "TELEGRAM")
+    assert table.recommend("moda", 40) is None
+
+    for _ in range(2):
+        table.record_publication("moda", 40, "TWITTER")
+    table.record_click("moda", 40, "TWITTER")
+    assert table.recommend("moda", 40) == ["TWITTER"]
+    # Outra faixa de desconto não tem histórico
+    assert table.recommend("moda", 10) is None
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    path = str(tmp_path / "stats.bin")
+    table = ChannelPerformanceTable()
+    for channel in ("TELEGRAM", "TWITTER"):
+        for _ in range(table.min_samples):
+            table.record_publication("casa", 55, channel)
+    table.record_click("casa", 55, "TELEGRAM")
+    table.click_cursor = "abc"
+    table.save(path)
+
+    loaded = ChannelPerformanceTable.load(path)
+    assert loaded.niches == ["casa"]
+    assert loaded.click_cursor == "abc"
+    assert loaded.recommend("casa", 55) == table.recommend("casa", 55) == ["TELEGRAM"]
+
+
+def test_sync_clicks_pages_and_advances_cursor(table, monkeypatch):
+    api = FakeClicksApi({
+        None: FakeResponse({"data": [click("1", "2026-01-01T10:00:00Z")], "meta": {"hasMore": True, "nextCursor": "c1"}}),
+        "c1": FakeResponse({"data": [click("2", "2026-01-01T11:00:00Z")], "meta": {"hasMore": False, "nextCursor": "c2"}}),
+    })
+    use_api(monkeypatch, api)
+
+    assert sync_clicks(table) == 2
+    assert table.click_cursor == "c2"
+    assert table.last_click_at == "2026-01-01T11:00:00Z"
+    assert all(request["order"] == "asc" for request in api.clicks_requests)
+
+
+def test_sync_clicks_resumes_from_last_applied_page_after_failure(table, monkeypatch):
+    use_api(monkeypatch, FakeClicksApi({
+        None: FakeResponse({"data": [click("1", "2026-01-01T10:00:00Z")], "meta": {"hasMore": True, "nextCursor": "c1"}}),
+        "c1": FakeResponse({}, status_code=500),
+    }))
+    assert sync_clicks(table) == 1
+    assert table.click_cursor == "c1"
+
+    # Próxima sincronização parte do cursor da última página aplicada
+    api = FakeClicksApi({
+        "c1": FakeResponse({"data": [click("2", "2026-01-01T11:00:00Z")], "meta": {"hasMore": False, "nextCursor": "c2"}}),
+    })
+    use_api(monkeypatch, api)
+    assert sync_clicks(table) == 1
+    assert api.clicks_requests[0]["cursor"] == "c1"
+    assert table.click_cursor == "c2"
+
+
+def test_sync_clicks_keeps_cursor_on_empty_page(table, monkeypatch):
+    table.click_cursor = "c5"
+    use_api(monkeypatch, FakeClicksApi({
+        "c5": FakeResponse({"data": [], "meta": {"hasMore": False, "nextCursor": None}}),
+    }))
+    assert sync_clicks(table) == 0
+    assert table.click_cursor == "c5"
+
+
+def test_sync_clicks_skips_clicks_seen_by_legacy_watermark(table, monkeypatch):
+    table.last_click_at = "2026-01-01T10:00:00Z"
+    api = FakeClicksApi({
+        None: FakeResponse({
+            "data": [click("1", "2026-01-01T09:00:00Z"), click("2", "2026-01-01T10:00:00Z"),
+                     click("3", "2026-01-01T12:00:00Z")],
+            "meta": {"hasMore": False, "nextCursor": "c3"},
+        }),
+    })
+    use_api(monkeypatch, api)
+
+    assert sync_clicks(table) == 1
+    assert api.clicks_requests[0]["dateFrom"] == "2026-01-01"
+    assert table.click_cursor == "c3"
+
+
+def test_sync_clicks_applies_nothing_from_a_page_it_cannot_read(table, monkeypatch):
+    broken = dict(click("2", "2026-01-01T11:00:00Z"), publishedPost={"niche": "sem-slug"})
+    use_api(monkeypatch, FakeClicksApi({
+        None: FakeResponse({"data": [click("1", "2026-01-01T10:00:00Z"), broken], "meta": {"hasMore": False, "nextCursor": "c2"}}),
+    }))
+
+    assert sync_clicks(table) == 0
+    # Nem o clique válido da página nem o cursor avançaram: a página volta inteira
+    assert table.niches == []
+    assert table.click_cursor is None
+    assert table.last_click_at is None
+
+
+def delivery(delivery_id: str, channel: str = "TELEGRAM", niche: str = "casa", discount: int = 55):
+    return {
+        "id": delivery_id,
+        "channel": channel,
+        "sentAt": "2026-01-01T10:00:00Z",
+        "draft": {"offer": {"discountPct": discount, "niche": {"slug": niche}}},
+    }
+
+
+def test_sync_publications_counts_sent_deliveries(table, monkeypatch):
+    pages = {
+        None: FakeResponse({"data": [delivery("1"), delivery("2")], "meta": {"hasMore": True, "nextCursor": "d2"}}),
+        "d2": FakeResponse({"data": [delivery("3", "SITE"), delivery("4", "SITE")], "meta": {"hasMore": False, "nextCursor": "d4"}}),
+    }
+    api = FakeApi({("GET", "/api/stats/deliveries"): lambda params, _: pages[params.get("cursor")]})
+    use_api(monkeypatch, api)
+
+    assert sync_publications(table) == 4
+    assert table.publication_cursor == "d4"
+    # Os dois canais têm as amostras mínimas e o mesmo CTR
+    assert sorted(table.recommend("casa", 55)) == ["SITE", "TELEGRAM"]
+    assert [params.get("cursor") for params, _ in api.calls("GET", "/api/stats/deliveries")] == [None, "d2"]
+
+
+def test_first_publication_sync_recounts_from_deliveries(table, monkeypatch):
+    # Tabela antiga: publicações contadas na criação do draft, mais os cliques
+    for _ in range(5):
+        table.record_publication("casa", 55, "FACEBOOK")
+        table.record_publication("casa", 55, "TELEGRAM")
+    table.record_click("casa", 55, "FACEBOOK")
+    assert table.recommend("casa", 55) == ["FACEBOOK"]
+
+    use_api(monkeypatch, FakeApi({("GET", "/api/stats/deliveries"): FakeResponse(
+        {"data": [delivery("1"), delivery("2")], "meta": {"hasMore": False, "nextCursor": "d2"}}
+    )}))
+    assert sync_publications(table) == 2
+
+    # Só o TELEGRAM foi de fato enviado: FACEBOOK fica sem amostras suficientes
+    assert table.recommend("casa", 55) is None
@@ -0,0 +1,74 @@
+"""Circuit breaker: transições entre fechado, aberto e meio-aberto"""
+from dispatcher.circuit_breaker import CircuitBreaker
+
+
+def make_breaker(**kwargs) -> CircuitBreaker:
+    options = {"failure_rate": 0.5, "window": 10, "min_calls": 4, "open_seconds": 30}
+    options.update(kwargs)
+    return CircuitBreaker(**options)
+
+
+def expire_open_period(breaker: CircuitBreaker):
+    breaker.opened_at -= breaker.open_seconds
+
+
+def test_stays_closed_below_min_calls():
+    breaker = make_breaker()
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record(False)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_opens_when_failure_rate_reaches_threshold():
+    breaker = make_breaker()
+    for success in (True, False, True, False):
+        breaker.record(success)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.rejected == 1
+    assert 0 < breaker.retry_in() <= 30
+
+
+def test_half_open_allows_a_single_probe():
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False)
+    expire_open_period(breaker)
+
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+
+def test_successful_probe_closes_and_clears_history():
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False)
+    expire_open_period(breaker)
+
+    assert breaker.allow()
+    breaker.record(True)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failure_rate == 0.0
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens():
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False)
+    expire_open_period(breaker)
+
+    assert breaker.allow()
+    breaker.record(False)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_from_config():
+    breaker = CircuitBreaker.from_config({"breaker_min_calls": "2", "breaker_open_seconds": "5"})
+    assert breaker.min_calls == 2
+    assert breaker.open_seconds == 5.0
+    assert breaker.failure_rate_threshold == CircuitBreaker.FAILURE_RATE
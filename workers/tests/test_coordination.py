@@ -0,0 +1,67 @@
+"""Leases de shards nos backends de coordenação"""
+import os
+import time
+import uuid
+
+import pytest
+
+from coordination import BACKENDS, PostgresBackend, SQLiteBackend, ShardCoordinator, get_backend
+
+POSTGRES_URL = os.getenv("COORDINATION_TEST_POSTGRES_URL")
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        yield get_backend(f"sqlite:///{tmp_path}/coordination.db")
+        return
+    if not POSTGRES_URL:
+        pytest.skip("COORDINATION_TEST_POSTGRES_URL não definida")
+    backend = get_backend(POSTGRES_URL)
+    yield backend
+    backend.release("a")
+    backend.release("b")
+
+
+def shards():
+    # Nomes únicos: o banco do Postgres pode ser compartilhado entre execuções
+    prefix = uuid.uuid4().hex[:6]
+    return [f"{prefix}:{n}" for n in range(4)]
+
+
+def test_backends_by_url_scheme():
+    assert BACKENDS["sqlite"] is SQLiteBackend
+    assert BACKENDS["postgresql"] is BACKENDS["postgres"] is PostgresBackend
+    with pytest.raises(ValueError):
+        get_backend("redis://localhost")
+
+
+def test_claimed_shards_are_exclusive_until_the_lease_expires(backend):
+    names = shards()
+    assert backend.claim("a", names, 2, ttl=0.2) == names[:2]
+    assert backend.claim("b", names, 4, ttl=60) == names[2:]
+
+    time.sleep(0.3)
+    assert backend.renew("a", ttl=60) == []
+    assert sorted(backend.claim("b", names, 4, ttl=60)) == sorted(names)
+
+
+def test_release_frees_shards_for_other_workers(backend):
+    names = shards()
+    backend.claim("a", names, 4, ttl=60)
+    backend.release("a", names[:1])
+    assert backend.claim("b", names, 4, ttl=60) == names[:1]
+
+
+def test_coordinators_split_the_shards(backend):
+    names = shards()
+    first = ShardCoordinator(names, backend, worker_id="a", lease_ttl=60, heartbeat_interval=1)
+    second = ShardCoordinator(names, backend, worker_id="b", lease_ttl=60, heartbeat_interval=1)
+
+    assert first.rebalance() == set(names)
+    second.rebalance()
+    # O primeiro libera o excedente no heartbeat seguinte e o segundo pega a sua parte
+    first.rebalance()
+    second.rebalance()
+    assert len(first.owned) == len(second.owned) == 2
+    assert first.owned | second.owned == set(names)
@@ -0,0 +1,109 @@
+"""Copy com IA dentro do orçamento de latência e fallback de template"""
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from publisher import main as publisher
+from publisher.copy_cache import CopyCache, get_copy_cache
+from publisher.main import CopyGenerator
+
+
+def offer(offer_id="o1", discount=60):
+    return {
+        "id": offer_id,
+        "title": "Fone Bluetooth",
+        "originalPrice": 200.0,
+        "finalPrice": 80.0,
+        "discount": discount,
+        "store": {"name": "Amazon"},
+    }
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    monkeypatch.setattr(publisher, "AI_CALLS_PER_RUN", 2)
+    monkeypatch.setattr(publisher, "AI_MIN_SCORE", 40)
+    gen = CopyGenerator(seed=1)
+    gen.use_ai = True
+    gen.latency_budget = 0.05
+    return gen
+
+
+def test_generators_share_the_process_cache():
+    assert get_copy_cache() is get_copy_cache()
+    assert CopyGenerator().copy_cache is CopyGenerator().copy_cache is get_copy_cache()
+
+
+def test_fast_ai_answer_is_used_and_spends_budget(generator, monkeypatch):
+    monkeypatch.setattr(generator, "_request_ai_copy", lambda o: "copy da IA")
+
+    assert generator.generate(offer()) == "copy da IA"
+    assert generator._ai_calls == 1
+
+
+def test_low_score_offers_use_templates_without_spending_budget(generator, monkeypatch):
+    monkeypatch.setattr(generator, "_request_ai_copy", lambda o: pytest.fail("não deveria chamar a IA"))
+
+    assert generator.generate(offer(discount=10)) == generator.generate_fallback(offer(discount=10))
+    assert generator._ai_calls == 0
+
+
+def test_run_budget_caps_ai_calls(generator, monkeypatch):
+    calls = []
+    monkeypatch.setattr(generator, "_request_ai_copy", lambda o: calls.append(o["id"]) or "copy da IA")
+
+    for i in range(4):
+        generator.generate(offer(f"o{i}"))
+    assert calls == ["o0", "o1"]
+
+    generator.reset_budget()
+    generator.generate(offer("o9"))
+    assert calls[-1] == "o9"
+
+
+def test_late_answer_falls_back_and_is_cached_for_next_run(generator, monkeypatch):
+    release = threading.Event()
+
+    def slow(o):
+        release.wait(2)
+        return "copy tardia"
+
+    monkeypatch.setattr(generator, "_request_ai_copy", slow)
+    assert generator.generate(offer()) == generator.generate_fallback(offer())
+
+    release.set()
+    deadline = time.monotonic() + 2
+    while generator.copy_cache.get(offer()) is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert generator.generate(offer()) == "copy tardia"
+
+
+def test_cancelled_call_refunds_slot_and_budget(generator):
+    class NeverStarts:
+        """Executor cuja chamada fica na fila, então o timeout consegue cancelá-la"""
+        def submit(self, fn, *args):
+            return Future()
+
+    generator._ai_executor = NeverStarts()
+    for i in range(5):
+        assert generator.generate(offer(f"o{i}")) == generator.generate_fallback(offer(f"o{i}"))
+
+    assert generator._ai_calls == 0
+    # Todas as threads de IA continuam livres
+    slots = [generator._ai_slots.acquire(blocking=False) for _ in range(publisher.AI_MAX_CONCURRENCY)]
+    assert all(slots)
+
+
+def test_cache_is_bounded_and_invalidated_when_the_offer_changes(tmp_path):
+    cache = CopyCache(str(tmp_path / "copy.json"), max_entries=2)
+    for i in range(3):
+        cache.put(offer(f"o{i}"), f"copy {i}")
+
+    assert cache.get(offer("o0")) is None
+    assert cache.get(offer("o2")) == "copy 2"
+    assert cache.get(dict(offer("o2"), finalPrice=70.0)) is None
+
+    cache.flush()
+    assert CopyCache(str(tmp_path / "copy.json")).get(offer("o1")) == "copy 1"
@@ -0,0 +1,89 @@
+"""Entrada do outbox a partir dos envios aprovados na API"""
+import asyncio
+
+import pytest
+
+from dispatcher.base import DispatchResult
+from dispatcher.draft_feed import DraftFeed, post_from_draft
+from dispatcher.outbox import Outbox
+from fakes import FakeAsyncApi, FakeResponse
+
+
+def draft(draft_id, deliveries):
+    return {
+        "id": draft_id,
+        "copyText": f"copy {draft_id}",
+        "offer": {
+            "title": f"Oferta {draft_id}",
+            "finalPrice": "79.90",
+            "originalPrice": "159.90",
+            "discountPct": 50,
+            "affiliateUrl": f"https://loja.example/{draft_id}",
+            "urgency": "HOJE",
+            "imageUrl": None,
+            "niche": {"slug": "eletronicos"},
+            "store": {"name": "Loja"},
+        },
+        "deliveries": [{"channel": c, "status": s} for c, s in deliveries],
+    }
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    box = Outbox(str(tmp_path / "outbox.db"))
+    yield box
+    box.close()
+
+
+def paged(pages):
+    def route(params, _json):
+        page = params["page"]
+        return FakeResponse({"data": pages[page - 1], "meta": {"page": page, "totalPages": len(pages)}})
+    return route
+
+
+def test_post_from_draft_converts_api_fields():
+    post = post_from_draft(draft("d1", []))
+    assert post.id == "d1"
+    assert post.price == 79.9
+    assert post.original_price == 159.9
+    assert post.niche == "eletronicos"
+    assert post.store == "Loja"
+
+
+def test_poll_enqueues_pending_deliveries_of_served_channels(outbox):
+    api = FakeAsyncApi({("GET", "/api/drafts"): paged([
+        [draft("d1", [("TELEGRAM", "PENDING"), ("SITE", "SENT")])],
+        [draft("d2", [("TELEGRAM", "SENT"), ("TWITTER", "PENDING"), ("WHATSAPP", "PENDING")])],
+    ])})
+    feed = DraftFeed(outbox, ["telegram", "twitter"], api=api)
+
+    assert asyncio.run(feed.poll()) == 2
+    # Os mesmos envios numa nova busca não entram de novo
+    assert asyncio.run(feed.poll()) == 0
+
+    assert [params["page"] for params, _ in api.calls("GET", "/api/drafts")] == [1, 2, 1, 2]
+    assert api.calls("GET", "/api/drafts")[0][0]["deliveryStatus"] == "PENDING"
+    keys = sorted(item.idempotency_key for item in outbox.claim("w"))
+    assert keys == ["d1:TELEGRAM", "d2:TWITTER"]
+
+
+def test_poll_raises_on_api_error(outbox):
+    api = FakeAsyncApi({("GET", "/api/drafts"): FakeResponse({}, status_code=500)})
+    with pytest.raises(RuntimeError):
+        asyncio.run(DraftFeed(outbox, ["TELEGRAM"], api=api).poll())
+    assert outbox.counts() == {}
+
+
+def test_report_writes_the_delivery_result(outbox):
+    api = FakeAsyncApi({("POST", "/api/drafts/d1/deliveries/TELEGRAM"): FakeResponse({"data": {}})})
+    feed = DraftFeed(outbox, ["TELEGRAM"], api=api)
+    outbox.enqueue(post_from_draft(draft("d1", [])), "TELEGRAM")
+    [item] = outbox.claim("w")
+
+    asyncio.run(feed.report(item, DispatchResult(success=True, channel="TELEGRAM", external_id="42")))
+    asyncio.run(feed.report(item, DispatchResult(success=False, channel="TELEGRAM", skipped=True)))
+
+    [(_, sent), (_, skipped)] = api.calls("POST", "/api/drafts/d1/deliveries/TELEGRAM")
+    assert sent == {"status": "SENT", "externalId": "42"}
+    assert skipped["status"] == "ERROR"
@@ -0,0 +1,73 @@
+"""Fan-out: canais em paralelo, cada um com seu limite e seu timeout"""
+import asyncio
+
+from dispatcher.base import BaseDispatcher, DispatchResult, PostContent
+from dispatcher.fanout import FanOutDispatcher
+
+
+def post(post_id: str = "p1") -> PostContent:
+    return PostContent(
+        id=post_id, title=f"Oferta {post_id}", copy_text="copy", price=10.0, original_price=20.0,
+        discount=50, affiliate_url="https://loja/x", niche="casa", store="Loja", urgency="NORMAL",
+    )
+
+
+class SlowDispatcher(BaseDispatcher):
+    """Demora `delay` segundos por envio e anota quantos envios ficaram em voo ao mesmo tempo"""
+
+    def __init__(self, channel: str, delay: float):
+        self.channel_name = channel
+        super().__init__({"anti_repeat_enabled": "false"})
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send(self, post):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        return DispatchResult(success=True, channel=self.channel_name, external_id=post.id)
+
+    async def validate_config(self):
+        return True
+
+
+class FakeRegistry:
+    def __init__(self, *dispatchers):
+        self.dispatchers = {d.channel_name: d for d in dispatchers}
+
+    def get(self, channel):
+        if channel not in self.dispatchers:
+            raise ValueError(f"Canal não suportado: {channel}")
+        return self.dispatchers[channel]
+
+
+def test_slow_channel_does_not_delay_the_others():
+    async def scenario():
+        fast = SlowDispatcher("TELEGRAM", delay=0)
+        slow = SlowDispatcher("TWITTER", delay=0.5)
+        fanout = FanOutDispatcher(FakeRegistry(fast, slow), timeout=0.05)
+        return await fanout.send(post(), ["telegram", "twitter", "instagram"])
+
+    telegram, twitter, instagram = asyncio.run(scenario())
+    assert telegram.success and telegram.channel == "TELEGRAM"
+    # O canal lento estoura o próprio timeout; o desconhecido falha sem derrubar o resto
+    assert not twitter.success and "Timeout" in twitter.error_message
+    assert not instagram.success and "INSTAGRAM" in instagram.error_message
+
+
+def test_concurrency_is_limited_per_channel():
+    async def scenario():
+        telegram = SlowDispatcher("TELEGRAM", delay=0.01)
+        twitter = SlowDispatcher("TWITTER", delay=0.01)
+        fanout = FanOutDispatcher(FakeRegistry(telegram, twitter), concurrency={"telegram": 1})
+        results = await fanout.send_many([(post(str(i)), ["TELEGRAM", "TWITTER"]) for i in range(6)])
+        return telegram, twitter, results
+
+    telegram, twitter, results = asyncio.run(scenario())
+    assert [[r.external_id for r in per_post] for per_post in results] == [[str(i)] * 2 for i in range(6)]
+    assert telegram.max_in_flight == 1
+    assert twitter.max_in_flight == FanOutDispatcher.DEFAULT_CONCURRENCY
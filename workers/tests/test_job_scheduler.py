@@ -0,0 +1,101 @@
+"""Scheduler: disparos perdidos, estado em disco e jobs do mesmo grupo em série"""
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from job_scheduler import JobScheduler
+
+
+@pytest.fixture
+def state_path(tmp_path):
+    return str(tmp_path / "scheduler.json")
+
+
+def scheduler(state_path, misfire_grace=3600):
+    jobs = JobScheduler(max_workers=2, misfire_grace=misfire_grace, state_path=state_path)
+    jobs.add_daily_job("pipeline", lambda: None, ["07:00", "13:00"])
+    return jobs
+
+
+def test_missed_fire_within_the_grace_is_recovered(state_path):
+    jobs = scheduler(state_path)
+    jobs._last_runs["pipeline"] = datetime(2026, 1, 2, 7, 0).isoformat()
+
+    assert jobs._missed_fire("pipeline", datetime(2026, 1, 2, 13, 30)) == datetime(2026, 1, 2, 13, 0)
+    # Já rodou depois do último horário: nada a recuperar
+    assert jobs._missed_fire("pipeline", datetime(2026, 1, 2, 12, 0)) is None
+
+
+def test_missed_fire_outside_the_grace_is_dropped(state_path):
+    jobs = scheduler(state_path, misfire_grace=600)
+    jobs._last_runs["pipeline"] = datetime(2026, 1, 2, 7, 0).isoformat()
+
+    assert jobs._missed_fire("pipeline", datetime(2026, 1, 2, 14, 0)) is None
+
+
+def test_missed_fire_of_the_previous_day(state_path):
+    jobs = scheduler(state_path)
+    jobs._last_runs["pipeline"] = datetime(2026, 1, 1, 7, 0).isoformat()
+
+    assert jobs._missed_fire("pipeline", datetime(2026, 1, 2, 0, 30)) is None
+    jobs.misfire_grace = 12 * 3600
+    assert jobs._missed_fire("pipeline", datetime(2026, 1, 2, 0, 30)) == datetime(2026, 1, 1, 13, 0)
+
+
+def test_first_start_recovers_nothing(state_path):
+    assert scheduler(state_path)._missed_fire("pipeline", datetime(2026, 1, 2, 13, 30)) is None
+
+
+def test_last_run_survives_a_restart(state_path):
+    jobs = scheduler(state_path)
+    run = jobs._jobs["pipeline"][0]
+    run()
+
+    restarted = scheduler(state_path)
+    assert datetime.fromisoformat(restarted._last_runs["pipeline"]) <= datetime.now()
+
+
+def test_jobs_of_the_same_group_run_one_after_the_other(state_path):
+    jobs = JobScheduler(max_workers=2, state_path=state_path)
+    running = []
+    overlaps = []
+    lock = threading.Lock()
+
+    def job(name):
+        def fn():
+            with lock:
+                if running:
+                    overlaps.append(name)
+                running.append(name)
+            time.sleep(0.05)
+            with lock:
+                running.remove(name)
+        return fn
+
+    jobs.add_daily_job("pipeline", job("pipeline"), ["07:00"], group="publish")
+    jobs.add_daily_job("publisher", job("publisher"), ["07:30"], group="publish")
+    threads = [threading.Thread(target=jobs._jobs[name][0]) for name in ("pipeline", "publisher")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert overlaps == []
+    assert set(jobs._last_runs) == {"pipeline", "publisher"}
+
+
+def test_failing_job_does_not_hold_the_group(state_path):
+    jobs = JobScheduler(state_path=state_path)
+    calls = []
+
+    def broken():
+        raise RuntimeError("falhou")
+
+    jobs.add_daily_job("pipeline", broken, ["07:00"], group="publish")
+    jobs.add_daily_job("publisher", lambda: calls.append("publisher"), ["07:30"], group="publish")
+    jobs._jobs["pipeline"][0]()
+    jobs._jobs["publisher"][0]()
+
+    assert calls == ["publisher"]
@@ -0,0 +1,86 @@
+"""Pipeline de mídia: índice, limpeza do cache e uploads únicos"""
+import asyncio
+import json
+import os
+
+import pytest
+
+from dispatcher.media import MediaPipeline, PreparedMedia
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    return MediaPipeline(cache_dir=str(tmp_path / "media"), max_cache_bytes=10)
+
+
+def index_on_disk(pipeline):
+    with open(os.path.join(pipeline.cache_dir, "index.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def media(content_hash="h1"):
+    return PreparedMedia(path=f"/tmp/{content_hash}", content_hash=content_hash, size=1)
+
+
+def test_concurrent_uploads_of_the_same_image_run_once(pipeline):
+    uploads = []
+
+    async def upload(item):
+        uploads.append(item.content_hash)
+        await asyncio.sleep(0.01)
+        return "file-1"
+
+    async def scenario():
+        ids = await asyncio.gather(*(pipeline.upload_once("telegram", media(), upload) for _ in range(5)))
+        # Depois do upload o media id vem do índice
+        ids.append(await pipeline.upload_once("TELEGRAM", media(), upload))
+        await pipeline.close()
+        return ids
+
+    assert asyncio.run(scenario()) == ["file-1"] * 6
+    assert uploads == ["h1"]
+
+
+def test_failed_upload_reaches_every_waiter(pipeline):
+    async def upload(item):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("falhou")
+
+    async def scenario():
+        return await asyncio.gather(
+            *(pipeline.upload_once("TELEGRAM", media(), upload) for _ in range(3)), return_exceptions=True
+        )
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(scenario()))
+    assert pipeline.get_media_id("TELEGRAM", "h1") is None
+
+
+def test_index_is_written_off_the_loop_and_on_close(pipeline, monkeypatch):
+    monkeypatch.setattr(MediaPipeline, "INDEX_SAVE_DELAY", 60)
+
+    async def scenario():
+        pipeline.remember_media_id("TELEGRAM", "h1", "file-1")
+        pipeline.remember_media_id("TELEGRAM", "h2", "file-2")
+        # Nada foi gravado ainda: a gravação está agendada
+        assert not os.path.exists(os.path.join(pipeline.cache_dir, "index.json"))
+        await pipeline.close()
+
+    asyncio.run(scenario())
+    assert set(index_on_disk(pipeline)["media_ids"]) == {"TELEGRAM:h1", "TELEGRAM:h2"}
+
+
+def test_evict_drops_removed_images_from_the_index(pipeline):
+    for name, data in (("old", b"x" * 8), ("new", b"y" * 8)):
+        with open(pipeline._path("original", name), "wb") as f:
+            f.write(data)
+    os.utime(pipeline._path("original", "old"), (1, 1))
+    pipeline._index["urls"] = {"https://a/old.jpg": "old", "https://a/new.jpg": "new"}
+    pipeline._index["media_ids"] = {"TELEGRAM:old": ["file-old", 0], "TELEGRAM:new": ["file-new", 0]}
+
+    pipeline.evict()
+    pipeline.flush()
+
+    assert not os.path.exists(pipeline._path("original", "old"))
+    saved = index_on_disk(pipeline)
+    assert saved["urls"] == {"https://a/new.jpg": "new"}
+    assert set(saved["media_ids"]) == {"TELEGRAM:new"}
@@ -0,0 +1,64 @@
+"""Métricas no formato texto do Prometheus"""
+import pytest
+
+from metrics.registry import Counter, Gauge, MetricsRegistry
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_counter_renders_labels_sorted(registry):
+    counter = registry.counter("jobs_total", "Jobs", ["kind"])
+    counter.inc(kind="b")
+    counter.inc(2, kind="a")
+
+    assert registry.render() == (
+        "# HELP jobs_total Jobs\n"
+        "# TYPE jobs_total counter\n"
+        'jobs_total{kind="a"} 2\n'
+        'jobs_total{kind="b"} 1\n'
+    )
+    with pytest.raises(ValueError):
+        counter.inc(-1, kind="a")
+    with pytest.raises(ValueError):
+        counter.inc(wrong="a")
+
+
+def test_gauge_goes_up_and_down(registry):
+    gauge = registry.gauge("queue_depth", "Fila")
+    gauge.set(5)
+    gauge.inc(2)
+    gauge.dec(4)
+
+    assert gauge.value() == 3
+    assert not isinstance(gauge, Counter)
+    assert "queue_depth 3" in registry.render()
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    histogram = registry.histogram("latency_seconds", "Latência", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, stage="copy")
+
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{stage="copy",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{stage="copy",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{stage="copy",le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum{stage="copy"} 4.25' in lines
+    assert 'latency_seconds_count{stage="copy"} 4' in lines
+
+
+def test_label_values_are_escaped(registry):
+    registry.counter("errors_total", "Erros", ["message"]).inc(message='say "oi"\n')
+    assert 'errors_total{message="say \\"oi\\"\\n"} 1' in registry.render()
+
+
+def test_registry_returns_the_same_metric_and_rejects_conflicts(registry):
+    assert registry.gauge("items", "Itens", ["status"]) is registry.gauge("items", "Itens", ["status"])
+    assert isinstance(registry.gauge("items", "Itens", ["status"]), Gauge)
+    with pytest.raises(ValueError):
+        registry.counter("items", "Itens", ["status"])
+    with pytest.raises(ValueError):
+        registry.gauge("items", "Itens", ["other"])
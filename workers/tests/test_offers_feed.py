@@ -0,0 +1,45 @@
+"""Leitura paginada das ofertas sem drafts"""
+import pytest
+
+from publisher import main as publisher
+from fakes import FakeApi, FakeResponse
+
+
+def offer(offer_id: str, drafts: int = 0):
+    return {"id": offer_id, "_count": {"drafts": drafts}}
+
+
+def use_pages(monkeypatch, pages):
+    api = FakeApi({("GET", "/api/offers"): lambda params, _: pages[params.get("cursor")]})
+    monkeypatch.setattr(publisher, "get_api_client", lambda: api)
+    return api
+
+
+def test_iterates_every_page_and_skips_offers_with_drafts(monkeypatch):
+    api = use_pages(monkeypatch, {
+        None: FakeResponse({"data": [offer("1"), offer("2", drafts=1)], "meta": {"nextCursor": "c2"}}),
+        "c2": FakeResponse({"data": [offer("3")], "meta": {"nextCursor": None}}),
+    })
+    assert [o["id"] for o in publisher.iter_offers_without_drafts()] == ["1", "3"]
+    assert [params.get("cursor") for params, _ in api.calls("GET", "/api/offers")] == [None, "c2"]
+
+
+def test_error_status_on_first_page_yields_nothing(monkeypatch):
+    use_pages(monkeypatch, {None: FakeResponse({"error": "boom"}, status_code=500)})
+    assert list(publisher.iter_offers_without_drafts()) == []
+    assert publisher.get_offers_without_drafts() == []
+
+
+def test_error_status_mid_feed_stops_after_the_pages_already_read(monkeypatch):
+    use_pages(monkeypatch, {
+        None: FakeResponse({"data": [offer("1")], "meta": {"nextCursor": "c2"}}),
+        "c2": FakeResponse({"error": "boom"}, status_code=503),
+    })
+    assert [o["id"] for o in publisher.iter_offers_without_drafts()] == ["1"]
+
+
+def test_fetch_offers_page_raises_on_error_status(monkeypatch):
+    # Um corpo de erro não pode ser lido como uma página vazia e sem próxima
+    use_pages(monkeypatch, {None: FakeResponse({"error": "boom"}, status_code=500)})
+    with pytest.raises(RuntimeError):
+        publisher.fetch_offers_page()
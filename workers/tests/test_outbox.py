@@ -0,0 +1,172 @@
+"""Outbox: reivindicação, lease e resultado dos envios"""
+import asyncio
+import time
+
+import pytest
+
+from dispatcher.base import PostContent, DispatchResult
+from dispatcher.outbox import Outbox, OutboxWorker
+
+
+def make_post(post_id: str = "p1") -> PostContent:
+    return PostContent(
+        id=post_id,
+        title="Fone Bluetooth",
+        copy_text="🔥 Fone Bluetooth",
+        price=99.9,
+        original_price=199.9,
+        discount=50,
+        affiliate_url="https://example.com/p1",
+        niche="eletronicos",
+        store="Loja",
+        urgency="HOJE",
+    )
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    box = Outbox(str(tmp_path / "outbox.db"))
+    yield box
+    box.close()
+
+
+def test_enqueue_is_idempotent(outbox):
+    assert outbox.enqueue(make_post(), "telegram")
+    assert not outbox.enqueue(make_post(), "TELEGRAM")
+    assert outbox.enqueue_many([(make_post(), "twitter"), (make_post("p2"), "telegram")]) == 2
+    assert outbox.counts() == {Outbox.STATUS_PENDING: 3}
+
+
+def test_claimed_item_is_not_claimed_again_while_leased(outbox):
+    outbox.enqueue(make_post(), "telegram")
+
+    items = outbox.claim("a", lease=60)
+    assert [item.idempotency_key for item in items] == ["p1:TELEGRAM"]
+    assert items[0].attempts == 1
+    assert items[0].post == make_post()
+    assert outbox.claim("b", lease=60) == []
+
+
+def test_expired_lease_is_reclaimed_and_stale_result_discarded(outbox):
+    outbox.enqueue(make_post(), "telegram")
+    [first] = outbox.claim("a", lease=0.01)
+    time.sleep(0.02)
+
+    [second] = outbox.claim("b", lease=60)
+    assert second.id == first.id
+    assert second.attempts == 2
+
+    # O resultado do lease vencido não sobrescreve o do novo dono
+    assert not outbox.complete(first, DispatchResult(success=True, channel="TELEGRAM"), "a")
+    assert outbox.complete(second, DispatchResult(success=True, channel="TELEGRAM", external_id="42"), "b")
+    assert outbox.status("p1", "telegram")["status"] == Outbox.STATUS_SENT
+    assert outbox.status("p1", "telegram")["external_id"] == "42"
+
+
+def test_same_owner_reclaim_invalidates_old_claim(outbox):
+    outbox.enqueue(make_post(), "telegram")
+    [first] = outbox.claim("a", lease=0.01)
+    time.sleep(0.02)
+    [second] = outbox.claim("a", lease=60)
+
+    assert not outbox.complete(first, DispatchResult(success=True, channel="TELEGRAM"), "a")
+    assert outbox.complete(second, DispatchResult(success=True, channel="TELEGRAM"), "a")
+
+
+def test_renew_keeps_item_from_being_reclaimed(outbox):
+    outbox.enqueue(make_post(), "telegram")
+    [item] = outbox.claim("a", lease=0.05)
+
+    assert outbox.renew([item], "a", lease=60) == 1
+    time.sleep(0.06)
+    assert outbox.claim("b", lease=60) == []
+    # Só o dono atual renova
+    assert outbox.renew([item], "b", lease=60) == 0
+
+
+def test_failed_send_waits_for_backoff(outbox):
+    outbox.enqueue(make_post(), "telegram")
+    [item] = outbox.claim("a")
+
+    assert outbox.complete(item, DispatchResult(success=False, channel="TELEGRAM", error_message="erro"), "a")
+    assert outbox.status("p1", "telegram")["status"] == Outbox.STATUS_PENDING
+    assert outbox.claim("a") == []
+
+
+def test_failed_send_gives_up_after_max_attempts(outbox, monkeypatch):
+    monkeypatch.setattr(Outbox, "RETRY_BACKOFF", 0)
+    outbox.enqueue(make_post(), "telegram")
+    failure = DispatchResult(success=False, channel="TELEGRAM", error_message="erro")
+
+    for attempt in range(1, Outbox.MAX_ATTEMPTS + 1):
+        [item] = outbox.claim("a")
+        assert item.attempts == attempt
+        assert outbox.complete(item, failure, "a")
+
+    status = outbox.status("p1", "telegram")
+    assert status["status"] == Outbox.STATUS_FAILED
+    assert status["error_message"] == "erro"
+    assert outbox.claim("a") == []
+
+
+def test_open_circuit_postpones_without_spending_attempt(outbox):
+    outbox.enqueue(make_post(), "telegram")
+    [item] = outbox.claim("a")
+
+    result = DispatchResult(success=False, channel="TELEGRAM", retry_after=0)
+    assert outbox.complete(item, result, "a")
+    assert outbox.status("p1", "telegram")["attempts"] == 0
+    [again] = outbox.claim("a")
+    assert again.attempts == 1
+
+
+def test_worker_renews_leases_of_slow_sends(outbox):
+    outbox.enqueue(make_post(), "telegram")
+    claimed_by_other = []
+
+    async def slow_send(post, channel):
+        await asyncio.sleep(0.3)
+        # Com o lease renovado, outro worker não pega o item no meio do envio
+        claimed_by_other.extend(outbox.claim("other", lease=60))
+        return DispatchResult(success=True, channel=channel, external_id="1")
+
+    worker = OutboxWorker(outbox, slow_send, lease=0.15)
+    assert asyncio.run(worker.run_once()) == 1
+
+    assert claimed_by_other == []
+    assert outbox.status("p1", "telegram")["status"] == Outbox.STATUS_SENT
+
+
+def test_expired_lease_counts_as_attempt_until_failed(outbox):
+    outbox.enqueue(make_post(), "telegram")
+
+    # O worker cai no meio do envio a cada reivindicação
+    for attempt in range(1, Outbox.MAX_ATTEMPTS + 1):
+        [item] = outbox.claim(f"w{attempt}", lease=0.01)
+        assert item.attempts == attempt
+        time.sleep(0.02)
+
+    assert outbox.claim("next", lease=60) == []
+    status = outbox.status("p1", "telegram")
+    assert status["status"] == Outbox.STATUS_FAILED
+    assert "Lease vencido" in status["error_message"]
+
+
+def test_worker_reports_only_final_results(outbox, monkeypatch):
+    monkeypatch.setattr(Outbox, "RETRY_BACKOFF", 0)
+    outbox.enqueue(make_post("ok"), "telegram")
+    outbox.enqueue(make_post("bad"), "telegram")
+    done = []
+
+    async def send(post, channel):
+        return DispatchResult(success=post.id == "ok", channel=channel, error_message="erro")
+
+    async def on_done(item, result):
+        done.append((item.post.id, result.success))
+
+    worker = OutboxWorker(outbox, send, on_done=on_done)
+    for _ in range(Outbox.MAX_ATTEMPTS):
+        asyncio.run(worker.run_once())
+
+    # A falha só é informada quando o item desiste, não a cada nova tentativa
+    assert done == [("ok", True), ("bad", False)]
@@ -0,0 +1,63 @@
+"""Pipeline em estágios com filas limitadas"""
+import threading
+import time
+
+import pytest
+
+from publisher.pipeline import Pipeline, Stage
+
+
+def test_runs_items_through_all_stages():
+    pipeline = Pipeline([
+        Stage("double", lambda x: x * 2, workers=3),
+        Stage("inc", lambda x: x + 1, workers=2),
+    ])
+    results = pipeline.run(range(20))
+
+    assert sorted(results) == [x * 2 + 1 for x in range(20)]
+    assert pipeline.processed == {"double": 20, "inc": 20}
+    assert pipeline.failed == {"double": 0, "inc": 0}
+
+
+def test_none_and_errors_drop_the_item():
+    def check(x):
+        if x == 3:
+            raise RuntimeError("falhou")
+        return None if x % 2 else x
+
+    pipeline = Pipeline([Stage("check", check), Stage("keep", lambda x: x)])
+    assert sorted(pipeline.run(range(6))) == [0, 2, 4]
+    assert pipeline.processed == {"check": 3, "keep": 3}
+    assert pipeline.failed == {"check": 3, "keep": 0}
+
+
+def test_slow_stage_applies_backpressure_to_the_feed():
+    produced = 0
+    done = 0
+    max_ahead = 0
+    lock = threading.Lock()
+
+    def feed():
+        nonlocal produced, max_ahead
+        for i in range(30):
+            with lock:
+                produced += 1
+                max_ahead = max(max_ahead, produced - done)
+            yield i
+
+    def slow(x):
+        nonlocal done
+        time.sleep(0.005)
+        with lock:
+            done += 1
+        return x
+
+    pipeline = Pipeline([Stage("fast", lambda x: x), Stage("slow", slow)], queue_size=1)
+    assert len(pipeline.run(feed())) == 30
+    # Filas de 1 item: o feed só fica alguns itens à frente do estágio lento
+    assert max_ahead <= 6
+
+
+def test_requires_a_stage():
+    with pytest.raises(ValueError):
+        Pipeline([])
@@ -0,0 +1,108 @@
+"""Pré-cálculo de planos: store, orçamento de IA e tabela de canais"""
+import threading
+
+import pytest
+
+from publisher import main as publisher
+from publisher.channel_stats import ChannelPerformanceTable
+from publisher.main import DailyAiBudget, DraftCreator, DraftPlan
+from publisher.prewarm import PlanStore, prewarm_once
+
+
+def offer(offer_id="o1", discount=60, niche="eletronicos"):
+    return {
+        "id": offer_id,
+        "title": f"Produto {offer_id}",
+        "originalPrice": 200.0,
+        "finalPrice": 80.0,
+        "discount": discount,
+        "niche": {"slug": niche},
+        "store": {"name": "Amazon"},
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PlanStore(str(tmp_path / "plans.json"))
+
+
+@pytest.fixture
+def creator(store, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(publisher, "AI_MIN_SCORE", 0)
+    creator = DraftCreator(plan_store=store)
+    creator.copy_generator.use_ai = True
+    calls = creator.ai_calls = []
+    monkeypatch.setattr(creator.copy_generator, "_request_ai_copy",
+                        lambda o: calls.append(o["id"]) or f"copy IA {o['id']}")
+    return creator
+
+
+def test_plan_store_roundtrip_and_invalidation(store, tmp_path):
+    store.put(DraftPlan(offer=offer(), copy_text="copy", channels=["TELEGRAM"], priority="HIGH"))
+    assert store.get(offer())["copy_text"] == "copy"
+    # Oferta mudou de preço: o plano não vale mais
+    assert store.get(dict(offer(), finalPrice=70.0)) is None
+
+    store.flush()
+    assert PlanStore(str(tmp_path / "plans.json")).get(offer())["channels"] == ["TELEGRAM"]
+
+
+def test_wait_returns_the_plan_being_prepared(store):
+    assert store.begin("o1")
+    assert not store.begin("o1")
+
+    def finish():
+        store.put(DraftPlan(offer=offer(), copy_text="copy", channels=["SITE"], priority="HIGH"))
+        store.end("o1")
+
+    threading.Timer(0.05, finish).start()
+    assert store.wait(offer(), timeout=2)["copy_text"] == "copy"
+
+
+def test_prewarm_cycles_share_the_daily_ai_budget(creator, monkeypatch):
+    monkeypatch.setattr(publisher, "AI_CALLS_PER_RUN", 2)
+    budget = DailyAiBudget(limit=3)
+    creator.copy_generator.daily_budget = budget
+
+    assert prewarm_once(creator, [offer(f"a{i}") for i in range(3)]) == 3
+    assert prewarm_once(creator, [offer(f"b{i}") for i in range(3)]) == 3
+
+    # 2 chamadas no primeiro ciclo, só 1 no segundo: o resto saiu de template
+    assert creator.ai_calls == ["a0", "a1", "b0"]
+    assert budget.used == 3
+
+
+def test_prewarm_skips_offers_with_plans(creator):
+    assert prewarm_once(creator, [offer("o1"), offer("o2")]) == 2
+    assert prewarm_once(creator, [offer("o1"), offer("o2"), offer("o3")]) == 1
+    assert creator.plan_store.get(offer("o3"))["copy_text"] == "copy IA o3"
+
+
+def test_prewarm_reloads_the_channel_table(creator, monkeypatch):
+    monkeypatch.setattr(publisher, "AI_MIN_SCORE", 1000)  # só templates
+    prewarm_once(creator, [offer("o1")])
+    before = creator.plan_store.get(offer("o1"))["channels"]
+
+    # O publicador gravou uma tabela nova desde o último ciclo
+    table = ChannelPerformanceTable()
+    for channel in ("INSTAGRAM", "FACEBOOK"):
+        for _ in range(table.min_samples):
+            table.record_publication("eletronicos", 60, channel)
+    for _ in range(10):
+        table.record_click("eletronicos", 60, "INSTAGRAM")
+    table.save()
+
+    prewarm_once(creator, [offer("o2")])
+    after = creator.plan_store.get(offer("o2"))["channels"]
+    assert "INSTAGRAM" in after and "FACEBOOK" not in after
+    assert after != before
+
+
+def test_daily_budget_resets_on_a_new_day():
+    budget = DailyAiBudget(limit=1)
+    assert budget.take()
+    assert not budget.take()
+
+    budget._day = budget._day.replace(year=budget._day.year - 1)
+    assert budget.take()
@@ -0,0 +1,100 @@
+"""Ordenação das ofertas por valor"""
+import itertools
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from publisher.priority import prioritize, until
+
+
+def offers(*discounts):
+    return [{"id": str(i), "discount": d} for i, d in enumerate(discounts)]
+
+
+def discount(offer):
+    return offer["discount"]
+
+
+def test_limit_keeps_the_best_offers_of_the_whole_feed():
+    result = prioritize(iter(offers(10, 70, 30, 90, 50)), discount, limit=3)
+    assert [o["discount"] for o in result] == [90, 70, 50]
+
+
+def test_ties_keep_feed_order():
+    result = prioritize(offers(40, 40, 40), discount, limit=2)
+    assert [o["id"] for o in result] == ["0", "1"]
+    result = prioritize(offers(40, 40, 40), discount)
+    assert [o["id"] for o in result] == ["0", "1", "2"]
+
+
+def test_window_reorders_within_the_window_only():
+    result = [o["discount"] for o in prioritize(offers(10, 20, 30, 5, 40), discount, window=2)]
+    # A janela guarda 2 ofertas: a melhor sai a cada oferta lida além disso
+    assert result == [30, 20, 40, 10, 5]
+    assert sorted(result) == [5, 10, 20, 30, 40]
+
+
+def test_window_is_lazy():
+    consumed = []
+
+    def feed():
+        for offer in offers(*range(100)):
+            consumed.append(offer)
+            yield offer
+
+    first = next(prioritize(feed(), discount, window=5))
+    assert first["discount"] == 5
+    assert len(consumed) == 6
+
+
+def test_until_stops_at_deadline():
+    assert list(until(range(5), None)) == [0, 1, 2, 3, 4]
+    assert list(until(range(5), time.monotonic() - 1)) == []
+
+
+@pytest.fixture
+def creator(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # caches do DraftCreator ficam no diretório temporário
+    from publisher.main import DraftCreator
+    return DraftCreator()
+
+
+def test_score_offer_ranks_discount_and_urgency(creator):
+    assert creator.score_offer({"discount": 60}) > creator.score_offer({"discount": 45})
+    assert creator.score_offer({"discount": 45}) > creator.score_offer({"discount": 20})
+    assert creator.score_offer({}) == 0
+
+
+def test_score_offer_favors_offers_about_to_expire(creator):
+    soon = (datetime.now(timezone.utc) + timedelta(hours=2)).isoformat().replace("+00:00", "Z")
+    later = (datetime.now(timezone.utc) + timedelta(days=10)).isoformat()
+
+    assert creator.score_offer({"discount": 20, "expiresAt": soon}) > creator.score_offer({"discount": 20, "expiresAt": later})
+    assert creator.score_offer({"discount": 20, "expiresAt": "amanhã"}) == creator.score_offer({"discount": 20})
+
+
+def test_limit_with_deadline_still_creates_drafts(monkeypatch):
+    from publisher import main as publisher
+
+    def endless_feed():
+        for i in itertools.count():
+            time.sleep(0.01)
+            yield {"id": str(i), "discount": i % 90}
+
+    class Creator:
+        score_offer = staticmethod(discount)
+
+        def prepare(self, offer):
+            return offer
+
+        def submit(self, offer):
+            return offer["id"]
+
+    monkeypatch.setattr(publisher, "iter_offers_without_drafts", endless_feed)
+    monkeypatch.setattr(publisher, "PUBLISHER_TIME_LIMIT", 0.4)
+    monkeypatch.setattr(publisher, "PUBLISHER_MAX_DRAFTS", 3)
+
+    started = time.monotonic()
+    assert publisher.publish_pending(Creator()) == 3
+    assert time.monotonic() - started < 0.4
@@ -0,0 +1,66 @@
+"""Registro de dispatchers: um conjunto por event loop, fechado no fim do loop"""
+import asyncio
+
+import pytest
+
+from dispatcher import registry as registry_module
+from dispatcher.anti_repeat import get_recent_offers
+from dispatcher.base import BaseDispatcher, DispatchResult
+from dispatcher.message_map import get_sent_message_store
+from dispatcher.registry import DispatcherRegistry
+
+
+class FakeDispatcher(BaseDispatcher):
+    channel_name = "FAKE"
+    closed = []
+
+    async def send(self, post):
+        return DispatchResult(success=True, channel=self.channel_name)
+
+    async def validate_config(self):
+        return True
+
+    async def close(self):
+        FakeDispatcher.closed.append(self)
+        await super().close()
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setitem(registry_module.DISPATCHER_CLASSES, "FAKE", FakeDispatcher)
+    FakeDispatcher.closed = []
+    return DispatcherRegistry({"anti_repeat_dir": str(tmp_path)})
+
+
+def test_dispatchers_are_closed_when_their_loop_ends(registry):
+    async def use():
+        return registry.get("fake")
+
+    first = asyncio.run(use())
+    second = asyncio.run(use())
+
+    assert first is not second
+    assert FakeDispatcher.closed == [first, second]
+    assert len(registry._loops) == 0
+
+
+def test_explicit_close_is_not_repeated_at_loop_end(registry):
+    async def use():
+        old = registry.get("fake")
+        await registry.close()
+        # Criado depois do close: deve ser fechado uma vez, no fim do loop
+        return old, registry.get("fake")
+
+    old, new = asyncio.run(use())
+    assert FakeDispatcher.closed == [old, new]
+
+
+def test_loops_share_the_file_backed_stores(registry, tmp_path):
+    async def use():
+        return registry.get("fake").recent_offers
+
+    assert asyncio.run(use()) is asyncio.run(use())
+    assert get_recent_offers("fake", {"anti_repeat_dir": str(tmp_path)}) is asyncio.run(use())
+
+    path = str(tmp_path / "messages.json")
+    assert get_sent_message_store(path) is get_sent_message_store(path)
@@ -0,0 +1,71 @@
+"""Pipeline em fluxo contínuo: coleta → validação → draft, e depois o backlog"""
+from types import SimpleNamespace
+
+import pytest
+
+import main
+from publisher.pipeline import Stage
+
+
+@pytest.fixture
+def stages(monkeypatch):
+    """Etapas falsas que só anotam o que passou por cada uma"""
+    seen = SimpleNamespace(saved=[], validated=[], drafted=[], backlog_filter=None, finished=False)
+
+    class Saver:
+        def create_offer(self, offer):
+            seen.saved.append(offer["id"])
+            return None if offer.get("broken") else dict(offer)
+
+    def validate_and_update(processor, offer):
+        seen.validated.append(offer["id"])
+        return offer if offer.get("valid", True) else None
+
+    def draft(offer):
+        seen.drafted.append(offer["id"])
+        return f"draft-{offer['id']}"
+
+    def run_validator(offer_filter=None):
+        seen.backlog_filter = offer_filter
+        backlog = [{"id": "old"}, {"id": "a"}]
+        return len([o for o in backlog if offer_filter(o)])
+
+    def finish(creator):
+        seen.finished = True
+
+    monkeypatch.setattr(main, "OfferSaver", Saver)
+    monkeypatch.setattr(main, "OfferProcessor", lambda: None)
+    monkeypatch.setattr(main, "start_publisher_run", lambda: "creator")
+    monkeypatch.setattr(main, "validate_and_update", validate_and_update)
+    monkeypatch.setattr(main, "publisher_stages", lambda creator: [Stage("submit", draft)])
+    monkeypatch.setattr(main, "run_validator", run_validator)
+    monkeypatch.setattr(main, "publish_pending", lambda creator: 1)
+    monkeypatch.setattr(main, "finish_publisher_run", finish)
+    monkeypatch.setattr(main, "iter_collected_offers", lambda: iter([
+        {"id": "a"}, {"id": "b", "valid": False}, {"id": "c", "broken": True}, {"id": "d"},
+    ]))
+    return seen
+
+
+def test_offers_flow_through_every_stage_then_the_backlog(stages):
+    collected, validated, published = main.run_streaming_stages()
+
+    assert sorted(stages.saved) == ["a", "b", "c", "d"]
+    assert sorted(stages.validated) == ["a", "b", "d"]
+    assert sorted(stages.drafted) == ["a", "d"]
+    # Coletadas salvas; validadas no fluxo + backlog; drafts do fluxo + backlog
+    assert (collected, validated, published) == (3, 3, 3)
+    assert stages.finished
+
+
+def test_backlog_skips_offers_already_validated_in_the_stream(stages):
+    main.run_streaming_stages()
+
+    assert not stages.backlog_filter({"id": "a"})
+    assert not stages.backlog_filter({"id": "b"})
+    assert stages.backlog_filter({"id": "old"})
+
+
+def test_run_pipeline_reports_the_streaming_counts(stages, monkeypatch):
+    monkeypatch.setattr(main, "get_api_client", lambda: SimpleNamespace(log_latency=lambda: None))
+    assert main.run_pipeline(streaming=True) == {"collected": 3, "validated": 3, "published": 3}
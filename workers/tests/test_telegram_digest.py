@@ -0,0 +1,92 @@
+"""Resumos do Telegram: várias ofertas por mensagem, cada uma com seu link"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from dispatcher.anti_repeat import offer_key
+from dispatcher.base import PostContent
+from dispatcher.telegram import TelegramDispatcher
+
+
+def post(post_id: str, price: float = 99.9) -> PostContent:
+    return PostContent(
+        id=post_id, title=f"Produto {post_id}", copy_text="copy", price=price, original_price=199.9,
+        discount=50, affiliate_url="https://loja/x", niche="casa", store="Loja", urgency="NORMAL",
+    )
+
+
+class FakeBot:
+    """Bot que só registra as mensagens; message_id sequencial"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.messages.append(text)
+        return SimpleNamespace(message_id=len(self.messages), photo=None)
+
+    async def edit_message_text(self, **kwargs):
+        raise AssertionError("mensagem de resumo não deve ser editada")
+
+    async def shutdown(self):
+        pass
+
+
+@pytest.fixture
+def telegram(tmp_path):
+    dispatcher = TelegramDispatcher({
+        "anti_repeat_dir": str(tmp_path),
+        "telegram_messages_path": str(tmp_path / "messages.json"),
+        "telegram_global_rate": 1000,
+        "telegram_chat_rate": 1000,
+    })
+    dispatcher.bot = FakeBot()
+    dispatcher.chat_id = "chat"
+    dispatcher.send_queue.chat_burst = 1000
+    return dispatcher
+
+
+def run(telegram, coroutine):
+    async def scenario():
+        try:
+            return await coroutine
+        finally:
+            await telegram.close()
+    return asyncio.run(scenario())
+
+
+def test_offers_share_one_message_with_their_own_links(telegram):
+    results = run(telegram, telegram.send_digest([post("a"), post("b"), post("c")]))
+
+    assert [r.success for r in results] == [True, True, True]
+    assert {r.external_id for r in results} == {"1"}
+    [text] = telegram.bot.messages
+    for post_id in ("a", "b", "c"):
+        assert f"/go/{post_id}" in text
+    entry = telegram.sent_messages.get(offer_key("Produto a", "Loja"))
+    assert entry["digest"] and entry["message_id"] == "1" and entry["post_id"] == "a"
+
+
+def test_digest_is_split_at_the_message_limit(telegram):
+    telegram.MAX_MESSAGE_LENGTH = 400
+    posts = [post(str(i)) for i in range(6)]
+    results = run(telegram, telegram.send_digest(posts))
+
+    assert len(telegram.bot.messages) > 1
+    assert all(len(text) <= 400 for text in telegram.bot.messages)
+    # Cada oferta saiu uma vez, em ordem, apontando para a mensagem em que ficou
+    ids = [int(r.external_id) for r in results]
+    assert ids == sorted(ids) and set(ids) == set(range(1, len(telegram.bot.messages) + 1))
+
+
+def test_price_change_of_a_digest_offer_goes_out_again(telegram):
+    async def scenario():
+        await telegram.send_digest([post("a"), post("b")])
+        return await telegram.send_digest([post("a", price=79.9), post("b")])
+
+    first, second = run(telegram, scenario())
+    # A mensagem do resumo tem outras ofertas: o preço novo sai numa mensagem nova
+    assert first.success and first.external_id == "2"
+    assert second.skipped
+    assert "79,90" in telegram.bot.messages[-1]
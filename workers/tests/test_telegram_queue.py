@@ -0,0 +1,140 @@
+"""Fila de envio do Telegram: ritmo por chat, flood control, buckets compartilhados e prioridade das edições"""
+import asyncio
+
+import pytest
+
+from dispatcher.telegram_queue import TelegramSendQueue
+
+
+def test_edits_wait_behind_new_posts():
+    async def scenario():
+        queue = TelegramSendQueue(global_rate=1000, chat_rate=1000, chat_burst=1000)
+        order = []
+        gate = asyncio.Event()
+
+        def call(name):
+            async def send():
+                if name == "first":
+                    await gate.wait()
+                order.append(name)
+                return name
+            return send
+
+        # O primeiro envio segura o worker enquanto o resto chega na fila
+        first = asyncio.ensure_future(queue.submit("chat", call("first")))
+        await asyncio.sleep(0)
+        edit = asyncio.ensure_future(queue.submit("chat", call("edit"), priority=TelegramSendQueue.EDIT_PRIORITY))
+        post_a = asyncio.ensure_future(queue.submit("chat", call("post_a")))
+        post_b = asyncio.ensure_future(queue.submit("chat", call("post_b")))
+        await asyncio.sleep(0)
+        gate.set()
+        await asyncio.gather(first, edit, post_a, post_b)
+        await queue.close()
+        return order
+
+    assert asyncio.run(scenario()) == ["first", "post_a", "post_b", "edit"]
+
+
+def test_edits_spend_the_same_chat_bucket():
+    async def scenario():
+        queue = TelegramSendQueue(global_rate=1000, chat_rate=1000, chat_burst=2)
+
+        async def send():
+            return True
+
+        await queue.submit("chat", send)
+        await queue.submit("chat", send, priority=TelegramSendQueue.EDIT_PRIORITY)
+        bucket = queue._chat_buckets["chat"]
+        await queue.close()
+        return bucket.tokens
+
+    # Envio e edição consumiram o mesmo saldo (com a pequena recarga do intervalo)
+    assert asyncio.run(scenario()) < 1
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")  # retry_after como int no PTB 22
+def test_retry_after_pauses_the_chat_and_resends_first():
+    from telegram.error import RetryAfter
+
+    async def scenario():
+        queue = TelegramSendQueue(global_rate=1000, chat_rate=1000, chat_burst=1000)
+        order = []
+        attempts = {"first": 0}
+
+        async def first():
+            attempts["first"] += 1
+            if attempts["first"] == 1:
+                raise RetryAfter(0.05)
+            order.append("first")
+            return "first"
+
+        async def second():
+            order.append("second")
+            return "second"
+
+        start = asyncio.get_running_loop().time()
+        results = await asyncio.gather(queue.submit("chat", first), queue.submit("chat", second))
+        elapsed = asyncio.get_running_loop().time() - start
+        await queue.close()
+        return results, order, elapsed, queue.retried
+
+    results, order, elapsed, retried = asyncio.run(scenario())
+    assert results == ["first", "second"]
+    # A mensagem que levou RetryAfter volta para a frente da fila do chat
+    assert order == ["first", "second"]
+    assert retried == 1
+    assert elapsed >= 0.04
+
+
+def test_send_cancelled_while_waiting_for_a_token_is_dropped():
+    async def scenario():
+        queue = TelegramSendQueue(global_rate=1000, chat_rate=20, chat_burst=1)
+        sent = []
+
+        def call(name):
+            async def send():
+                sent.append(name)
+            return send
+
+        await queue.submit("chat", call("first"))
+        # Sem saldo no bucket: o chamador desiste antes do token chegar
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(queue.submit("chat", call("late")), timeout=0.01)
+        await queue.submit("chat", call("next"))
+        await queue.close()
+        return sent
+
+    assert asyncio.run(scenario()) == ["first", "next"]
+
+
+def test_close_cancels_pending_sends():
+    async def scenario():
+        queue = TelegramSendQueue(global_rate=1000, chat_rate=0.01, chat_burst=1)
+
+        async def send():
+            return True
+
+        await queue.submit("chat", send)
+        waiting = [asyncio.ensure_future(queue.submit("chat", send)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        await queue.close()
+        return await asyncio.gather(*waiting, return_exceptions=True), queue.backlog
+
+    results, backlog = asyncio.run(scenario())
+    assert all(isinstance(r, asyncio.CancelledError) for r in results)
+    assert backlog == 0
+
+
+def test_album_costs_one_message_per_item():
+    async def scenario():
+        queue = TelegramSendQueue(global_rate=1000, chat_rate=1000, chat_burst=10)
+
+        async def send():
+            return True
+
+        await queue.submit("chat", send, cost=4)
+        bucket = queue._chat_buckets["chat"]
+        await queue.close()
+        return bucket.tokens
+
+    assert 6 <= asyncio.run(scenario()) < 7
@@ -0,0 +1,56 @@
+"""Templates de copy pré-compilados"""
+import pytest
+
+from publisher.templates import TemplateEngine, compile_template
+
+
+def offer(offer_id="o1", original=199.9, niche=None, store="Amazon"):
+    return {
+        "id": offer_id,
+        "title": "Fone Bluetooth",
+        "originalPrice": original,
+        "finalPrice": 99.9,
+        "discount": 50,
+        "store": {"name": store},
+        "niche": {"slug": niche} if niche else None,
+    }
+
+
+def test_compile_template_rejects_unknown_fields():
+    fill, fields = compile_template("{title} por R$ {final} {{literal}}")
+    assert fields == {"title", "final"}
+    assert fill("X", None, 1, 10, "Loja") == "X por R$ 1.00 {literal}"
+
+    for template in ("{offer.__class__}", "{price}", "{final:>10}", "{title!r}", "{__import__}"):
+        with pytest.raises(ValueError):
+            compile_template(template)
+
+
+def test_render_is_deterministic_per_seed():
+    offers = [offer(f"o{i}") for i in range(20)]
+    assert TemplateEngine(seed=1).render_many(offers) == TemplateEngine(seed=1).render_many(offers)
+    assert TemplateEngine(seed=1).render_many(offers) != TemplateEngine(seed=2).render_many(offers)
+
+
+def test_render_fills_offer_fields():
+    engine = TemplateEngine(default_templates=["{title}: {original} -> {final} ({discount}%) {store}"])
+    assert engine.render(offer()) == "Fone Bluetooth: 199.90 -> 99.90 (50%) Amazon"
+
+
+def test_offer_without_original_price_uses_templates_without_it():
+    engine = TemplateEngine(default_templates=["De R$ {original} por R$ {final}", "Só R$ {final}"])
+    assert {engine.render(offer(f"o{i}", original=None)) for i in range(10)} == {"Só R$ 99.90"}
+
+
+def test_matches_str_format_of_the_same_template():
+    template = "🔥 {title}\n\nDe R$ {original} por R$ {final} ({discount}% OFF) na {store}!"
+    engine = TemplateEngine(default_templates=[template])
+    expected = template.format(title="Fone Bluetooth", original="199.90", final="99.90", discount=50, store="Amazon")
+    assert engine.render(offer()) == expected
+
+
+def test_niche_pools_add_to_the_defaults():
+    engine = TemplateEngine(default_templates=["padrão {final}"], niche_templates={"moda": ["moda {final}"]})
+    assert engine.render(offer(niche="casa")) == "padrão 99.90"
+    assert {engine.render(offer(f"o{i}", niche="moda")) for i in range(20)} == {"padrão 99.90", "moda 99.90"}
+    assert engine.render_many([offer(niche="casa"), offer()]) == ["padrão 99.90", "padrão 99.90"]
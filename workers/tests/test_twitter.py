@@ -0,0 +1,94 @@
+"""Dispatcher do Twitter: cliente síncrono fora do loop e espera cooperativa do rate limit"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+import tweepy
+
+from dispatcher.base import PostContent
+from dispatcher.twitter import TwitterDispatcher
+
+
+def post() -> PostContent:
+    return PostContent(
+        id="p1", title="Fone Bluetooth", copy_text="copy", price=99.9, original_price=199.9,
+        discount=50, affiliate_url="https://loja/x", niche="eletronicos", store="Loja", urgency="NORMAL",
+    )
+
+
+def too_many_requests(reset: float) -> tweepy.TooManyRequests:
+    response = SimpleNamespace(status_code=429, reason="Too Many Requests", headers={"x-rate-limit-reset": str(reset)})
+    return tweepy.TooManyRequests(response, response_json={})
+
+
+class BlockingClient:
+    """tweepy.Client falso: bloqueia a thread como uma chamada HTTP síncrona"""
+
+    def __init__(self, delay: float = 0.0, failures=()):
+        self.delay = delay
+        self.failures = list(failures)
+        self.tweets = []
+
+    def create_tweet(self, text, **kwargs):
+        time.sleep(self.delay)
+        if self.failures:
+            raise self.failures.pop(0)
+        self.tweets.append(text)
+        return SimpleNamespace(data={"id": len(self.tweets)})
+
+
+@pytest.fixture
+def twitter(tmp_path):
+    dispatcher = TwitterDispatcher({"anti_repeat_dir": str(tmp_path), "twitter_max_rate_limit_wait": 5})
+    dispatcher._executor = ThreadPoolExecutor(max_workers=1)
+    return dispatcher
+
+
+def send_with_ticker(twitter):
+    """Envia um tweet enquanto outra tarefa conta quantas vezes o loop a deixou rodar"""
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.ensure_future(ticker())
+        try:
+            return await twitter.send(post()), ticks
+        finally:
+            task.cancel()
+            await twitter.close()
+    return asyncio.run(scenario())
+
+
+def test_sync_client_does_not_block_the_loop(twitter):
+    twitter.client = BlockingClient(delay=0.2)
+
+    result, ticks = send_with_ticker(twitter)
+    assert result.success and result.external_id == "1"
+    assert ticks >= 10
+
+
+def test_rate_limit_waits_cooperatively_and_retries(twitter):
+    twitter.client = BlockingClient(failures=[too_many_requests(time.time() - 0.8)])
+
+    result, ticks = send_with_ticker(twitter)
+    # Espera até o reset (+1s) com asyncio.sleep e tenta de novo
+    assert result.success and twitter.client.tweets
+    assert ticks >= 10
+
+
+def test_rate_limit_longer_than_the_maximum_wait_fails_at_once(twitter):
+    twitter.client = BlockingClient()
+    twitter._rate_limited_until = time.time() + 600
+
+    start = time.monotonic()
+    result, _ = send_with_ticker(twitter)
+    assert not result.success and "Rate limit" in result.error_message
+    assert time.monotonic() - start < 1
+    assert twitter.client.tweets == []
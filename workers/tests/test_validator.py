@@ -0,0 +1,91 @@
+"""Validação das ofertas já salvas"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from validator import main as validator
+from validator.main import OfferProcessor, run_validator
+from fakes import FakeApi, FakeResponse
+
+
+def stored_offer(offer_id="o1", url="https://example.com/fone", title="Fone Bluetooth JBL Tune"):
+    return {
+        "id": offer_id,
+        "title": title,
+        "originalPrice": 200.0,
+        "finalPrice": 100.0,
+        "affiliateUrl": url,
+        "urgency": "NORMAL",
+        "nicheSlug": "eletronicos",
+    }
+
+
+@pytest.fixture
+def api(monkeypatch):
+    api = FakeApi()
+    monkeypatch.setattr(validator, "get_api_client", lambda: api)
+    return api
+
+
+def list_offers(api, offers):
+    api.routes[("GET", "/api/offers")] = FakeResponse({"data": offers, "meta": {"hasMore": False}})
+    api.routes[("PATCH", "/api/offers/o1")] = FakeResponse({"data": {}})
+
+
+def test_stored_offer_is_not_a_duplicate_of_itself(api):
+    offer = stored_offer()
+    list_offers(api, [offer])
+
+    assert OfferProcessor().validate_offer(dict(offer)) is not None
+
+
+def test_another_offer_with_the_same_link_is_a_duplicate(api):
+    list_offers(api, [stored_offer("o2")])
+    assert OfferProcessor().validate_offer(stored_offer()) is None
+
+    list_offers(api, [stored_offer("o2", url="https://example.com/outro")])
+    assert OfferProcessor().validate_offer(stored_offer()) is None  # mesmo título
+
+
+def test_new_offer_without_id_is_checked_against_all(api):
+    offer = stored_offer()
+    list_offers(api, [offer])
+    new = dict(offer)
+    del new["id"]
+
+    assert OfferProcessor().validate_offer(new) is None
+
+
+def test_run_validator_accepts_stored_offers_and_saves_urgency(api):
+    offer = stored_offer()
+    offer["expiresAt"] = (datetime.now(timezone.utc) + timedelta(hours=3)).isoformat()
+    list_offers(api, [offer])
+
+    assert run_validator() == 1
+    [(_, body)] = api.calls("PATCH", "/api/offers/o1")
+    assert body == {"urgency": "HOJE"}
+
+
+def test_api_error_is_not_an_empty_offer_list(api):
+    api.routes[("GET", "/api/offers")] = FakeResponse({"error": "boom"}, status_code=500)
+    assert run_validator() == 0
+
+
+def test_filtered_run_pages_until_it_fills_the_batch(api, monkeypatch):
+    monkeypatch.setattr(validator, "VALIDATION_BATCH_SIZE", 2)
+    pages = {
+        None: ([stored_offer("a1"), stored_offer("b1")], "c1"),
+        "c1": ([stored_offer("b2"), stored_offer("b3")], "c2"),
+        "c2": ([stored_offer("a2"), stored_offer("a3")], None),
+    }
+
+    def route(params, _json):
+        offers, next_cursor = pages[params.get("cursor")]
+        return FakeResponse({"data": offers, "meta": {"nextCursor": next_cursor}})
+
+    api.routes[("GET", "/api/offers")] = route
+    offers = validator.get_pending_offers(lambda o: o["id"].startswith("a"), limit=2)
+
+    # As ofertas do worker estavam espalhadas: a primeira página sozinha traria uma
+    assert [o["id"] for o in offers] == ["a1", "a2"]
+    assert [p.get("cursor") for p, _ in api.calls("GET", "/api/offers")] == [None, "c1", "c2"]
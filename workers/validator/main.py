@@ -10,12 +10,24 @@ Responsabilidades:
 import requests
 import re
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, Callable
 from loguru import logger
 import sys
 
 sys.path.append('..')
 from config import API_URL, MINIMUM_DISCOUNT, CATEGORY_TO_NICHE
+from api_client import get_api_client
+from metrics import get_metrics
+
+VALIDATED_OFFERS = get_metrics().counter(
+    "promo_validator_offers_total", "Ofertas validadas por resultado", ["outcome"]
+)
+REJECTED_OFFERS = get_metrics().counter(
+    "promo_offers_rejected_total", "Ofertas rejeitadas na validação por motivo", ["reason"]
+)
+
+# Ofertas validadas por execução
+VALIDATION_BATCH_SIZE = 50
 
 
 class OfferValidator:
@@ -96,17 +108,21 @@ class OfferValidator:
                     
         return "outros"
     
-    def check_duplicate(self, title: str, affiliate_url: str) -> bool:
-        """Verifica se oferta já existe"""
+    def check_duplicate(self, title: str, affiliate_url: str, offer_id: Optional[str] = None) -> bool:
+        """Verifica se oferta já existe (ignorando o próprio registro, se a oferta já está salva)"""
         try:
             # Buscar ofertas existentes
-            response = requests.get(
+            response = get_api_client().get(
                 f"{self.api_url}/api/offers",
                 params={"limit": 100, "active": "true"}
             )
-            offers = response.json()
+            response.raise_for_status()
+            offers = response.json().get("data", [])
             
             for offer in offers:
+                if offer_id and offer.get("id") == offer_id:
+                    continue
+                    
                 # Verificar por URL
                 if offer.get("affiliateUrl") == affiliate_url:
                     return True
@@ -166,6 +182,11 @@ class OfferProcessor:
                 
         return valid_offers
     
+    def _reject(self, reason: str) -> None:
+        VALIDATED_OFFERS.inc(outcome="rejected")
+        REJECTED_OFFERS.inc(reason=reason)
+        return None
+    
     def validate_offer(self, offer: Dict) -> Optional[Dict]:
         """Valida uma oferta individual"""
         title = offer.get("title", "")
@@ -176,18 +197,18 @@ class OfferProcessor:
         # Validar título
         if not self.validator.validate_title(title):
             logger.debug(f"Título inválido: {title[:50]}")
-            return None
+            return self._reject("title")
             
         # Validar desconto
         is_valid_discount, discount = self.validator.validate_discount(original_price, final_price)
         if not is_valid_discount:
             logger.debug(f"Desconto inválido: {discount}%")
-            return None
+            return self._reject("discount")
             
         # Verificar duplicata
-        if self.validator.check_duplicate(title, affiliate_url):
+        if self.validator.check_duplicate(title, affiliate_url, offer.get("id")):
             logger.debug(f"Oferta duplicada: {title[:50]}")
-            return None
+            return self._reject("duplicate")
             
         # Detectar nicho se não informado
         if not offer.get("nicheSlug"):
@@ -203,28 +224,45 @@ class OfferProcessor:
         offer["discount"] = discount
         
         logger.info(f"✅ Oferta válida: {title[:50]}... ({discount}% OFF)")
+        VALIDATED_OFFERS.inc(outcome="valid")
         return offer
 
 
-def get_pending_offers() -> List[Dict]:
-    """Busca ofertas pendentes de validação"""
+def get_pending_offers(offer_filter: Optional[Callable[[Dict], bool]] = None,
+                       limit: int = VALIDATION_BATCH_SIZE) -> List[Dict]:
+    """
+    Busca até `limit` ofertas pendentes de validação
+    
+    Com filtro (ex.: faixas de um worker), percorre as páginas por cursor
+    até juntar `limit` ofertas aceitas ou acabar a lista, em vez de filtrar
+    só a primeira página.
+    """
+    offers: List[Dict] = []
+    params = {"active": "true", "limit": limit}
     try:
-        response = requests.get(
-            f"{API_URL}/api/offers",
-            params={"active": "true", "limit": 50}
-        )
-        return response.json()
+        while True:
+            response = get_api_client().get(f"{API_URL}/api/offers", params=params)
+            response.raise_for_status()
+            payload = response.json()
+            page = payload.get("data", [])
+            offers += [o for o in page if offer_filter(o)] if offer_filter else page
+            next_cursor = payload.get("meta", {}).get("nextCursor")
+            if len(offers) >= limit or not next_cursor:
+                return offers[:limit]
+            params = dict(params, cursor=next_cursor)
     except Exception as e:
         logger.error(f"Erro ao buscar ofertas: {e}")
-        return []
+        return offers[:limit]
 
 
 def update_offer(offer_id: str, data: Dict) -> bool:
     """Atualiza oferta no banco"""
     try:
-        response = requests.patch(
+        # PATCH com os mesmos campos é seguro de repetir
+        response = get_api_client().patch(
             f"{API_URL}/api/offers/{offer_id}",
-            json=data
+            json=data,
+            retry=True
         )
         return response.status_code == 200
     except Exception as e:
@@ -232,24 +270,34 @@ def update_offer(offer_id: str, data: Dict) -> bool:
         return False
 
 
-def run_validator():
-    """Executa o validador de ofertas"""
+def validate_and_update(processor: OfferProcessor, offer: Dict) -> Optional[Dict]:
+    """Valida uma oferta e grava a urgência se ela mudou"""
+    original_urgency = offer.get("urgency")
+    result = processor.validate_offer(offer)
+    if result and result.get("urgency") != original_urgency:
+        update_offer(offer["id"], {"urgency": result["urgency"]})
+    return result
+
+
+def run_validator(offer_filter: Optional[Callable[[Dict], bool]] = None):
+    """
+    Executa o validador de ofertas
+    
+    Args:
+        offer_filter: valida só as ofertas aceitas (ex.: faixas deste worker)
+    """
     logger.info("=== Iniciando IA Validadora ===")
     
     processor = OfferProcessor()
     
     # Buscar ofertas
-    offers = get_pending_offers()
+    offers = get_pending_offers(offer_filter)
     logger.info(f"Encontradas {len(offers)} ofertas para validar")
     
     # Processar
     validated = 0
     for offer in offers:
-        result = processor.validate_offer(offer)
-        if result:
-            # Atualizar urgência se mudou
-            if result.get("urgency") != offer.get("urgency"):
-                update_offer(offer["id"], {"urgency": result["urgency"]})
+        if validate_and_update(processor, offer):
             validated += 1
     
     logger.info(f"=== Validação finalizada: {validated}/{len(offers)} ofertas válidas ===")